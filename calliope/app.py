@@ -10,8 +10,10 @@ from fastapi.staticfiles import StaticFiles
 from piccolo.engine import engine_finder
 from piccolo.table import Table
 from piccolo_admin.endpoints import FormConfig, TableConfig, create_admin
+from piccolo_api.crud.hooks import Hook, HookType
 from piccolo_api.media.local import LocalMediaStorage
 from starlette.responses import FileResponse, JSONResponse, RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from calliope.forms.add_story_thumbnails import (
     AddStoryThumbnailsFormModel,
@@ -26,6 +28,7 @@ from calliope.routes.v1 import config as v1_config_routes
 from calliope.routes.v1 import story as v1_story_routes
 from calliope.routes.v2 import router as v2_router
 from calliope.settings import settings
+from calliope.storage.config_manager import invalidate_config_cache
 from calliope.tables import (
     BookmarkList,
     ClientTypeConfig,
@@ -106,7 +109,78 @@ strategy_config_config = TableConfig(
 )
 
 
+# Tables whose rows feed into resolved sparrow configurations. Edits to these
+# through the admin invalidate the config cache.
+CONFIG_TABLES = [
+    ClientTypeConfig,
+    InferenceModel,
+    ModelConfig,
+    PromptTemplate,
+    SparrowConfig,
+    StrategyConfig,
+]
+
+
+def _invalidate_config_cache_on_save(row: Table) -> Table:
+    invalidate_config_cache()
+    return row
+
+
+def _invalidate_config_cache_on_patch(row_id: int, values: dict) -> dict:  # noqa: ARG001
+    invalidate_config_cache()
+    return values
+
+
+def _invalidate_config_cache_on_delete(row_id: int) -> None:  # noqa: ARG001
+    invalidate_config_cache()
+
+
+CONFIG_CACHE_HOOKS = [
+    Hook(hook_type=HookType.pre_save, callable=_invalidate_config_cache_on_save),
+    Hook(hook_type=HookType.pre_patch, callable=_invalidate_config_cache_on_patch),
+    Hook(hook_type=HookType.pre_delete, callable=_invalidate_config_cache_on_delete),
+]
+
+
+class InvalidateConfigCacheAfterWrites:
+    """
+    Wraps the admin app to invalidate the config cache again once a write to a
+    config table has been made. (The hooks above run before the write, so a
+    config resolved in between would otherwise be cached from the old rows.)
+    """
+
+    WRITE_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+    # The admin API paths of the config tables, relative to where the admin app
+    # is mounted, e.g. /api/tables/sparrow_config/.
+    CONFIG_TABLE_PATHS = tuple(
+        f"/api/tables/{table._meta.tablename}/" for table in CONFIG_TABLES
+    )
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        is_write = scope["type"] == "http" and scope["method"] in self.WRITE_METHODS
+
+        # The path within the admin app, read before the admin app's own routing
+        # updates the scope.
+        path = scope.get("path", "")
+        root_path = scope.get("root_path", "")
+        if root_path and path.startswith(root_path):
+            path = path[len(root_path) :]
+        path = path.rstrip("/") + "/"
+
+        await self.app(scope, receive, send)
+
+        if is_write and path.startswith(self.CONFIG_TABLE_PATHS):
+            invalidate_config_cache()
+
+
 def maybe_create_table_config(table: type[Table]) -> Union[type[Table], TableConfig]:
+    if table in CONFIG_TABLES:
+        return TableConfig(table_class=table, hooks=CONFIG_CACHE_HOOKS)
+
     return (
         image_local_config
         # TODO: GCP custom MediaStorage for images.
@@ -169,7 +243,7 @@ def create_app() -> FastAPI:
                 ),
             ],
         )
-        app.mount("/admin", admin_app)
+        app.mount("/admin", InvalidateConfigCacheAfterWrites(admin_app))
     except Exception as e:
         print(f"Error creating admin route: {e}")
 
@@ -193,6 +267,51 @@ async def open_database_connection_pool() -> None:
         print(f"Error connecting to database: {e}")
 
 
+@app.on_event("startup")
+async def open_client_pools() -> None:
+    try:
+        # Open the pooled HTTP and provider clients that requests borrow.
+        from calliope.utils.clients import get_client_manager
+
+        await get_client_manager().start()
+    except Exception as e:
+        print(f"Error opening client pools: {e}")
+
+
+@app.on_event("startup")
+async def start_image_executor() -> None:
+    try:
+        # Start the image worker processes, which are slow to start.
+        from calliope.utils.image_executor import get_image_executor
+
+        get_image_executor().start()
+    except Exception as e:
+        print(f"Error starting image process pool: {e}")
+
+
+@app.on_event("startup")
+async def load_geoip_database() -> None:
+    try:
+        # Load the IP range database (if any) up front, as it may be large.
+        from calliope.location.geoip import get_geoip_database
+
+        get_geoip_database()
+    except Exception as e:
+        print(f"Error loading GeoIP database: {e}")
+
+
+@app.on_event("startup")
+async def load_configs() -> None:
+    try:
+        # Load strategy and model configs up front, so the first frame request
+        # doesn't wait on them.
+        from calliope.storage.config_registry import load_config_snapshot
+
+        await load_config_snapshot()
+    except Exception as e:
+        print(f"Error loading configs: {e}")
+
+
 @app.on_event("startup")
 async def initialize_task_queue() -> None:
     try:
@@ -228,6 +347,26 @@ async def close_database_connection_pool() -> None:
         print(f"Error connecting to database: {e}")
 
 
+@app.on_event("shutdown")
+async def close_client_pools() -> None:
+    try:
+        from calliope.utils.clients import get_client_manager
+
+        await get_client_manager().close()
+    except Exception as e:
+        print(f"Error closing client pools: {e}")
+
+
+@app.on_event("shutdown")
+async def close_image_executor() -> None:
+    try:
+        from calliope.utils.image_executor import get_image_executor
+
+        get_image_executor().shutdown()
+    except Exception as e:
+        print(f"Error closing image process pool: {e}")
+
+
 @app.get("/openapi.json", tags=["documentation"])
 async def get_open_api_endpoint(api_key: APIKey = Depends(get_api_key)) -> JSONResponse:  # noqa: ARG001
     response = JSONResponse(
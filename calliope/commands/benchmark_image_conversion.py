@@ -0,0 +1,280 @@
+"""
+Checks the device image format conversions (RGB565 and grayscale16) in
+calliope/utils/image.py against the per-pixel implementations they replaced,
+which are kept here for reference: that their output is byte for byte the
+same, and how long each takes.
+
+Usage:
+    python -m calliope.commands.benchmark_image_conversion --iterations 3
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from typing import Callable, cast, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image as PIL_Image
+
+from calliope.utils.image import (
+    convert_grayscale16_to_png,
+    convert_png_to_grayscale16,
+    convert_png_to_rgb565,
+    convert_rgb565_to_png,
+)
+
+
+# (Width, height.) Odd sizes included.
+IMAGE_SIZES: List[Tuple[int, int]] = [
+    (960, 540),
+    (320, 240),
+    (100, 77),
+    (101, 77),
+    (1, 1),
+]
+
+
+def legacy_convert_png_to_rgb565(input_filename: str, output_filename: str) -> None:
+    png = PIL_Image.open(input_filename)
+
+    input_image_content = png.getdata()
+    output_image_content = np.empty(len(input_image_content), np.uint16)
+    for i, pixel in enumerate(input_image_content):
+        r = (pixel[0] >> 3) & 0x1F
+        g = (pixel[1] >> 2) & 0x3F
+        b = (pixel[2] >> 3) & 0x1F
+        rgb = r << 11 | g << 5 | b
+        output_image_content[i] = rgb
+
+    with open(output_filename, "wb") as output_file:
+        output_file.write(output_image_content.astype("<u2").tobytes())
+
+
+def legacy_convert_rgb565_to_png(
+    input_filename: str, output_filename: str, width: int, height: int
+) -> None:
+    dataArray = np.fromfile(input_filename, "<u2")
+
+    png = PIL_Image.new("RGB", (width, height))
+
+    for i, word in enumerate(cast(Iterable[int], np.nditer(dataArray))):
+        r = int(word >> 11) & 0x1F
+        g = int(word >> 5) & 0x3F
+        b = int(word) & 0x1F
+        png.putpixel((i % width, i // width), (r << 3, g << 2, b << 3))
+
+    png.save(output_filename)
+
+
+def legacy_convert_png_to_grayscale16(input_filename: str, output_filename: str) -> None:
+    # (Mispacks odd widths.)
+    png = PIL_Image.open(input_filename).convert(mode="L")
+
+    input_image_content = png.getdata()
+    output_image_content = np.empty(int(len(input_image_content) / 2), np.uint8)
+    i = 0
+    for y in range(0, png.size[1]):
+        byte = 0
+        done = True
+        for x in range(0, png.size[0]):
+            luminance = cast(int, png.getpixel((x, y)))
+            if x % 2 == 0:
+                byte = luminance >> 4
+                done = False
+            else:
+                byte |= luminance & 0xF0
+                output_image_content[i] = byte
+                done = True
+                i += 1
+        if not done:
+            output_image_content[i] = byte
+
+    with open(output_filename, "wb") as output_file:
+        output_file.write(output_image_content.tobytes())
+
+
+def legacy_convert_grayscale16_to_png(
+    input_filename: str, output_filename: str, width: int, height: int
+) -> None:
+    # (Leaves the low nibble of every second pixel set.)
+    dataArray = np.fromfile(input_filename, np.uint8)
+
+    png = PIL_Image.new("L", (width, height))
+
+    for i, pixel_pair in enumerate(cast(Iterable[int], np.nditer(dataArray))):
+        p0 = int(pixel_pair & 0xF) << 4
+        i *= 2
+        x = i % width
+        y = i // width
+        if y >= height:
+            break
+        png.putpixel((x, y), p0)
+
+        p1 = int(pixel_pair)
+        i += 1
+        x = i % width
+        y = i // width
+        if y >= height:
+            break
+        png.putpixel((x, y), p1)
+
+    png.save(output_filename)
+
+
+def _make_test_image(filename: str, width: int, height: int) -> None:
+    """
+    Saves an image of gradients with a little noise, so every bit of every channel
+    varies.
+    """
+    rng = np.random.default_rng(width * height)
+    x = np.linspace(0, 255, width)[np.newaxis, :]
+    y = np.linspace(0, 255, height)[:, np.newaxis]
+    pixels = np.stack(
+        [
+            np.broadcast_to(x, (height, width)),
+            np.broadcast_to(y, (height, width)),
+            (x + y) / 2,
+        ],
+        axis=-1,
+    )
+    pixels = pixels + rng.integers(-4, 4, pixels.shape)
+    PIL_Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8)).save(filename)
+
+
+def _time(call: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - start) / iterations
+
+
+def _read(filename: str) -> bytes:
+    with open(filename, "rb") as file:
+        return file.read()
+
+
+def _read_pixels(filename: str) -> bytes:
+    return PIL_Image.open(filename).tobytes()
+
+
+def _read_high_nibbles(filename: str) -> bytes:
+    return (np.asarray(PIL_Image.open(filename)) & 0xF0).tobytes()
+
+
+def _describe(
+    time_seconds: float, legacy_time_seconds: Optional[float], ok: Optional[bool]
+) -> str:
+    if legacy_time_seconds is None:
+        return f"{1000 * time_seconds:.1f} ms (no legacy comparison)"
+    return (
+        f"{1000 * time_seconds:.1f} ms (was {1000 * legacy_time_seconds:.0f} ms)"
+        f"{'' if ok else ' MISMATCH'}"
+    )
+
+
+def check_rgb565(directory: str, width: int, height: int, iterations: int) -> bool:
+    png = os.path.join(directory, f"test-{width}x{height}.png")
+    _make_test_image(png, width, height)
+
+    raw = os.path.join(directory, "new.raw")
+    legacy_raw = os.path.join(directory, "legacy.raw")
+    encode_time = _time(lambda: convert_png_to_rgb565(png, raw), iterations)
+    legacy_encode_time = _time(lambda: legacy_convert_png_to_rgb565(png, legacy_raw), 1)
+    encoded_ok = _read(raw) == _read(legacy_raw)
+
+    decoded = os.path.join(directory, "new.png")
+    legacy_decoded = os.path.join(directory, "legacy.png")
+    decode_time = _time(
+        lambda: convert_rgb565_to_png(raw, decoded, width, height), iterations
+    )
+    legacy_decode_time = _time(
+        lambda: legacy_convert_rgb565_to_png(raw, legacy_decoded, width, height), 1
+    )
+    decoded_ok = _read_pixels(decoded) == _read_pixels(legacy_decoded)
+
+    # A decoded image should encode to the same bytes again.
+    round_trip = os.path.join(directory, "round-trip.raw")
+    convert_png_to_rgb565(decoded, round_trip)
+    round_trip_ok = _read(round_trip) == _read(raw)
+
+    print(
+        f"  {width}x{height}: "
+        f"encode {_describe(encode_time, legacy_encode_time, encoded_ok)}, "
+        f"decode {_describe(decode_time, legacy_decode_time, decoded_ok)}, "
+        f"round trip {'ok' if round_trip_ok else 'MISMATCH'}"
+    )
+    return encoded_ok and decoded_ok and round_trip_ok
+
+
+def check_grayscale16(directory: str, width: int, height: int, iterations: int) -> bool:
+    png = os.path.join(directory, f"test-{width}x{height}.png")
+    _make_test_image(png, width, height)
+
+    packed = os.path.join(directory, "new.grayscale16")
+    legacy_packed = os.path.join(directory, "legacy.grayscale16")
+    encode_time = _time(lambda: convert_png_to_grayscale16(png, packed), iterations)
+    # (The legacy encoder mispacks odd widths, so isn't compared for them.)
+    legacy_encode_time: Optional[float] = None
+    encoded_ok = True
+    if width % 2 == 0:
+        legacy_encode_time = _time(
+            lambda: legacy_convert_png_to_grayscale16(png, legacy_packed), 1
+        )
+        encoded_ok = _read(packed) == _read(legacy_packed)
+    sized_ok = len(_read(packed)) == (width * height + 1) // 2
+
+    decoded = os.path.join(directory, "new.png")
+    legacy_decoded = os.path.join(directory, "legacy.png")
+    decode_time = _time(
+        lambda: convert_grayscale16_to_png(packed, decoded, width, height), iterations
+    )
+    legacy_decode_time = _time(
+        lambda: legacy_convert_grayscale16_to_png(packed, legacy_decoded, width, height),
+        1,
+    )
+    # (Ignoring the legacy decoder's stray low nibbles.)
+    decoded_ok = _read_high_nibbles(decoded) == _read_high_nibbles(legacy_decoded)
+    decoded_ok = decoded_ok and _read_pixels(decoded) == _read_high_nibbles(decoded)
+
+    round_trip = os.path.join(directory, "round-trip.grayscale16")
+    convert_png_to_grayscale16(decoded, round_trip)
+    round_trip_ok = _read(round_trip) == _read(packed)
+
+    print(
+        f"  {width}x{height}: "
+        f"encode {_describe(encode_time, legacy_encode_time, encoded_ok)}"
+        f"{'' if sized_ok else ' WRONG SIZE'}, "
+        f"decode {_describe(decode_time, legacy_decode_time, decoded_ok)}, "
+        f"round trip {'ok' if round_trip_ok else 'MISMATCH'}"
+    )
+    return encoded_ok and sized_ok and decoded_ok and round_trip_ok
+
+
+def benchmark(iterations: int) -> bool:
+    all_ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        print("RGB565")
+        for width, height in IMAGE_SIZES:
+            all_ok = check_rgb565(directory, width, height, iterations) and all_ok
+
+        print("Grayscale16")
+        for width, height in IMAGE_SIZES:
+            all_ok = check_grayscale16(directory, width, height, iterations) and all_ok
+
+    print("All conversions match." if all_ok else "Some conversions DIFFER.")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="benchmark_image_conversion")
+    parser.add_argument(
+        "--iterations",
+        required=False,
+        default=3,
+        help="The number of times to repeat each conversion, for timing.",
+    )
+    args = parser.parse_args()
+
+    if not benchmark(int(args.iterations)):
+        exit(1)
@@ -0,0 +1,108 @@
+"""
+Times image_is_monochrome (calliope/utils/image.py) against the per-pixel
+color histogram it replaced, which is kept here for reference, and checks
+that they agree.
+
+Usage:
+    python -m calliope.commands.benchmark_monochrome_detection --iterations 10
+"""
+
+import argparse
+from collections import defaultdict
+from functools import partial
+import os
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image as PIL_Image
+
+from calliope.utils.image import image_is_monochrome
+
+
+# (Name, width, height, whether monochrome.)
+IMAGE_CASES: List[Tuple[str, int, int, bool]] = [
+    ("gradient", 1024, 1024, False),
+    ("black", 1024, 1024, True),
+    ("black but one pixel", 1024, 1024, False),
+    ("gray", 512, 512, True),
+]
+
+
+def legacy_image_is_monochrome(image_filename: str) -> bool:
+    # (With the comparison corrected: it used to test for no colors at all.)
+    image = PIL_Image.open(image_filename)
+    by_color: Dict[Any, int] = defaultdict(int)
+    # (getdata was renamed get_flattened_data in Pillow 12.1.)
+    get_data: Any = getattr(image, "get_flattened_data", image.getdata)
+    for pixel in get_data():
+        by_color[pixel] += 1
+    return len(by_color) == 1
+
+
+def _make_test_image(filename: str, name: str, width: int, height: int) -> None:
+    pixels = np.zeros((height, width, 3), dtype=np.uint8)
+    if name == "gradient":
+        pixels[..., 0] = np.linspace(0, 255, width, dtype=np.uint8)[np.newaxis, :]
+        pixels[..., 1] = np.linspace(0, 255, height, dtype=np.uint8)[:, np.newaxis]
+    elif name == "black but one pixel":
+        pixels[height - 1, width - 1] = (255, 255, 255)
+    elif name == "gray":
+        pixels[:] = 128
+    PIL_Image.fromarray(pixels).save(filename)
+
+
+def _time(call: Callable[[], object], iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        call()
+    return (time.perf_counter() - start) / iterations
+
+
+def _time_decoding(filename: str, iterations: int) -> float:
+    def decode() -> None:
+        with PIL_Image.open(filename) as image:
+            image.load()
+
+    return _time(decode, iterations)
+
+
+def benchmark(iterations: int) -> bool:
+    all_ok = True
+    with tempfile.TemporaryDirectory() as directory:
+        for name, width, height, expected in IMAGE_CASES:
+            filename = os.path.join(directory, f"{name}.png")
+            _make_test_image(filename, name, width, height)
+
+            is_monochrome = image_is_monochrome(filename)
+            legacy_is_monochrome = legacy_image_is_monochrome(filename)
+            ok = is_monochrome == legacy_is_monochrome == expected
+            all_ok = all_ok and ok
+
+            detect_time = _time(partial(image_is_monochrome, filename), iterations)
+            legacy_time = _time(partial(legacy_image_is_monochrome, filename), 1)
+            decode_time = _time_decoding(filename, iterations)
+            print(
+                f"  {name} ({width}x{height}): {is_monochrome}"
+                f"{'' if ok else ' WRONG'}, "
+                f"{1000 * detect_time:.1f} ms (was {1000 * legacy_time:.0f} ms; "
+                f"decoding alone takes {1000 * decode_time:.1f} ms)"
+            )
+
+    print("All detections correct." if all_ok else "Some detections WRONG.")
+    return all_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="benchmark_monochrome_detection")
+    parser.add_argument(
+        "--iterations",
+        required=False,
+        default=10,
+        help="The number of times to repeat each detection, for timing.",
+    )
+    args = parser.parse_args()
+
+    if not benchmark(int(args.iterations)):
+        exit(1)
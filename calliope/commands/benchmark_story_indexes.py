@@ -0,0 +1,254 @@
+"""
+Shows the query plans of the common story and story frame queries, before and
+after adding the indexes of migration 2026-10-17T09:40:51:207815.
+
+Everything happens in temporary copies of the story and story_frame tables,
+seeded with synthetic data, which are dropped when the command finishes. The
+copies have the same names as the real tables, which they shadow for the
+duration of the transaction, so the migration's own index statements and the
+app's own queries run against them unchanged. The real tables are neither read
+nor modified.
+
+Usage:
+    python -m calliope.commands.benchmark_story_indexes --frames 100000
+"""
+
+import argparse
+import asyncio
+import json
+from typing import Any, Dict, List, Tuple
+
+from piccolo.engine import engine_finder
+
+from calliope.piccolo_migrations.calliope_2026_10_17t09_40_51_207815 import (
+    CREATE_INDEX_STATEMENTS,
+)
+from calliope.storage.state_manager import DEFAULT_STORIES_PAGE_SIZE
+from calliope.tables import Story
+
+# The queries to explain, as issued by the app, against the temporary tables.
+# Queries of later pages of stories take the cursor (date_updated, id, with
+# date_updated given twice) as arguments.
+BENCHMARK_QUERIES: List[Tuple[str, str]] = [
+    (
+        "Story frames in order (get_frames)",
+        """
+        SELECT * FROM story_frame
+        WHERE story = (SELECT id FROM story ORDER BY id LIMIT 1 OFFSET 17)
+        ORDER BY number
+        """,
+    ),
+    (
+        "Last frames of a story (get_text, max_frames < 0)",
+        """
+        SELECT text FROM story_frame
+        WHERE story = (SELECT id FROM story ORDER BY id LIMIT 1 OFFSET 17)
+            AND text IS NOT NULL AND text != ''
+        ORDER BY number DESC
+        LIMIT 5
+        """,
+    ),
+    (
+        "A single frame (bookmarks)",
+        """
+        SELECT * FROM story_frame
+        WHERE story = (SELECT id FROM story ORDER BY id LIMIT 1 OFFSET 17)
+            AND number = 3
+        """,
+    ),
+    (
+        "Frames not yet indexed for search (vector_manager._get_frames)",
+        """
+        SELECT * FROM story_frame
+        WHERE indexed_for_search = false
+        ORDER BY number
+        LIMIT 1000
+        """,
+    ),
+    (
+        "First page of a sparrow's stories (get_keyset_page)",
+        f"""
+        SELECT * FROM story
+        WHERE created_for_sparrow_id = 'sparrow-7'
+        ORDER BY date_updated DESC, id DESC
+        LIMIT {DEFAULT_STORIES_PAGE_SIZE + 1}
+        """,
+    ),
+    (
+        "Next page of a sparrow's stories (get_keyset_page, with a cursor)",
+        f"""
+        SELECT * FROM story
+        WHERE created_for_sparrow_id = 'sparrow-7'
+            AND (date_updated < {{}} OR (date_updated = {{}} AND id < {{}}))
+        ORDER BY date_updated DESC, id DESC
+        LIMIT {DEFAULT_STORIES_PAGE_SIZE + 1}
+        """,
+    ),
+]
+
+
+async def _seed(num_frames: int, frames_per_story: int, num_sparrows: int) -> None:
+    num_stories = max(1, num_frames // frames_per_story)
+
+    # LIKE copies the columns and defaults, but not the indexes (other than the
+    # primary keys, which the app's tables also have). Each LIKE is resolved
+    # before its temporary table exists, so it refers to the real table; after
+    # that, temporary tables take precedence over tables of the same name.
+    await Story.raw(
+        """
+        CREATE TEMPORARY TABLE story
+        (LIKE story INCLUDING DEFAULTS, PRIMARY KEY (id))
+        ON COMMIT DROP
+        """
+    ).run()
+    await Story.raw(
+        """
+        CREATE TEMPORARY TABLE story_frame
+        (LIKE story_frame INCLUDING DEFAULTS, PRIMARY KEY (id))
+        ON COMMIT DROP
+        """
+    ).run()
+
+    await Story.raw(
+        """
+        INSERT INTO story (
+            id, cuid, title, slug, created_for_sparrow_id, frame_count,
+            date_created, date_updated
+        )
+        SELECT
+            n,
+            'story-' || n,
+            'Story ' || n,
+            'story-' || n,
+            'sparrow-' || (n % {}),
+            {},
+            now() - n * interval '1 minute',
+            now() - n * interval '1 minute'
+        FROM generate_series(1, {}) AS n
+        """,
+        num_sparrows,
+        frames_per_story,
+        num_stories,
+    ).run()
+
+    # Frames are interleaved across stories, as they are when many sparrows are
+    # active at once. Older frames have been indexed for search.
+    await Story.raw(
+        """
+        INSERT INTO story_frame (
+            id, story, number, text, min_duration_seconds, indexed_for_search,
+            date_created, date_updated
+        )
+        SELECT
+            n,
+            (n % {}) + 1,
+            n / {},
+            'Frame ' || n || ' of a story.',
+            10,
+            n < {} * 0.95,
+            now(),
+            now()
+        FROM generate_series(0, {} - 1) AS n
+        """,
+        num_stories,
+        num_stories,
+        num_frames,
+        num_frames,
+    ).run()
+
+    await Story.raw("ANALYZE story").run()
+    await Story.raw("ANALYZE story_frame").run()
+
+
+async def _get_second_page_cursor() -> Tuple[Any, ...]:
+    # The last row of the first page, as encoded in its next_cursor.
+    rows = await Story.raw(
+        f"""
+        SELECT date_updated, id FROM story
+        WHERE created_for_sparrow_id = 'sparrow-7'
+        ORDER BY date_updated DESC, id DESC
+        LIMIT 1 OFFSET {DEFAULT_STORIES_PAGE_SIZE - 1}
+        """
+    ).run()
+    date_updated, story_id = rows[0]["date_updated"], rows[0]["id"]
+    return (date_updated, date_updated, story_id)
+
+
+async def _explain_all() -> Dict[str, Dict[str, Any]]:
+    cursor = await _get_second_page_cursor()
+    plans = {}
+    for name, query in BENCHMARK_QUERIES:
+        args = cursor if "{}" in query else ()
+        rows = await Story.raw(
+            f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {query}", *args
+        ).run()
+        plan = rows[0]["QUERY PLAN"]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plans[name] = plan[0]
+    return plans
+
+
+def _describe_plan(plan: Dict[str, Any]) -> str:
+    node = plan["Plan"]
+    node_types = []
+    nodes = [node]
+    while nodes:
+        node = nodes.pop(0)
+        description = node["Node Type"]
+        if node.get("Index Name"):
+            description += f" using {node['Index Name']}"
+        node_types.append(description)
+        nodes.extend(node.get("Plans", []))
+    return f"{plan['Execution Time']:9.3f} ms  " + " > ".join(node_types)
+
+
+async def benchmark(num_frames: int, frames_per_story: int, num_sparrows: int) -> None:
+    engine = engine_finder()
+    if not engine:
+        raise ValueError("No database engine configured.")
+
+    async with engine.transaction():
+        print(f"Seeding {num_frames} frames...")
+        await _seed(num_frames, frames_per_story, num_sparrows)
+
+        before = await _explain_all()
+
+        for statement in CREATE_INDEX_STATEMENTS:
+            await Story.raw(statement).run()
+        await Story.raw("ANALYZE story").run()
+        await Story.raw("ANALYZE story_frame").run()
+
+        after = await _explain_all()
+
+    for name, _ in BENCHMARK_QUERIES:
+        print(f"\n{name}")
+        print(f"  before: {_describe_plan(before[name])}")
+        print(f"  after:  {_describe_plan(after[name])}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="benchmark_story_indexes")
+    parser.add_argument(
+        "--frames",
+        required=False,
+        default=100000,
+        help="The number of story frames to seed.",
+    )
+    parser.add_argument(
+        "--frames_per_story",
+        required=False,
+        default=50,
+        help="The number of frames in each seeded story.",
+    )
+    parser.add_argument(
+        "--sparrows",
+        required=False,
+        default=100,
+        help="The number of sparrows for which the stories were created.",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(
+        benchmark(int(args.frames), int(args.frames_per_story), int(args.sparrows))
+    )
@@ -0,0 +1,167 @@
+"""
+Compares the local ephemeris (calliope/location/ephemeris.py) with the remote
+services it replaces, visibleplanets.dev and the USNO: how long each takes,
+and how closely their answers agree.
+
+Usage:
+    python -m calliope.commands.compare_ephemeris --iterations 100
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timezone
+import time
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+import httpx
+
+from calliope.location import ephemeris
+from calliope.location.astronomy import (
+    _fetch_night_sky_objects,
+    _fetch_solar_eclipse_of_the_day,
+)
+from calliope.models import NightSkyObjectModel, SolarEclipseModel
+
+
+# (Name, latitude, longitude.)
+SKY_LOCATIONS: List[Tuple[str, float, float]] = [
+    ("New York", 40.71, -74.01),
+    ("Sydney", -33.87, 151.21),
+    ("Reykjavik", 64.15, -21.94),
+    ("Nairobi", -1.29, 36.82),
+    ("Tokyo", 35.68, 139.69),
+]
+
+# (Name, local noon on the day of an eclipse, latitude, longitude, elevation.)
+ECLIPSE_CASES: List[Tuple[str, datetime, float, float, float]] = [
+    (
+        "Total, Dallas",
+        datetime(2024, 4, 8, 12, tzinfo=ZoneInfo("America/Chicago")),
+        32.78,
+        -96.80,
+        130,
+    ),
+    (
+        "Annular, Albuquerque",
+        datetime(2023, 10, 14, 12, tzinfo=ZoneInfo("America/Denver")),
+        35.08,
+        -106.65,
+        1500,
+    ),
+    (
+        "Partial (near totality), Madrid",
+        datetime(2026, 8, 12, 12, tzinfo=ZoneInfo("Europe/Madrid")),
+        40.42,
+        -3.70,
+        650,
+    ),
+    (
+        "None, Paris",
+        datetime(2024, 4, 8, 12, tzinfo=ZoneInfo("Europe/Paris")),
+        48.86,
+        2.35,
+        35,
+    ),
+]
+
+
+def _compare_skies(
+    local: List[NightSkyObjectModel], remote: List[NightSkyObjectModel]
+) -> str:
+    local_by_name = {sky_object.name: sky_object for sky_object in local}
+    remote_by_name = {
+        sky_object.name: sky_object for sky_object in remote if sky_object.above_horizon
+    }
+    lines = []
+    for name in sorted(set(local_by_name) | set(remote_by_name)):
+        local_object = local_by_name.get(name)
+        remote_object = remote_by_name.get(name)
+        if not local_object or not remote_object:
+            lines.append(
+                f"    {name}: only {'local' if local_object else 'remote'} has it "
+                "above the horizon"
+            )
+            continue
+        line = (
+            f"    {name}: magnitude {local_object.magnitude:+.2f} vs "
+            f"{remote_object.magnitude:+.2f}, "
+            f"{local_object.constellation} vs {remote_object.constellation}"
+        )
+        if local_object.phase is not None and remote_object.phase is not None:
+            line += f", phase {local_object.phase:.1f} vs {remote_object.phase:.1f}"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+def _describe_eclipse(eclipse: Optional[SolarEclipseModel]) -> str:
+    if not eclipse:
+        return "none"
+    return (
+        f"{eclipse.description}, {eclipse.start_time.strftime('%H:%M:%S')} - "
+        f"{eclipse.end_time.strftime('%H:%M:%S')}"
+    )
+
+
+async def compare(iterations: int) -> None:
+    timings: Dict[str, List[float]] = {"local": [], "remote": []}
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(30.0)) as httpx_client:
+        print("Night sky")
+        for name, latitude, longitude in SKY_LOCATIONS:
+            start = time.perf_counter()
+            remote = await _fetch_night_sky_objects(httpx_client, latitude, longitude)
+            timings["remote"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                local = ephemeris.get_night_sky_objects(latitude, longitude)
+            timings["local"].append((time.perf_counter() - start) / iterations)
+
+            print(f"  {name} (local vs remote):")
+            print(_compare_skies(local, remote))
+
+        print("\nSolar eclipses")
+        for name, when, latitude, longitude, elevation in ECLIPSE_CASES:
+            start = time.perf_counter()
+            remote_eclipse = await _fetch_solar_eclipse_of_the_day(
+                httpx_client, when, latitude, longitude, elevation
+            )
+            timings["remote"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for _ in range(iterations):
+                local_eclipse = ephemeris.get_solar_eclipse_of_the_day(
+                    when, latitude, longitude, elevation
+                )
+            timings["local"].append((time.perf_counter() - start) / iterations)
+
+            print(f"  {name}:")
+            print(f"    local:  {_describe_eclipse(local_eclipse)}")
+            print(f"    remote: {_describe_eclipse(remote_eclipse)}")
+            if local_eclipse and remote_eclipse:
+                start_difference = local_eclipse.start_time - remote_eclipse.start_time
+                end_difference = local_eclipse.end_time - remote_eclipse.end_time
+                print(
+                    f"    difference: start {start_difference.total_seconds():+.0f}s, "
+                    f"end {end_difference.total_seconds():+.0f}s"
+                )
+
+    print("\nMean time per lookup")
+    for source, source_timings in timings.items():
+        mean_ms = 1000 * sum(source_timings) / len(source_timings)
+        print(f"  {source}: {mean_ms:.2f} ms")
+    print(f"(At {datetime.now(timezone.utc).isoformat()}.)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="compare_ephemeris")
+    parser.add_argument(
+        "--iterations",
+        required=False,
+        default=100,
+        help="The number of times to repeat each local computation, for timing.",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(compare(int(args.iterations)))
@@ -31,6 +31,6 @@ async def add_story_thumbnails_endpoint(
             story.thumbnail_image = thumbnail_image
             thumb_count += 1
 
-            await story.save().run()
+            await story.save(columns=[Story.thumbnail_image]).run()
 
     return f"Found {story_count} stories. Set thumbnails for {thumb_count} of them."
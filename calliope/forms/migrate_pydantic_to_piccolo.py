@@ -211,6 +211,8 @@ async def copy_stories_to_piccolo() -> None:
             frame.story = story.id  # type: ignore[attr-defined]
             await frame.save().run()
 
+        await story.refresh_frame_count()
+
 
 async def copy_sparrow_states_to_piccolo() -> None:
     legacy_sparrow_states = list_legacy_sparrow_states()
@@ -7,7 +7,7 @@ from calliope.models import (
 
 
 async def audio_to_text_inference(
-    httpx_client: httpx.AsyncClient,
+    httpx_client: httpx.AsyncClient,  # noqa: ARG001
     input_audio_filename: str,
     language: str,
     keys: KeysModel,
@@ -16,7 +16,8 @@ async def audio_to_text_inference(
     Takes an audio file as input and produces text.
 
     Args:
-        httpx_client: the async HTTP session.
+        httpx_client: the async HTTP session (not used with OpenAI, whose
+            client has its own pool).
         input_audio_filename: the filename of the input audio.
         language: the expected language of the audio.
         keys: API keys, etc.
@@ -25,6 +26,4 @@ async def audio_to_text_inference(
         a string containing the transcribed text.
     """
 
-    return await openai_audio_to_text_inference(
-        httpx_client, input_audio_filename, language, keys
-    )
+    return await openai_audio_to_text_inference(input_audio_filename, language, keys)
@@ -1,14 +1,10 @@
-import httpx
-
-from openai import AsyncOpenAI
-
 from calliope.models import (
     KeysModel,
 )
+from calliope.utils.clients import get_openai_client
 
 
 async def openai_audio_to_text_inference(
-    httpx_client: httpx.AsyncClient,
     input_audio_filename: str,
     language: str,
     keys: KeysModel,
@@ -17,7 +13,6 @@ async def openai_audio_to_text_inference(
     Performs an audio->text inference using the OpenAI Whisper API.
 
     Args:
-        httpx_client: the async HTTP session.
         input_audio_filename: the name of a file containing the input audio.
         language: the expected language of the audio.
         keys: API keys, etc.
@@ -27,7 +22,7 @@ async def openai_audio_to_text_inference(
     """
 
     with open(input_audio_filename, "rb") as audio_file:
-        client = AsyncOpenAI(api_key=keys.openai_api_key, http_client=httpx_client)
+        client = get_openai_client(keys.openai_api_key)
         transcription = await client.audio.transcriptions.create(
             model="whisper-1",
             file=audio_file,
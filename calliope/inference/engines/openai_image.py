@@ -4,15 +4,14 @@ from typing import Any, Optional
 import httpx
 import aiofiles
 import openai
-from openai import AsyncOpenAI
 
 from calliope.models import KeysModel
 from calliope.tables import ModelConfig
+from calliope.utils.clients import get_openai_client
 from calliope.utils.file import decode_b64_to_file, encode_image_file_to_b64
 
 
 async def text_to_image_file_inference_openai(
-    httpx_client: httpx.AsyncClient,
     text: str,
     output_image_filename: str,
     model_config: ModelConfig,
@@ -24,7 +23,6 @@ async def text_to_image_file_inference_openai(
     Generate an image from a prompt using an OpenAI model (gpt-image-1, DALL-E 3, DALL-E 2).
 
     Args:
-        httpx_client: the async HTTP session.
         text: the input text, to be sent as a prompt.
         output_image_filename: the filename indicating where to write the
             generated image.
@@ -58,7 +56,7 @@ async def text_to_image_file_inference_openai(
         # (fastest, and fits our standard usecase)
         params["size"] = "1024x1024"
 
-    client = AsyncOpenAI(api_key=keys.openai_api_key, http_client=httpx_client)
+    client = get_openai_client(keys.openai_api_key)
 
     # openai_response = await openai.Image.acreate(**params)
     response = await client.images.generate(
@@ -1,8 +1,6 @@
 from typing import Any, cast, Dict, Iterable, TypeVar, Union
 
-import httpx
 from instructor import from_openai, Mode
-from openai import AsyncOpenAI
 from openai.types.chat import ChatCompletionMessageParam
 from pydantic import BaseModel
 
@@ -10,13 +8,13 @@ from calliope.models import (
     KeysModel,
 )
 from calliope.tables import ModelConfig
+from calliope.utils.clients import get_openai_client
 
 
 T = TypeVar("T", bound=Union[BaseModel, "Iterable[Any]"])
 
 
 async def openai_messages_to_object_inference(
-    httpx_client: httpx.AsyncClient,
     messages: list[ChatCompletionMessageParam],
     model_config: ModelConfig,
     keys: KeysModel,
@@ -26,7 +24,6 @@ async def openai_messages_to_object_inference(
     Performs a messages->object inference using an OpenAI-provided LLM.
 
     Args:
-        httpx_client: the async HTTP session.
         messages: the input messages.
         model_config: the ModelConfig with model and parameters.
         keys: API keys, etc.
@@ -51,7 +48,7 @@ async def openai_messages_to_object_inference(
         ),
     }
 
-    openai_client = AsyncOpenAI(api_key=keys.openai_api_key, http_client=httpx_client)
+    openai_client = get_openai_client(keys.openai_api_key)
     client = from_openai(openai_client)  # , mode=Mode.TOOLS_STRICT)
 
     response = await client.chat.completions.create(
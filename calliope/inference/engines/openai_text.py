@@ -1,17 +1,14 @@
 from typing import Any, cast, Dict
 
-import httpx
-from openai import AsyncOpenAI
-
 from calliope.models import (
     KeysModel,
     InferenceModelProviderVariant,
 )
 from calliope.tables import ModelConfig
+from calliope.utils.clients import get_openai_client
 
 
 async def openai_text_to_text_inference(
-    httpx_client: httpx.AsyncClient,
     text: str,
     model_config: ModelConfig,
     keys: KeysModel,
@@ -23,7 +20,6 @@ async def openai_text_to_text_inference(
     completion or chat completion API is used.
 
     Args:
-        httpx_client: the async HTTP session.
         text: the input text, to be sent as a prompt.
         model_config: the ModelConfig with model and parameters.
         keys: API keys, etc.
@@ -46,7 +42,7 @@ async def openai_text_to_text_inference(
         ),
     }
 
-    client = AsyncOpenAI(api_key=keys.openai_api_key, http_client=httpx_client)
+    client = get_openai_client(keys.openai_api_key)
 
     if (
         model.provider_api_variant
@@ -16,7 +16,7 @@ T = TypeVar("T", bound=Union[BaseModel, "Iterable[Any]"])
 
 
 async def messages_to_object_inference(
-    httpx_client: httpx.AsyncClient,
+    httpx_client: httpx.AsyncClient,  # noqa: ARG001
     messages: list[ChatCompletionMessageParam],
     model_config: ModelConfig,
     keys: KeysModel,
@@ -27,7 +27,8 @@ async def messages_to_object_inference(
     is supported.
 
     Args:
-        httpx_client: the async HTTP session.
+        httpx_client: the async HTTP session (not used with OpenAI, whose
+            client has its own pool).
         text: the input text, to be sent as a prompt.
         model_config: the ModelConfig with model and parameters.
         keys: API keys, etc.
@@ -43,7 +44,7 @@ async def messages_to_object_inference(
     if model.provider == InferenceModelProvider.OPENAI:
         print(f"text_to_text_inference.openai {model.provider_model_name}")
         response = await openai_messages_to_object_inference(
-            httpx_client, messages, model_config, keys, response_model
+            messages, model_config, keys, response_model
         )
         print(f'response="{response}"')
     else:
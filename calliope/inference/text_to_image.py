@@ -17,10 +17,8 @@ from calliope.models import (
     InferenceModelProvider,
     KeysModel,
 )
-from calliope.tables import (
-    InferenceModel,
-    ModelConfig,
-)
+from calliope.storage.config_registry import get_helper_model_config
+from calliope.tables import ModelConfig
 
 
 async def text_to_image_file_inference(
@@ -89,7 +87,6 @@ async def text_to_image_file_inference(
                     f"({width}x{height})"
                 )
                 return await text_to_image_file_inference_openai(
-                    httpx_client,
                     text,
                     output_image_filename,
                     model_config,
@@ -159,22 +156,7 @@ Here is the text to review:
 
 {text}
 """
-    model = (
-        await InferenceModel.objects()
-        .where(InferenceModel.slug == "openai-gpt-4o")
-        .first()
-        .output(load_json=True)
-        .run()
-    )
-    if model:
-        model_config = ModelConfig(
-            slug="gpt-4o-cleaner",
-            description="",
-            model_parameters={},
-            model=model,
-        )
-    else:
-        raise ValueError("No gpt-4o model found.")
+    model_config = await get_helper_model_config("gpt-4o-cleaner")
 
     # Use gpt-4o and the prompt above to clean up the text.
     try:
@@ -40,7 +40,7 @@ async def text_to_text_inference(
     elif model.provider == InferenceModelProvider.OPENAI:
         print(f"text_to_text_inference.openai {model.provider_model_name}")
         extended_text = await openai_text_to_text_inference(
-            httpx_client, text, model_config, keys
+            text, model_config, keys
         )
         print(f'extended_text="{extended_text}"')
     elif model.provider == InferenceModelProvider.REPLICATE:
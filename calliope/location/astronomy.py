@@ -1,7 +1,15 @@
 import httpx
-from datetime import date, datetime, timedelta
+from datetime import date, datetime, timedelta, timezone
 from typing import Any, cast, Dict, List, Optional, Tuple
 
+from calliope.location.cache import (
+    ECLIPSE_COORDINATE_PRECISION,
+    NIGHT_SKY_COORDINATE_PRECISION,
+    night_sky_cache,
+    round_coordinates,
+    solar_eclipse_cache,
+)
+from calliope.location import ephemeris
 from calliope.models import (
     Hemisphere,
     MAJOR_METEOR_SHOWERS,
@@ -9,6 +17,12 @@ from calliope.models import (
     NightSkyObjectModel,
     SolarEclipseModel
 )
+from calliope.settings import settings
+
+
+# Values of settings.EPHEMERIS_SOURCE.
+EPHEMERIS_SOURCE_LOCAL = "local"
+EPHEMERIS_SOURCE_REMOTE = "remote"
 
 
 def get_active_meteor_showers(
@@ -68,6 +82,23 @@ async def get_night_sky_objects(
     Returns:
         a NightSkyModel describing the objects currently in the night sky.
     """
+    if settings.EPHEMERIS_SOURCE == EPHEMERIS_SOURCE_LOCAL:
+        return ephemeris.get_night_sky_objects(latitude, longitude)
+
+    latitude, longitude = round_coordinates(
+        latitude, longitude, NIGHT_SKY_COORDINATE_PRECISION
+    )
+    return await night_sky_cache.get(
+        (latitude, longitude),
+        lambda: _fetch_night_sky_objects(httpx_client, latitude, longitude),
+    )
+
+
+async def _fetch_night_sky_objects(
+    httpx_client: httpx.AsyncClient,
+    latitude: float,
+    longitude: float
+) -> List[NightSkyObjectModel]:
     api_url = (
         f"https://api.visibleplanets.dev/v3/?latitude={latitude}&longitude={longitude}"
         # &time=2023-10-13T15:57:44Z
@@ -110,20 +141,11 @@ def _parse_eclipse_response(
             for entry in local_data:
                 phenomenon = entry.get("phenomenon")
                 time = cast(Optional[str], entry.get("time"))
-                start_time = end_time = None
                 if time:
                     if phenomenon == "Eclipse Begins":
-                        start_time = datetime.combine(
-                            when.date(),
-                            datetime.strptime(time, "%H:%M:%S.%f").time(),
-                            when.tzinfo
-                        )
+                        start_time = _parse_eclipse_time(when, time)
                     elif phenomenon == "Eclipse Ends":
-                        end_time = datetime.combine(
-                            when.date(),
-                            datetime.strptime(time, "%H:%M:%S.%f").time(),
-                            when.tzinfo
-                        )
+                        end_time = _parse_eclipse_time(when, time)
             if start_time and end_time:
                 return SolarEclipseModel(
                     description=description,
@@ -133,6 +155,17 @@ def _parse_eclipse_response(
     return None
 
 
+def _parse_eclipse_time(when: datetime, time: str) -> datetime:
+    """
+    Parses a time of day from the USNO, which is in UT, into local time.
+    """
+    return datetime.combine(
+        when.date(),
+        datetime.strptime(time, "%H:%M:%S.%f").time(),
+        timezone.utc,
+    ).astimezone(when.tzinfo)
+
+
 async def get_solar_eclipse_of_the_day(
     httpx_client: httpx.AsyncClient,
     when: datetime,
@@ -155,20 +188,50 @@ async def get_solar_eclipse_of_the_day(
         a SolarEclipseModel about the eclipse, if any, else None.
     """
 
-    day = when.date().strftime("%Y-%m-%d")
-    api_url = (
-        "https://aa.usno.navy.mil/api/eclipses/solar/date"
-        f"?date={day}&coords={latitude},{longitude}&height={int(elevation)}"
+    latitude, longitude = round_coordinates(
+        latitude, longitude, ECLIPSE_COORDINATE_PRECISION
     )
-
     eclipse: Optional[SolarEclipseModel] = None
 
     try:
-        response = await httpx_client.get(api_url)
-        json_response = response.json()
-        if json_response:
-            eclipse = _parse_eclipse_response(when, json_response)
+        eclipse = await solar_eclipse_cache.get(
+            (latitude, longitude, when.date(), str(when.tzinfo)),
+            lambda: (
+                _compute_solar_eclipse_of_the_day(when, latitude, longitude, elevation)
+                if settings.EPHEMERIS_SOURCE == EPHEMERIS_SOURCE_LOCAL
+                else _fetch_solar_eclipse_of_the_day(
+                    httpx_client, when, latitude, longitude, elevation
+                )
+            ),
+        )
     except Exception as e:
         print(f"Unable to get eclipse data: {e}")
 
     return eclipse
+
+
+async def _fetch_solar_eclipse_of_the_day(
+    httpx_client: httpx.AsyncClient,
+    when: datetime,
+    latitude: float,
+    longitude: float,
+    elevation: float,
+) -> Optional[SolarEclipseModel]:
+    day = when.date().strftime("%Y-%m-%d")
+    api_url = (
+        "https://aa.usno.navy.mil/api/eclipses/solar/date"
+        f"?date={day}&coords={latitude},{longitude}&height={int(elevation)}"
+    )
+
+    response = await httpx_client.get(api_url)
+    json_response = response.json()
+    return _parse_eclipse_response(when, json_response) if json_response else None
+
+
+async def _compute_solar_eclipse_of_the_day(
+    when: datetime,
+    latitude: float,
+    longitude: float,
+    elevation: float,
+) -> Optional[SolarEclipseModel]:
+    return ephemeris.get_solar_eclipse_of_the_day(when, latitude, longitude, elevation)
@@ -0,0 +1,203 @@
+"""
+Caches for the location services called while enriching a frame request.
+
+Sparrows in a flock usually share an IP address, and rarely move, so nearly
+every lookup repeats a recent one. Each service gets its own cache with its
+own lifetimes:
+
+- the server's public IP address, for an hour.
+- geo-IP (from ip-api), by IP address, for hours.
+- weather and the night sky, by rounded latitude and longitude, for one
+  15-minute window.
+- solar eclipses, by rounded latitude and longitude and local date.
+
+Entries are served stale-while-revalidate: once an entry is past its fresh
+lifetime but not yet expired, it's returned at once while a fresh value is
+fetched in the background. Only a cold miss waits on the service, and
+concurrent misses for the same key share a single call.
+"""
+
+import asyncio
+import sys
+import time
+import traceback
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Set,
+    Tuple,
+    TypeVar,
+)
+
+from cachetools import TTLCache
+
+from calliope.utils.single_flight import SingleFlight
+
+
+ValueT = TypeVar("ValueT")
+
+# The number of decimal places to which coordinates are rounded in cache keys.
+# Two places is about a kilometer; one is about ten.
+WEATHER_COORDINATE_PRECISION = 2
+NIGHT_SKY_COORDINATE_PRECISION = 1
+ECLIPSE_COORDINATE_PRECISION = 1
+
+
+class LocationCache(Generic[ValueT]):
+    """
+    A stale-while-revalidate cache of the results of one location service.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fresh_seconds: float,
+        max_stale_seconds: float,
+        maxsize: int = 1024,
+    ) -> None:
+        """
+        Args:
+            name: the name of the cache, for logs and stats.
+            fresh_seconds: how long an entry is served without being refreshed.
+            max_stale_seconds: how much longer an entry may be served (while
+                being refreshed) before it expires.
+            maxsize: the maximum number of entries.
+        """
+        self.name = name
+        self.fresh_seconds = fresh_seconds
+
+        # Each entry is (value, time fetched).
+        self._entries: TTLCache = TTLCache(
+            maxsize=maxsize, ttl=fresh_seconds + max_stale_seconds
+        )
+        self._fetches: SingleFlight = SingleFlight()
+        self._refreshing: Set[Hashable] = set()
+        # Keep references to background refreshes, so they aren't collected.
+        self._refresh_tasks: Set[asyncio.Task] = set()
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    async def get(
+        self, key: Hashable, fetch: Callable[[], Awaitable[ValueT]]
+    ) -> ValueT:
+        """
+        Gets the cached value for the given key, fetching it if needed.
+
+        Args:
+            key: the cache key.
+            fetch: makes a coroutine that fetches the value. If it raises, nothing
+                is cached and the exception propagates (unless a stale value is
+                being refreshed, in which case it's logged).
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            if time.monotonic() - fetched_at < self.fresh_seconds:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh(key, fetch)
+            return value
+
+        self.misses += 1
+        return await self._fetches.do(key, lambda: self._fetch(key, fetch))
+
+    async def _fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[ValueT]]
+    ) -> ValueT:
+        value = await fetch()
+        self._entries[key] = (value, time.monotonic())
+        return value
+
+    def _refresh(self, key: Hashable, fetch: Callable[[], Awaitable[ValueT]]) -> None:
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+
+        async def refresh() -> None:
+            try:
+                self._entries[key] = (await fetch(), time.monotonic())
+            except Exception:
+                self.refresh_errors += 1
+                print(f"Error refreshing {self.name} cache entry {key}:")
+                traceback.print_exc(file=sys.stderr)
+            finally:
+                self._refreshing.discard(key)
+
+        task = asyncio.create_task(refresh())
+        self._refresh_tasks.add(task)
+        task.add_done_callback(self._refresh_tasks.discard)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "coalesced_misses": self._fetches.coalesced,
+            "refresh_errors": self.refresh_errors,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / lookups, 3) if lookups else None
+            ),
+            "size": len(self._entries),
+        }
+
+
+# The server's own public IP address, for clients on private networks.
+public_ip_cache: LocationCache = LocationCache(
+    "public_ip", fresh_seconds=60 * 60, max_stale_seconds=23 * 60 * 60
+)
+ip_location_cache: LocationCache = LocationCache(
+    "ip_location", fresh_seconds=6 * 60 * 60, max_stale_seconds=18 * 60 * 60
+)
+weather_cache: LocationCache = LocationCache(
+    "weather", fresh_seconds=15 * 60, max_stale_seconds=45 * 60
+)
+night_sky_cache: LocationCache = LocationCache(
+    "night_sky", fresh_seconds=15 * 60, max_stale_seconds=15 * 60
+)
+# Keyed by date, so an entry never goes out of date, just out of use.
+solar_eclipse_cache: LocationCache = LocationCache(
+    "solar_eclipse", fresh_seconds=24 * 60 * 60, max_stale_seconds=0
+)
+
+LOCATION_CACHES = (
+    public_ip_cache,
+    ip_location_cache,
+    weather_cache,
+    night_sky_cache,
+    solar_eclipse_cache,
+)
+
+
+def round_coordinates(
+    latitude: float, longitude: float, precision: int
+) -> Tuple[float, float]:
+    """
+    Rounds a location for use in a cache key (and in the lookup itself, so the
+    cached value is for the place the key describes).
+    """
+    return round(latitude, precision), round(longitude, precision)
+
+
+def get_location_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Gets the hit and miss counts of each location cache.
+    """
+    return {cache.name: cache.stats for cache in LOCATION_CACHES}
+
+
+def clear_location_caches() -> None:
+    for cache in LOCATION_CACHES:
+        cache.clear()
@@ -0,0 +1,637 @@
+"""
+A local ephemeris: where the Sun, the Moon, and the planets are, computed on
+the box rather than fetched from visibleplanets.dev and the USNO.
+
+Positions come from the usual low-precision methods, vectorized with NumPy:
+
+- the Sun and the Moon from the truncated series of Meeus, "Astronomical
+  Algorithms" (2nd ed.), chapters 25 and 47, good to well under an arcminute;
+- the planets from JPL's Keplerian elements for 1800-2050 (Standish,
+  "Approximate Positions of the Planets"), good to about an arcminute for the
+  inner planets and a few for the outer ones.
+
+That's plenty to say what's in the sky tonight, and to time a solar eclipse
+to within a minute or so.
+
+Constellations are found from ecliptic longitude alone, using where the
+ecliptic crosses each zodiacal constellation, since everything listed keeps
+close to the ecliptic.
+"""
+
+from datetime import datetime, time, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from calliope.models import NightSkyObjectModel, SolarEclipseModel
+
+
+# Days from the Unix epoch to J2000.0 (2000-01-01 12:00 TT).
+UNIX_EPOCH_TO_J2000_DAYS = 10957.5
+# TT - UT, in seconds. (About 69s in the 2020s.)
+DELTA_T_SECONDS = 69.0
+
+EARTH_EQUATORIAL_RADIUS_KM = 6378.14
+EARTH_FLATTENING_RATIO = 0.99664719
+AU_KM = 149597870.7
+SUN_RADIUS_KM = 696000.0
+MOON_RADIUS_KM = 1737.4
+
+# The altitude at which the Sun's upper limb appears on the horizon, allowing
+# for refraction.
+SUNRISE_ALTITUDE_DEGREES = -0.833
+
+# The faintest magnitude visible to the naked eye.
+NAKED_EYE_MAGNITUDE = 6.0
+
+# The time step when searching a day for an eclipse, in seconds.
+ECLIPSE_SEARCH_STEP_SECONDS = 60
+
+PLANET_NAMES = ("Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune")
+
+# Keplerian elements and their rates per Julian century, relative to the mean
+# ecliptic and equinox of J2000: semi-major axis (AU), eccentricity,
+# inclination, mean longitude, longitude of perihelion, and longitude of the
+# ascending node (degrees). The first row is the Earth-Moon barycenter.
+PLANET_ELEMENTS = np.array(
+    [
+        [1.00000261, 0.01671123, -0.00001531, 100.46457166, 102.93768193, 0.0],
+        [0.38709927, 0.20563593, 7.00497902, 252.25032350, 77.45779628, 48.33076593],
+        [0.72333566, 0.00677672, 3.39467605, 181.97909950, 131.60246718, 76.67984255],
+        [1.52371034, 0.09339410, 1.84969142, -4.55343205, -23.94362959, 49.55953891],
+        [5.20288700, 0.04838624, 1.30439695, 34.39644051, 14.72847983, 100.47390909],
+        [9.53667594, 0.05386179, 2.48599187, 49.95424423, 92.59887831, 113.66242448],
+        [19.18916464, 0.04725744, 0.77263783, 313.23810451, 170.95427630, 74.01692503],
+        [30.06992276, 0.00859048, 1.77004347, -55.12002969, 44.96476227, 131.78422574],
+    ]
+)
+PLANET_ELEMENT_RATES = np.array(
+    [
+        [0.00000562, -0.00004392, -0.01294668, 35999.37244981, 0.32327364, 0.0],
+        [0.00000037, 0.00001906, -0.00594749, 149472.67411175, 0.16047689, -0.12534081],
+        [0.00000390, -0.00004107, -0.00078890, 58517.81538729, 0.00268329, -0.27769418],
+        [0.00001847, 0.00007882, -0.00813131, 19140.30268499, 0.44441088, -0.29257343],
+        [-0.00011607, -0.00013253, -0.00183714, 3034.74612775, 0.21252668, 0.20469106],
+        [-0.00125060, -0.00050991, 0.00193609, 1222.49362201, -0.41897216, -0.28867794],
+        [-0.00196176, -0.00004397, -0.00242939, 428.48202785, 0.40805281, 0.04240589],
+        [0.00026291, 0.00005105, 0.00035372, 218.45945325, -0.32241464, -0.00508664],
+    ]
+)
+
+# Visual magnitude of each planet as a function of its distances from the Sun
+# and the Earth and its phase angle a (degrees): H + 5 log10(r * delta) +
+# c1 * a + c2 * a^2 + c3 * a^3. (Explanatory Supplement to the Astronomical
+# Almanac, 1992. Saturn's rings are ignored.)
+PLANET_MAGNITUDE_COEFFICIENTS = np.array(
+    [
+        [-0.42, 0.0380, -0.000273, 0.000002],
+        [-4.40, 0.0009, 0.000239, -0.00000065],
+        [-1.52, 0.016, 0.0, 0.0],
+        [-9.40, 0.005, 0.0, 0.0],
+        [-8.88, 0.0, 0.0, 0.0],
+        [-7.19, 0.0, 0.0, 0.0],
+        [-6.87, 0.0, 0.0, 0.0],
+    ]
+)
+
+# The periodic terms of the Moon's longitude (1e-6 degrees) and distance
+# (1e-3 km): multiples of D, M, M', and F, then the coefficients of sin and cos.
+MOON_LONGITUDE_DISTANCE_TERMS = np.array(
+    [
+        [0, 0, 1, 0, 6288774, -20905355],
+        [2, 0, -1, 0, 1274027, -3699111],
+        [2, 0, 0, 0, 658314, -2955968],
+        [0, 0, 2, 0, 213618, -569925],
+        [0, 1, 0, 0, -185116, 48888],
+        [0, 0, 0, 2, -114332, -3149],
+        [2, 0, -2, 0, 58793, 246158],
+        [2, -1, -1, 0, 57066, -152138],
+        [2, 0, 1, 0, 53322, -170733],
+        [2, -1, 0, 0, 45758, -204586],
+        [0, 1, -1, 0, -40923, -129620],
+        [1, 0, 0, 0, -34720, 108743],
+        [0, 1, 1, 0, -30383, 104755],
+        [2, 0, 0, -2, 15327, 10321],
+        [0, 0, 1, 2, -12528, 0],
+        [0, 0, 1, -2, 10980, 79661],
+        [4, 0, -1, 0, 10675, -34782],
+        [0, 0, 3, 0, 10034, -23210],
+        [4, 0, -2, 0, 8548, -21636],
+        [2, 1, -1, 0, -7888, 24208],
+        [2, 1, 0, 0, -6766, 30824],
+        [1, 0, -1, 0, -5163, -8379],
+        [1, 1, 0, 0, 4987, -16675],
+        [2, -1, 1, 0, 4036, -12831],
+        [2, 0, 2, 0, 3994, -10445],
+        [4, 0, 0, 0, 3861, -11650],
+        [2, 0, -3, 0, 3665, 14403],
+        [0, 1, -2, 0, -2689, -7003],
+        [2, 0, -1, 2, -2602, 0],
+        [2, -1, -2, 0, 2390, 10056],
+        [1, 0, 1, 0, -2348, 6322],
+        [2, -2, 0, 0, 2236, -9884],
+    ]
+)
+
+# The periodic terms of the Moon's latitude (1e-6 degrees): multiples of D, M,
+# M', and F, then the coefficient of sin.
+MOON_LATITUDE_TERMS = np.array(
+    [
+        [0, 0, 0, 1, 5128122],
+        [0, 0, 1, 1, 280602],
+        [0, 0, 1, -1, 277693],
+        [2, 0, 0, -1, 173237],
+        [2, 0, -1, 1, 55413],
+        [2, 0, -1, -1, 46271],
+        [2, 0, 0, 1, 32573],
+        [0, 0, 2, 1, 17198],
+        [2, 0, 1, -1, 9266],
+        [0, 0, 2, -1, 8822],
+        [2, -1, 0, -1, 8216],
+        [2, 0, -2, -1, 4324],
+        [2, 0, 1, 1, 4200],
+        [2, 1, 0, -1, -3359],
+        [2, -1, -1, 1, 2463],
+        [2, -1, 0, 1, 2211],
+        [2, -1, -1, -1, 2065],
+        [0, 1, -1, -1, -1870],
+        [4, 0, -1, -1, 1828],
+        [0, 1, 0, 1, -1794],
+    ]
+)
+
+# Where the ecliptic enters each zodiacal constellation, as J2000 ecliptic
+# longitude in degrees.
+CONSTELLATION_BOUNDARIES = (
+    (29.09, "Aries"),
+    (53.47, "Taurus"),
+    (90.43, "Gemini"),
+    (118.26, "Cancer"),
+    (138.18, "Leo"),
+    (174.15, "Virgo"),
+    (218.02, "Libra"),
+    (241.10, "Scorpius"),
+    (247.70, "Ophiuchus"),
+    (266.30, "Sagittarius"),
+    (299.70, "Capricornus"),
+    (327.90, "Aquarius"),
+    (351.65, "Pisces"),
+)
+_CONSTELLATION_LONGITUDES = np.array([b[0] for b in CONSTELLATION_BOUNDARIES])
+_CONSTELLATION_NAMES = [b[1] for b in CONSTELLATION_BOUNDARIES]
+
+# General precession in longitude, in degrees per Julian century.
+PRECESSION_DEGREES_PER_CENTURY = 1.3970
+
+
+def get_night_sky_objects(
+    latitude: float,
+    longitude: float,
+    when: Optional[datetime] = None,
+) -> List[NightSkyObjectModel]:
+    """
+    Lists the Sun, Moon, and planets above the horizon at a given location.
+
+    Args:
+        latitude: the latitude of the point of interest.
+        longitude: the longitude of the point of interest.
+        when: the time, by default now.
+
+    Returns:
+        the objects above the horizon.
+    """
+    when = when or datetime.now(timezone.utc)
+    days = _days_since_j2000(np.array([when.timestamp()]))
+    centuries = days / 36525.0
+
+    sun_vector, sun_longitude = _sun_vector(centuries)
+    moon_vector, moon_longitude = _moon_vector(centuries)
+    planet_vectors, planet_longitudes, planet_magnitudes = _planet_vectors(
+        float(centuries[0])
+    )
+
+    # (Rows: Sun, Moon, then the planets.)
+    vectors = np.vstack([sun_vector, moon_vector, planet_vectors])
+    ecliptic_longitudes = np.concatenate(
+        [
+            sun_longitude - PRECESSION_DEGREES_PER_CENTURY * centuries,
+            moon_longitude - PRECESSION_DEGREES_PER_CENTURY * centuries,
+            planet_longitudes,
+        ]
+    )
+
+    elongation = float(np.mod(moon_longitude - sun_longitude, 360.0)[0])
+    moon_phase_angle = abs(180.0 - elongation)
+    magnitudes = np.concatenate(
+        [
+            [-26.74],
+            [-12.73 + 0.026 * moon_phase_angle + 4e-9 * moon_phase_angle**4],
+            planet_magnitudes,
+        ]
+    )
+
+    altitudes = _topocentric_altitudes(vectors, days, latitude, longitude, 0.0)
+    constellations = _get_constellations(ecliptic_longitudes)
+
+    objects = []
+    for index, name in enumerate(("Sun", "Moon") + PLANET_NAMES):
+        if altitudes[index] <= 0:
+            continue
+        magnitude = round(float(magnitudes[index]), 2)
+        objects.append(
+            NightSkyObjectModel(
+                name=f"The {name}" if name in ("Sun", "Moon") else name,
+                constellation=constellations[index],
+                above_horizon=True,
+                magnitude=magnitude,
+                naked_eye_object=magnitude <= NAKED_EYE_MAGNITUDE,
+                phase=round(elongation / 3.6, 1) if name == "Moon" else None,
+            )
+        )
+    return objects
+
+
+def get_solar_eclipse_of_the_day(
+    when: datetime,
+    latitude: float,
+    longitude: float,
+    elevation: float,
+) -> Optional[SolarEclipseModel]:
+    """
+    If a solar eclipse can be seen on the given (local) day at the given
+    location, describes it and gives its local start and end times (or
+    sunrise or sunset, if the Sun rises or sets eclipsed).
+
+    Args:
+        when: the datetime we're asking about, in local time.
+        latitude: the latitude of the point of interest.
+        longitude: the longitude of the point of interest.
+        elevation: the elevation in meters of the point of interest.
+
+    Returns:
+        a SolarEclipseModel about the eclipse, if any, else None.
+    """
+    day_start = datetime.combine(when.date(), time(0), when.tzinfo or timezone.utc)
+    timestamps = day_start.timestamp() + np.arange(
+        0, 24 * 60 * 60 + 1, ECLIPSE_SEARCH_STEP_SECONDS, dtype=float
+    )
+    days = _days_since_j2000(timestamps)
+    centuries = days / 36525.0
+
+    sun_vector, _ = _sun_vector(centuries)
+    moon_vector, _ = _moon_vector(centuries)
+    observer_vector, zenith = _observer_vectors(days, latitude, longitude, elevation)
+    sun_vector = sun_vector - observer_vector
+    moon_vector = moon_vector - observer_vector
+
+    sun_distance = np.linalg.norm(sun_vector, axis=1)
+    moon_distance = np.linalg.norm(moon_vector, axis=1)
+    separation = np.arctan2(
+        np.linalg.norm(np.cross(sun_vector, moon_vector), axis=1),
+        np.einsum("ij,ij->i", sun_vector, moon_vector),
+    )
+    sun_semidiameter = np.arcsin(SUN_RADIUS_KM / sun_distance)
+    moon_semidiameter = np.arcsin(MOON_RADIUS_KM / moon_distance)
+    sun_altitude = np.degrees(
+        np.arcsin(np.einsum("ij,ij->i", sun_vector, zenith) / sun_distance)
+    )
+
+    # Positive while the discs overlap and the Sun is up.
+    visibility = np.minimum(
+        np.degrees(sun_semidiameter + moon_semidiameter - separation),
+        sun_altitude - SUNRISE_ALTITUDE_DEGREES,
+    )
+    eclipsed = np.flatnonzero(visibility > 0)
+    if not len(eclipsed):
+        return None
+
+    first, last = eclipsed[0], eclipsed[-1]
+    start_timestamp = _interpolate_crossing(timestamps, visibility, first - 1, first)
+    end_timestamp = _interpolate_crossing(timestamps, visibility, last, last + 1)
+
+    greatest = eclipsed[np.argmin(separation[eclipsed])]
+    if moon_semidiameter[greatest] >= sun_semidiameter[greatest] + separation[greatest]:
+        kind = "Total"
+    elif separation[greatest] + moon_semidiameter[greatest] <= sun_semidiameter[greatest]:
+        kind = "Annular"
+    else:
+        kind = "Partial"
+
+    tz = when.tzinfo or timezone.utc
+    return SolarEclipseModel(
+        description=f"{kind} Solar Eclipse of {when.date().strftime('%Y %B %d')}",
+        start_time=datetime.fromtimestamp(start_timestamp, tz),
+        end_time=datetime.fromtimestamp(end_timestamp, tz),
+    )
+
+
+def _days_since_j2000(timestamps: np.ndarray) -> np.ndarray:
+    """
+    Converts Unix timestamps (UT) to days (TT) since J2000.0.
+    """
+    return (timestamps + DELTA_T_SECONDS) / 86400.0 - UNIX_EPOCH_TO_J2000_DAYS
+
+
+def _nutation_in_longitude(centuries: np.ndarray) -> np.ndarray:
+    """
+    The main terms of the nutation in longitude, in degrees.
+    """
+    node = np.radians(125.04452 - 1934.136261 * centuries)
+    sun_mean_longitude = np.radians(280.4665 + 36000.7698 * centuries)
+    return (-17.20 * np.sin(node) - 1.32 * np.sin(2 * sun_mean_longitude)) / 3600.0
+
+
+def _obliquity(centuries: np.ndarray) -> np.ndarray:
+    """
+    The obliquity of the ecliptic, in radians.
+    """
+    node = np.radians(125.04 - 1934.136 * centuries)
+    return np.radians(23.439291 - 0.0130042 * centuries + 0.00256 * np.cos(node))
+
+
+def _ecliptic_to_equatorial_vectors(
+    longitude: np.ndarray,
+    latitude: np.ndarray,
+    distance: np.ndarray,
+    obliquity: np.ndarray,
+) -> np.ndarray:
+    """
+    Converts ecliptic coordinates (radians, and any unit of distance) to
+    equatorial cartesian vectors, one per row.
+    """
+    x = distance * np.cos(latitude) * np.cos(longitude)
+    y = distance * np.cos(latitude) * np.sin(longitude)
+    z = distance * np.sin(latitude)
+    return np.stack(
+        [
+            x,
+            y * np.cos(obliquity) - z * np.sin(obliquity),
+            y * np.sin(obliquity) + z * np.cos(obliquity),
+        ],
+        axis=-1,
+    )
+
+
+def _sun_vector(centuries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The geocentric equatorial vector (km) and apparent ecliptic longitude
+    (degrees) of the Sun.
+    """
+    mean_longitude = 280.46646 + 36000.76983 * centuries + 0.0003032 * centuries**2
+    mean_anomaly = np.radians(
+        357.52911 + 35999.05029 * centuries - 0.0001537 * centuries**2
+    )
+    eccentricity = 0.016708634 - 0.000042037 * centuries
+    center = (
+        (1.914602 - 0.004817 * centuries - 0.000014 * centuries**2)
+        * np.sin(mean_anomaly)
+        + (0.019993 - 0.000101 * centuries) * np.sin(2 * mean_anomaly)
+        + 0.000289 * np.sin(3 * mean_anomaly)
+    )
+    true_anomaly = mean_anomaly + np.radians(center)
+    distance_au = (
+        1.000001018
+        * (1 - eccentricity**2)
+        / (1 + eccentricity * np.cos(true_anomaly))
+    )
+
+    # (With aberration, and nutation.)
+    longitude = (
+        mean_longitude + center - 0.00569 + _nutation_in_longitude(centuries)
+    )
+
+    vector = _ecliptic_to_equatorial_vectors(
+        np.radians(longitude),
+        np.zeros_like(centuries),
+        distance_au * AU_KM,
+        _obliquity(centuries),
+    )
+    return vector, np.mod(longitude, 360.0)
+
+
+def _moon_vector(centuries: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The geocentric equatorial vector (km) and apparent ecliptic longitude
+    (degrees) of the Moon.
+    """
+    t = centuries
+    mean_longitude = 218.3164477 + 481267.88123421 * t - 0.0015786 * t**2
+    elongation = np.radians(297.8501921 + 445267.1114034 * t - 0.0018819 * t**2)
+    sun_anomaly = np.radians(357.5291092 + 35999.0502909 * t - 0.0001536 * t**2)
+    moon_anomaly = np.radians(134.9633964 + 477198.8675055 * t + 0.0087414 * t**2)
+    latitude_argument = np.radians(93.2720950 + 483202.0175233 * t - 0.0036539 * t**2)
+    a1 = np.radians(119.75 + 131.849 * t)
+    a2 = np.radians(53.09 + 479264.290 * t)
+    a3 = np.radians(313.45 + 481266.484 * t)
+    eccentricity = 1 - 0.002516 * t - 0.0000074 * t**2
+    mean_longitude_radians = np.radians(mean_longitude)
+
+    fundamentals = np.stack(
+        [elongation, sun_anomaly, moon_anomaly, latitude_argument], axis=-1
+    )
+
+    def periodic_terms(multiples: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        arguments = fundamentals @ multiples[:, :4].T
+        # Terms involving the Sun's anomaly shrink as the Earth's orbit becomes
+        # less eccentric.
+        eccentricity_factors = eccentricity[:, np.newaxis] ** np.abs(multiples[:, 1])
+        return arguments, eccentricity_factors
+
+    arguments, factors = periodic_terms(MOON_LONGITUDE_DISTANCE_TERMS)
+    longitude_sum = (
+        (MOON_LONGITUDE_DISTANCE_TERMS[:, 4] * factors * np.sin(arguments)).sum(axis=1)
+        + 3958 * np.sin(a1)
+        + 1962 * np.sin(mean_longitude_radians - latitude_argument)
+        + 318 * np.sin(a2)
+    )
+    distance_sum = (
+        MOON_LONGITUDE_DISTANCE_TERMS[:, 5] * factors * np.cos(arguments)
+    ).sum(axis=1)
+
+    arguments, factors = periodic_terms(MOON_LATITUDE_TERMS)
+    latitude_sum = (
+        (MOON_LATITUDE_TERMS[:, 4] * factors * np.sin(arguments)).sum(axis=1)
+        - 2235 * np.sin(mean_longitude_radians)
+        + 382 * np.sin(a3)
+        + 175 * np.sin(a1 - latitude_argument)
+        + 175 * np.sin(a1 + latitude_argument)
+        + 127 * np.sin(mean_longitude_radians - moon_anomaly)
+        - 115 * np.sin(mean_longitude_radians + moon_anomaly)
+    )
+
+    longitude = (
+        mean_longitude + longitude_sum / 1e6 + _nutation_in_longitude(centuries)
+    )
+    latitude = latitude_sum / 1e6
+    distance_km = 385000.56 + distance_sum / 1000.0
+
+    vector = _ecliptic_to_equatorial_vectors(
+        np.radians(longitude),
+        np.radians(latitude),
+        distance_km,
+        _obliquity(centuries),
+    )
+    return vector, np.mod(longitude, 360.0)
+
+
+def _planet_vectors(centuries: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    The geocentric equatorial vectors (km), J2000 ecliptic longitudes (degrees),
+    and visual magnitudes of the planets.
+    """
+    elements = PLANET_ELEMENTS + PLANET_ELEMENT_RATES * centuries
+    semi_major_axis, eccentricity = elements[:, 0], elements[:, 1]
+    inclination, mean_longitude, perihelion, node = np.radians(elements[:, 2:]).T
+
+    argument_of_perihelion = perihelion - node
+    mean_anomaly = np.mod(mean_longitude - perihelion + np.pi, 2 * np.pi) - np.pi
+
+    # Solve Kepler's equation, for all the planets at once.
+    eccentric_anomaly = mean_anomaly + eccentricity * np.sin(mean_anomaly)
+    for _ in range(6):
+        eccentric_anomaly -= (
+            eccentric_anomaly - eccentricity * np.sin(eccentric_anomaly) - mean_anomaly
+        ) / (1 - eccentricity * np.cos(eccentric_anomaly))
+
+    orbital_x = semi_major_axis * (np.cos(eccentric_anomaly) - eccentricity)
+    orbital_y = (
+        semi_major_axis * np.sqrt(1 - eccentricity**2) * np.sin(eccentric_anomaly)
+    )
+
+    cos_w, sin_w = np.cos(argument_of_perihelion), np.sin(argument_of_perihelion)
+    cos_n, sin_n = np.cos(node), np.sin(node)
+    cos_i, sin_i = np.cos(inclination), np.sin(inclination)
+    heliocentric = np.stack(
+        [
+            (cos_w * cos_n - sin_w * sin_n * cos_i) * orbital_x
+            + (-sin_w * cos_n - cos_w * sin_n * cos_i) * orbital_y,
+            (cos_w * sin_n + sin_w * cos_n * cos_i) * orbital_x
+            + (-sin_w * sin_n + cos_w * cos_n * cos_i) * orbital_y,
+            sin_w * sin_i * orbital_x + cos_w * sin_i * orbital_y,
+        ],
+        axis=-1,
+    )
+
+    earth, planets = heliocentric[0], heliocentric[1:]
+    geocentric = planets - earth
+
+    sun_distance = np.linalg.norm(planets, axis=1)
+    earth_distance = np.linalg.norm(geocentric, axis=1)
+    earth_sun_distance = np.linalg.norm(earth)
+    phase_angle = np.degrees(
+        np.arccos(
+            np.clip(
+                (sun_distance**2 + earth_distance**2 - earth_sun_distance**2)
+                / (2 * sun_distance * earth_distance),
+                -1.0,
+                1.0,
+            )
+        )
+    )
+    coefficients = PLANET_MAGNITUDE_COEFFICIENTS
+    magnitudes = (
+        coefficients[:, 0]
+        + 5 * np.log10(sun_distance * earth_distance)
+        + coefficients[:, 1] * phase_angle
+        + coefficients[:, 2] * phase_angle**2
+        + coefficients[:, 3] * phase_angle**3
+    )
+
+    ecliptic_longitudes = np.mod(
+        np.degrees(np.arctan2(geocentric[:, 1], geocentric[:, 0])), 360.0
+    )
+    ecliptic_latitudes = np.arctan2(
+        geocentric[:, 2], np.hypot(geocentric[:, 0], geocentric[:, 1])
+    )
+    vectors = _ecliptic_to_equatorial_vectors(
+        np.radians(ecliptic_longitudes),
+        ecliptic_latitudes,
+        earth_distance * AU_KM,
+        _obliquity(np.zeros(1)),
+    )
+    return vectors, ecliptic_longitudes, magnitudes
+
+
+def _observer_vectors(
+    days: np.ndarray, latitude: float, longitude: float, elevation: float
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    The geocentric equatorial vectors (km) of an observer at the given times, and
+    the unit vectors toward their zenith.
+    """
+    sidereal_time = np.radians(
+        np.mod(280.46061837 + 360.98564736629 * days + longitude, 360.0)
+    )
+    latitude_radians = np.radians(latitude)
+    u = np.arctan(EARTH_FLATTENING_RATIO * np.tan(latitude_radians))
+    height_ratio = elevation / (EARTH_EQUATORIAL_RADIUS_KM * 1000.0)
+    rho_sin = (
+        EARTH_FLATTENING_RATIO * np.sin(u) + height_ratio * np.sin(latitude_radians)
+    )
+    rho_cos = np.cos(u) + height_ratio * np.cos(latitude_radians)
+
+    observer = EARTH_EQUATORIAL_RADIUS_KM * np.stack(
+        [
+            rho_cos * np.cos(sidereal_time),
+            rho_cos * np.sin(sidereal_time),
+            np.full_like(sidereal_time, rho_sin),
+        ],
+        axis=-1,
+    )
+    zenith = np.stack(
+        [
+            np.cos(latitude_radians) * np.cos(sidereal_time),
+            np.cos(latitude_radians) * np.sin(sidereal_time),
+            np.full_like(sidereal_time, np.sin(latitude_radians)),
+        ],
+        axis=-1,
+    )
+    return observer, zenith
+
+
+def _topocentric_altitudes(
+    vectors: np.ndarray,
+    days: np.ndarray,
+    latitude: float,
+    longitude: float,
+    elevation: float,
+) -> np.ndarray:
+    """
+    The altitudes (degrees) of objects at the given geocentric vectors, as seen
+    by an observer at one time.
+    """
+    observer, zenith = _observer_vectors(days, latitude, longitude, elevation)
+    topocentric = vectors - observer
+    return np.degrees(
+        np.arcsin((topocentric @ zenith[0]) / np.linalg.norm(topocentric, axis=1))
+    )
+
+
+def _get_constellations(ecliptic_longitudes: np.ndarray) -> List[str]:
+    indexes = (
+        np.searchsorted(
+            _CONSTELLATION_LONGITUDES, np.mod(ecliptic_longitudes, 360.0), side="right"
+        )
+        - 1
+    )
+    # (Before Aries is the end of Pisces.)
+    return [_CONSTELLATION_NAMES[index] for index in indexes]
+
+
+def _interpolate_crossing(
+    timestamps: np.ndarray, values: np.ndarray, before: int, after: int
+) -> float:
+    """
+    Estimates when values crossed zero between two samples. If the crossing is
+    outside the sampled range, returns the nearest sampled time.
+    """
+    if before < 0:
+        return float(timestamps[0])
+    if after >= len(timestamps):
+        return float(timestamps[-1])
+    value_before, value_after = values[before], values[after]
+    fraction = value_before / (value_before - value_after)
+    return float(
+        timestamps[before] + fraction * (timestamps[after] - timestamps[before])
+    )
+
@@ -0,0 +1,286 @@
+"""
+Geolocation of IP addresses.
+
+A GeoIPResolver turns an IP address into a BasicLocationMetadataModel.
+Resolvers are tried in turn until one succeeds:
+
+- LocalGeoIPResolver answers from an IP range database loaded into memory
+  (if settings.GEOIP_DATABASE_PATH names one), in microseconds.
+- IPAPIGeoIPResolver asks ip-api.com, caching its answers. It's rate limited,
+  so is only a fallback.
+
+The range database is a CSV file with a header row. ip_start and ip_end (the
+first and last addresses of each range, IPv4 or IPv6, dotted or as integers)
+are required. The other columns are optional, and named for the fields of
+BasicLocationMetadataModel: country, country_code, region_name, city, zip,
+latitude, longitude, timezone, and isp.
+"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+import csv
+from functools import lru_cache
+from ipaddress import ip_address
+import os
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from calliope.location.cache import ip_location_cache
+from calliope.models import BasicLocationMetadataModel, Hemisphere
+from calliope.settings import settings
+
+
+# The columns of the range database, besides ip_start and ip_end.
+LOCATION_COLUMNS = (
+    "country",
+    "country_code",
+    "region_name",
+    "city",
+    "zip",
+    "latitude",
+    "longitude",
+    "timezone",
+    "isp",
+)
+
+LocationRow = Tuple[Optional[str], ...]
+
+
+def hemisphere_at_latitude(latitude: float) -> Hemisphere:
+    return Hemisphere.SOUTHERN if latitude < 0 else Hemisphere.NORTHERN
+
+
+class GeoIPResolver(ABC):
+    """
+    Something that can locate an IP address.
+    """
+
+    name: str
+
+    @abstractmethod
+    async def resolve(
+        self, httpx_client: httpx.AsyncClient, ip: str
+    ) -> Optional[BasicLocationMetadataModel]:
+        """
+        Locates the given IP address, or returns None if it can't.
+        """
+        ...
+
+
+class GeoIPRangeDatabase:
+    """
+    An in-memory IP range database. Ranges are kept in arrays sorted by first
+    address, so a lookup is a binary search.
+    """
+
+    def __init__(self) -> None:
+        # Per IP version: the first and last address of each range, and the
+        # index of its location in self._locations.
+        self._starts: Dict[int, List[int]] = {4: [], 6: []}
+        self._ends: Dict[int, List[int]] = {4: [], 6: []}
+        self._location_indexes: Dict[int, List[int]] = {4: [], 6: []}
+
+        # Distinct locations. Many ranges share one.
+        self._locations: List[LocationRow] = []
+
+    @classmethod
+    def load(cls, filename: str) -> "GeoIPRangeDatabase":
+        """
+        Loads a range database from the given CSV file.
+        """
+        database = cls()
+        location_indexes_by_row: Dict[LocationRow, int] = {}
+        ranges: Dict[int, List[Tuple[int, int, int]]] = {4: [], 6: []}
+
+        with open(filename, newline="", encoding="utf-8") as csv_file:
+            for record in csv.DictReader(csv_file):
+                start = _parse_ip(record["ip_start"])
+                end = _parse_ip(record["ip_end"])
+                if start is None or end is None:
+                    continue
+
+                location_row = tuple(
+                    (record.get(column) or None) for column in LOCATION_COLUMNS
+                )
+                location_index = location_indexes_by_row.get(location_row)
+                if location_index is None:
+                    location_index = len(database._locations)
+                    database._locations.append(location_row)
+                    location_indexes_by_row[location_row] = location_index
+
+                version, start_int = start
+                ranges[version].append((start_int, end[1], location_index))
+
+        for version, version_ranges in ranges.items():
+            version_ranges.sort()
+            database._starts[version] = [start for start, _, _ in version_ranges]
+            database._ends[version] = [end for _, end, _ in version_ranges]
+            database._location_indexes[version] = [
+                location_index for _, _, location_index in version_ranges
+            ]
+
+        return database
+
+    @property
+    def num_ranges(self) -> int:
+        return sum(len(starts) for starts in self._starts.values())
+
+    def lookup(self, ip: str) -> Optional[BasicLocationMetadataModel]:
+        """
+        Finds the location of the given IP address, or returns None if it isn't
+        in any range.
+        """
+        parsed_ip = _parse_ip(ip)
+        if not parsed_ip:
+            return None
+        version, ip_int = parsed_ip
+
+        index = bisect_right(self._starts[version], ip_int) - 1
+        if index < 0 or ip_int > self._ends[version][index]:
+            return None
+
+        location = dict(
+            zip(
+                LOCATION_COLUMNS,
+                self._locations[self._location_indexes[version][index]],
+            )
+        )
+        latitude = _parse_float(location.pop("latitude"))
+        longitude = _parse_float(location.pop("longitude"))
+        return BasicLocationMetadataModel(
+            **location,
+            latitude=latitude,
+            longitude=longitude,
+            hemisphere=(
+                hemisphere_at_latitude(latitude) if latitude is not None else None
+            ),
+            ip_address=ip,
+        )
+
+
+class LocalGeoIPResolver(GeoIPResolver):
+    """
+    Locates IP addresses using a local range database.
+    """
+
+    name = "local"
+
+    def __init__(self, database: GeoIPRangeDatabase) -> None:
+        self.database = database
+
+    async def resolve(
+        self, httpx_client: httpx.AsyncClient, ip: str
+    ) -> Optional[BasicLocationMetadataModel]:
+        return self.database.lookup(ip)
+
+
+class IPAPIGeoIPResolver(GeoIPResolver):
+    """
+    Locates IP addresses using ip-api.com.
+    """
+
+    name = "ip-api"
+
+    async def resolve(
+        self, httpx_client: httpx.AsyncClient, ip: str
+    ) -> Optional[BasicLocationMetadataModel]:
+        try:
+            return await ip_location_cache.get(
+                ip, lambda: self._fetch_location(httpx_client, ip)
+            )
+        except ValueError as e:
+            print(e)
+            return None
+
+    async def _fetch_location(
+        self, httpx_client: httpx.AsyncClient, ip: str
+    ) -> BasicLocationMetadataModel:
+        """
+        Raises:
+            ValueError: if the address can't be located.
+        """
+        api_url = f"http://ip-api.com/json/{ip}"
+
+        response = await httpx_client.get(api_url)
+        json_response = response.json()
+
+        if json_response and json_response.get("status") == "success":
+            latitude = json_response.get("lat")
+            longitude = json_response.get("lon")
+
+            return BasicLocationMetadataModel(
+                country=json_response.get("country"),
+                country_code=json_response.get("countryCode"),
+                region_name=json_response.get("regionName"),
+                city=json_response.get("city"),
+                zip=json_response.get("zip"),
+                latitude=latitude,
+                longitude=longitude,
+                hemisphere=hemisphere_at_latitude(latitude),
+                timezone=json_response.get("timezone"),
+                isp=json_response.get("isp"),
+                ip_address=ip,
+            )
+        else:
+            # Raised rather than returned, so the failure isn't cached.
+            raise ValueError(f"Invalid location response: {json_response}")
+
+
+@lru_cache(maxsize=1)
+def get_geoip_database() -> Optional[GeoIPRangeDatabase]:
+    """
+    Loads the range database named by settings.GEOIP_DATABASE_PATH, if any.
+    """
+    filename = settings.GEOIP_DATABASE_PATH
+    if not filename:
+        return None
+    if not os.path.isfile(filename):
+        print(f"GeoIP database {filename} not found.")
+        return None
+
+    start = time.perf_counter()
+    database = GeoIPRangeDatabase.load(filename)
+    print(
+        f"Loaded {database.num_ranges} IP ranges from {filename} in "
+        f"{time.perf_counter() - start:.1f}s."
+    )
+    return database
+
+
+@lru_cache(maxsize=1)
+def get_geoip_resolvers() -> Sequence[GeoIPResolver]:
+    """
+    Gets the resolvers to try, in order.
+    """
+    resolvers: List[GeoIPResolver] = []
+    database = get_geoip_database()
+    if database:
+        resolvers.append(LocalGeoIPResolver(database))
+    resolvers.append(IPAPIGeoIPResolver())
+    return resolvers
+
+
+def _parse_ip(value: Optional[str]) -> Optional[Tuple[int, int]]:
+    """
+    Parses an address, dotted or as an integer, into (IP version, integer).
+    """
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        if value.isdigit():
+            ip_int = int(value)
+            return (4 if ip_int < 2**32 else 6), ip_int
+        address = ip_address(value)
+        return address.version, int(address)
+    except ValueError:
+        return None
+
+
+def _parse_float(value: Optional[str]) -> Optional[float]:
+    try:
+        return float(value) if value else None
+    except ValueError:
+        return None
@@ -1,8 +1,13 @@
+import asyncio
 import httpx
 from ipaddress import ip_address
-from typing import Any, Dict, Optional
+import sys
+import traceback
+from typing import Any, Awaitable, cast, Dict, Optional, TypeVar
 import yaml
 
+from calliope.location.cache import public_ip_cache
+from calliope.location.geoip import get_geoip_resolvers
 from calliope.location.time import get_local_datetime, get_season
 from calliope.location.astronomy import (
     get_active_meteor_showers,
@@ -10,7 +15,19 @@ from calliope.location.astronomy import (
     get_solar_eclipse_of_the_day,
 )
 from calliope.location.weather import get_weather_at_location
-from calliope.models import BasicLocationMetadataModel, FullLocationMetadata, Hemisphere
+from calliope.models import BasicLocationMetadataModel, FullLocationMetadata
+from calliope.utils.single_flight import SingleFlight
+
+
+# Deadlines for each lookup made once the client has been located, in seconds.
+WEATHER_TIMEOUT_SECONDS = 5
+NIGHT_SKY_TIMEOUT_SECONDS = 5
+SOLAR_ECLIPSE_TIMEOUT_SECONDS = 5
+
+ResultT = TypeVar("ResultT")
+
+# Frame requests from the same place at the same time share one lookup.
+_location_metadata_lookups: SingleFlight[FullLocationMetadata] = SingleFlight()
 
 
 def is_ip_private(ip: str) -> bool:
@@ -22,29 +39,35 @@ def is_ip_private(ip: str) -> bool:
 
 async def get_public_ip_address(httpx_client: httpx.AsyncClient) -> Optional[str]:
     """
-    Gets the public IP address of the current runtime environment.
+    Gets the public IP address of the current runtime environment. Cached.
     """
-    api_url = "https://api.ipify.org?format=json"
-
     try:
-        response = await httpx_client.get(api_url)
-        response.raise_for_status()
-        json_response = response.json()
-
-        return json_response.get("ip") if json_response else None
+        return await public_ip_cache.get(
+            "public_ip", lambda: _fetch_public_ip_address(httpx_client)
+        )
     except Exception:
         return None
 
 
-def hemisphere_at_latitude(latitude: float) -> Hemisphere:
-    return Hemisphere.SOUTHERN if latitude < 0 else Hemisphere.NORTHERN
+async def _fetch_public_ip_address(httpx_client: httpx.AsyncClient) -> str:
+    api_url = "https://api.ipify.org?format=json"
+
+    response = await httpx_client.get(api_url)
+    response.raise_for_status()
+    json_response = response.json()
+
+    ip = json_response.get("ip") if json_response else None
+    if not ip:
+        raise ValueError(f"Invalid public IP response: {json_response}")
+    return cast(str, ip)
 
 
 async def get_location_from_ip(
     httpx_client: httpx.AsyncClient, ip: Optional[str]
 ) -> BasicLocationMetadataModel:
     """
-    Gets the estimated location of a given IP address.
+    Gets the estimated location of a given IP address, from the first geo-IP
+    resolver that can locate it.
     """
     if not ip or is_ip_private(ip):
         ip = await get_public_ip_address(httpx_client)
@@ -52,31 +75,12 @@ async def get_location_from_ip(
     if not ip:
         return BasicLocationMetadataModel(ip_address=None)
 
-    api_url = f"http://ip-api.com/json/{ip}"
+    for resolver in get_geoip_resolvers():
+        location = await resolver.resolve(httpx_client, ip)
+        if location:
+            return location
 
-    response = await httpx_client.get(api_url)
-    json_response = response.json()
-
-    if json_response and json_response.get("status") == "success":
-        latitude = json_response.get("lat")
-        longitude = json_response.get("lon")
-
-        return BasicLocationMetadataModel(
-            country=json_response.get("country"),
-            country_code=json_response.get("countryCode"),
-            region_name=json_response.get("regionName"),
-            city=json_response.get("city"),
-            zip=json_response.get("zip"),
-            latitude=latitude,
-            longitude=longitude,
-            hemisphere=hemisphere_at_latitude(latitude),
-            timezone=json_response.get("timezone"),
-            isp=json_response.get("isp"),
-            ip_address=ip,
-        )
-    else:
-        # raise ValueError(f"Invalid location response: {json_response}")
-        return BasicLocationMetadataModel(ip_address=None)
+    return BasicLocationMetadataModel(ip_address=None)
 
 
 async def get_location_metadata_for_ip(
@@ -86,56 +90,67 @@ async def get_location_metadata_for_ip(
     Gets the full location metadata for a given IP address. This includes
     not only static information about the location (city, region, country name),
     but also transient things like weather, time of day, date, and season.
+
+    Concurrent calls for the same IP address share one lookup (and so one result,
+    which mustn't be modified).
     """
+    return await _location_metadata_lookups.do(
+        ip, lambda: _get_location_metadata_for_ip(httpx_client, ip)
+    )
+
+
+async def _get_location_metadata_for_ip(
+    httpx_client: httpx.AsyncClient, ip: Optional[str]
+) -> FullLocationMetadata:
     basic_metadata = await get_location_from_ip(httpx_client, ip)
 
     local_datetime = (
         get_local_datetime(basic_metadata.timezone) if basic_metadata.timezone else None
     )
 
-    weather_metadata = None
-    night_sky_objects = []
-    active_meteor_showers = []
-    peaking_meteor_showers = []
-    solar_eclipse = None
-
-    try:
-        if basic_metadata.latitude and basic_metadata.longitude:
-            weather_metadata = await get_weather_at_location(
-                httpx_client,
-                basic_metadata.latitude,
-                basic_metadata.longitude,
-            )
-            night_sky_objects = (
-                await get_night_sky_objects(
-                    httpx_client,
-                    basic_metadata.latitude,
-                    basic_metadata.longitude,
-                )
-                if weather_metadata and not weather_metadata.is_day
-                else []
-            )
-
-        if basic_metadata.hemisphere and local_datetime:
-            active_meteor_showers, peaking_meteor_showers = get_active_meteor_showers(
-                basic_metadata.hemisphere, local_datetime
-            )
-        else:
-            active_meteor_showers = peaking_meteor_showers = []
-
-        solar_eclipse = (
-            await get_solar_eclipse_of_the_day(
-                httpx_client,
-                local_datetime,
-                basic_metadata.latitude,
-                basic_metadata.longitude,
-                weather_metadata.elevation if weather_metadata else 0,
-            )
-            if local_datetime
-            else None
+    if basic_metadata.hemisphere and local_datetime:
+        active_meteor_showers, peaking_meteor_showers = get_active_meteor_showers(
+            basic_metadata.hemisphere, local_datetime
         )
-    except Exception as e:
-        print(f"Error getting location metadata: {e}")
+    else:
+        active_meteor_showers = peaking_meteor_showers = []
+
+    # Everything else depends only on where the client is, so is looked up all
+    # at once. The night sky is fetched before knowing whether it's night, and
+    # dropped if it isn't; and the eclipse is looked up at sea level rather than
+    # waiting on the weather service for the elevation, which makes a negligible
+    # difference to eclipse times.
+    latitude = cast(float, basic_metadata.latitude)
+    longitude = cast(float, basic_metadata.longitude)
+    has_coordinates = bool(latitude and longitude)
+    weather_metadata, night_sky_objects, solar_eclipse = await asyncio.gather(
+        _with_deadline(
+            "weather",
+            get_weather_at_location(httpx_client, latitude, longitude),
+            WEATHER_TIMEOUT_SECONDS,
+        )
+        if has_coordinates
+        else _nothing(),
+        _with_deadline(
+            "night sky",
+            get_night_sky_objects(httpx_client, latitude, longitude),
+            NIGHT_SKY_TIMEOUT_SECONDS,
+        )
+        if has_coordinates
+        else _nothing(),
+        _with_deadline(
+            "solar eclipse",
+            get_solar_eclipse_of_the_day(
+                httpx_client, local_datetime, latitude, longitude, 0
+            ),
+            SOLAR_ECLIPSE_TIMEOUT_SECONDS,
+        )
+        if local_datetime and has_coordinates
+        else _nothing(),
+    )
+
+    if not weather_metadata or weather_metadata.is_day:
+        night_sky_objects = []
 
     print(f"{basic_metadata=}, {solar_eclipse=}, {weather_metadata=}")
 
@@ -143,13 +158,33 @@ async def get_location_metadata_for_ip(
         location=basic_metadata,
         weather=weather_metadata,
         local_datetime=local_datetime,
-        night_sky_objects=night_sky_objects,
+        night_sky_objects=night_sky_objects or [],
         active_meteor_showers=active_meteor_showers,
         peaking_meteor_showers=peaking_meteor_showers,
         solar_eclipse=solar_eclipse,
     )
 
 
+async def _with_deadline(
+    name: str, awaitable: Awaitable[ResultT], timeout_seconds: float
+) -> Optional[ResultT]:
+    """
+    Awaits one location lookup. Returns None if it fails or runs late.
+    """
+    try:
+        return await asyncio.wait_for(awaitable, timeout_seconds)
+    except asyncio.TimeoutError:
+        print(f"The {name} lookup timed out after {timeout_seconds}s.")
+    except Exception as e:
+        print(f"Error getting {name} metadata: {e}")
+        traceback.print_exc(file=sys.stderr)
+    return None
+
+
+async def _nothing() -> None:
+    return None
+
+
 def get_local_situation_text(
     image_analysis: Optional[Dict[str, Any]],
     location_metadata: FullLocationMetadata,
@@ -1,5 +1,10 @@
 import httpx
 
+from calliope.location.cache import (
+    WEATHER_COORDINATE_PRECISION,
+    round_coordinates,
+    weather_cache,
+)
 from calliope.models import CurrentWeatherModel, WMO_WEATHER_DESCRIPTIONS_BY_CODE
 
 
@@ -9,8 +14,22 @@ async def get_weather_at_location(
     longitude: float
 ) -> CurrentWeatherModel:
     """
-    Gets the weather at a given location.
+    Gets the weather at a given location. Cached for nearby locations.
     """
+    latitude, longitude = round_coordinates(
+        latitude, longitude, WEATHER_COORDINATE_PRECISION
+    )
+    return await weather_cache.get(
+        (latitude, longitude),
+        lambda: _fetch_weather_at_location(httpx_client, latitude, longitude),
+    )
+
+
+async def _fetch_weather_at_location(
+    httpx_client: httpx.AsyncClient,
+    latitude: float,
+    longitude: float
+) -> CurrentWeatherModel:
     api_url = (
         "https://api.open-meteo.com/v1/forecast?"
         f"latitude={latitude}&longitude={longitude}"
@@ -141,3 +141,7 @@ class StoryRequestParamsModel(BaseModel):
 class StoriesRequestParamsModel(BaseModel):
     client_id: str
     debug: Optional[bool] = False
+    # The maximum number of stories to return. If omitted, a default-sized page.
+    limit: Optional[int] = None
+    # The next_cursor of a previous response, to get the following page.
+    cursor: Optional[str] = None
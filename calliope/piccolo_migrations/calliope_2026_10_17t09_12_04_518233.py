@@ -0,0 +1,36 @@
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.columns.column_types import Integer
+from piccolo.columns.indexes import IndexMethod
+
+
+ID = "2026-10-17T09:12:04:518233"
+VERSION = "1.7.0"
+DESCRIPTION = "Adds a maintained frame_count column to story."
+
+
+async def forwards() -> MigrationManager:
+    manager = MigrationManager(
+        migration_id=ID, app_name="calliope", description=DESCRIPTION
+    )
+
+    manager.add_column(
+        table_class_name="Story",
+        tablename="story",
+        column_name="frame_count",
+        db_column_name="frame_count",
+        column_class_name="Integer",
+        column_class=Integer,
+        params={
+            "default": 0,
+            "null": False,
+            "primary_key": False,
+            "unique": False,
+            "index": False,
+            "index_method": IndexMethod.btree,
+            "choices": None,
+            "db_column_name": None,
+            "secret": False,
+        },
+    )
+
+    return manager
@@ -0,0 +1,40 @@
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.table import Table
+
+
+ID = "2026-10-17T09:13:27:604118"
+VERSION = "1.7.0"
+DESCRIPTION = "Backfills story.frame_count."
+
+
+class Story(Table, tablename="story"):
+    # Only needed to run raw SQL.
+    pass
+
+
+async def forwards() -> MigrationManager:
+    # Raw steps run before a migration's schema changes, so this can't be part
+    # of the migration that adds the column.
+    manager = MigrationManager(
+        migration_id=ID, app_name="calliope", description=DESCRIPTION
+    )
+
+    async def backfill_frame_counts() -> None:
+        print(f"running {ID}")
+
+        await Story.raw(
+            """
+            UPDATE story
+            SET frame_count = counts.frame_count
+            FROM (
+                SELECT story, count(*) AS frame_count
+                FROM story_frame
+                GROUP BY story
+            ) AS counts
+            WHERE story.id = counts.story
+            """
+        ).run()
+
+    manager.add_raw(backfill_frame_counts)
+
+    return manager
@@ -0,0 +1,63 @@
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.table import Table
+
+
+ID = "2026-10-17T09:40:51:207815"
+VERSION = "1.7.0"
+DESCRIPTION = "Adds indexes for the common story and story frame queries."
+
+
+class Story(Table, tablename="story"):
+    # Only needed to run raw SQL.
+    pass
+
+
+# Piccolo columns can't declare composite or partial indexes, so these are
+# created with raw SQL.
+CREATE_INDEX_STATEMENTS = [
+    # Frames of a story in order (get_frames, get_text, compute_thumbnail,
+    # bookmarks).
+    """
+    CREATE INDEX IF NOT EXISTS story_frame_story_number
+    ON story_frame (story, number)
+    """,
+    # Frames not yet indexed for search, in order (vector_manager._get_frames).
+    """
+    CREATE INDEX IF NOT EXISTS story_frame_unindexed_number
+    ON story_frame (number)
+    WHERE indexed_for_search = false
+    """,
+    # A sparrow's stories, most recently updated first, with the id breaking
+    # ties as in the keyset pagination of get_stories_by_client and
+    # list_stories.
+    """
+    CREATE INDEX IF NOT EXISTS story_created_for_sparrow_id_date_updated_id
+    ON story (created_for_sparrow_id, date_updated DESC, id DESC)
+    """,
+]
+
+DROP_INDEX_STATEMENTS = [
+    "DROP INDEX IF EXISTS story_frame_story_number",
+    "DROP INDEX IF EXISTS story_frame_unindexed_number",
+    "DROP INDEX IF EXISTS story_created_for_sparrow_id_date_updated_id",
+]
+
+
+async def forwards() -> MigrationManager:
+    manager = MigrationManager(
+        migration_id=ID, app_name="calliope", description=DESCRIPTION
+    )
+
+    async def create_indexes() -> None:
+        print(f"running {ID}")
+        for statement in CREATE_INDEX_STATEMENTS:
+            await Story.raw(statement).run()
+
+    async def drop_indexes() -> None:
+        for statement in DROP_INDEX_STATEMENTS:
+            await Story.raw(statement).run()
+
+    manager.add_raw(create_indexes)
+    manager.add_raw_backwards(drop_indexes)
+
+    return manager
@@ -0,0 +1,94 @@
+import re
+
+from piccolo.apps.migrations.auto.migration_manager import MigrationManager
+from piccolo.columns.column_types import Varchar
+from piccolo.table import Table
+
+
+ID = "2026-10-17T10:05:33:841906"
+VERSION = "1.7.0"
+DESCRIPTION = "Makes story slugs unique."
+
+
+class Story(Table, tablename="story"):
+    # Ignore columns other than those needed here.
+    slug = Varchar(length=100, index=True, null=True)
+
+
+def _next_free_slug(base_slug: str, existing_slugs: set) -> str:
+    if base_slug not in existing_slugs:
+        return base_slug
+
+    suffix_pattern = re.compile(rf"{re.escape(base_slug)}-(\d+)")
+    taken_counters = set()
+    for existing_slug in existing_slugs:
+        match = suffix_pattern.fullmatch(existing_slug)
+        if match:
+            taken_counters.add(int(match.group(1)))
+
+    counter = 1
+    while counter in taken_counters:
+        counter += 1
+
+    return f"{base_slug}-{counter}"
+
+
+async def deduplicate_story_slugs() -> None:
+    """
+    Gives a fresh slug to every story that shares its slug with an older story,
+    so the unique constraint can be added.
+    """
+    print(f"running {ID}")
+
+    duplicates = await Story.raw(
+        """
+        SELECT id, slug FROM (
+            SELECT id, slug,
+                row_number() OVER (PARTITION BY slug ORDER BY id) AS position
+            FROM story
+            WHERE slug IS NOT NULL
+        ) AS numbered
+        WHERE position > 1
+        ORDER BY id
+        """
+    ).run()
+
+    if not duplicates:
+        return
+
+    rows = await Story.select(Story.slug).where(Story.slug.is_not_null()).run()
+    existing_slugs = {row["slug"] for row in rows}
+
+    for duplicate in duplicates:
+        # Strip any numeric suffix, so "foo-1" duplicates become "foo-2", etc.
+        base_slug = re.sub(r"-\d+$", "", duplicate["slug"]) or duplicate["slug"]
+        new_slug = _next_free_slug(base_slug, existing_slugs)
+        existing_slugs.add(new_slug)
+        await Story.update({Story.slug: new_slug}).where(
+            Story.id == duplicate["id"]  # type: ignore[attr-defined]
+        ).run()
+
+    print(f"Renamed {len(duplicates)} duplicate slugs.")
+
+
+async def forwards() -> MigrationManager:
+    manager = MigrationManager(
+        migration_id=ID, app_name="calliope", description=DESCRIPTION
+    )
+
+    # Raw steps run before the schema changes.
+    manager.add_raw(deduplicate_story_slugs)
+
+    manager.alter_column(
+        table_class_name="Story",
+        tablename="story",
+        column_name="slug",
+        db_column_name="slug",
+        params={"unique": True},
+        old_params={"unique": False},
+        column_class=Varchar,
+        old_column_class=Varchar,
+        schema=None,
+    )
+
+    return manager
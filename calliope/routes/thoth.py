@@ -8,7 +8,11 @@ from markupsafe import Markup
 
 from calliope.tables import Story, StoryFrame
 from calliope.storage.vector_manager import semantic_search
-from calliope.utils.pagination import Pagination
+from calliope.utils.pagination import (
+    Pagination,
+    estimate_row_count,
+    get_keyset_page,
+)
 
 
 router = APIRouter()
@@ -19,23 +23,18 @@ PAGE_SIZE = 10
 
 @router.get("/thoth/", response_class=HTMLResponse)
 async def thoth_root(
-    request: Request, meta: Optional[bool] = False, page: int = 1
+    request: Request, meta: Optional[bool] = False, cursor: Optional[str] = None
 ) -> HTMLResponse:
-    num_stories = await Story.count()
-
-    # Note: page is 1-based because it's user-visible.
-    pagination = Pagination(total_rows=num_stories, page=page, page_size=PAGE_SIZE)
-
-    if pagination.offset < num_stories:
-        stories = cast(
-            Sequence[Story],
-            await Story.objects(Story.thumbnail_image)
-            .order_by(Story.date_updated, ascending=False)
-            .offset(pagination.offset)
-            .limit(pagination.page_size),
-        )
-    else:
-        stories = []
+    query = Story.objects(Story.thumbnail_image)
+    try:
+        stories_page = await get_keyset_page(query, Story, PAGE_SIZE, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    stories = cast(Sequence[Story], stories_page.rows)
+    approximate_total = await estimate_row_count(
+        Story.select(Story.id)  # type: ignore[attr-defined]
+    )
 
     story_thumbs_by_story_id = {}
 
@@ -49,7 +48,8 @@ async def thoth_root(
         "stories": stories,
         "story_thumbs_by_story_id": story_thumbs_by_story_id,
         "show_metadata": meta,
-        "pagination": pagination,
+        "stories_page": stories_page,
+        "approximate_total": approximate_total,
     }
     return cast(HTMLResponse, templates.TemplateResponse("thoth.html", context))
 
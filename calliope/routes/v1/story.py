@@ -1,16 +1,14 @@
-from datetime import datetime
-import sys
-import traceback
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import json
 from typing import Any, Dict, List, Optional, cast
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from fastapi.security.api_key import APIKey
-import httpx
 from pydantic import BaseModel
 
-from calliope.inference import image_analysis_inference
-from calliope.inference.audio_to_text import audio_to_text_inference
-from calliope.location.location import get_location_metadata_for_ip
+from calliope.location.cache import get_location_cache_stats
 from calliope.models import (
     FramesRequestParamsModel,
     ImageModel,
@@ -18,9 +16,10 @@ from calliope.models import (
     StoryFrameModel,
     StoryRequestParamsModel,
 )
+from calliope.settings import settings
 from calliope.storage.config_manager import (
+    get_resolved_config,
     get_sparrow_story_parameters_and_keys,
-    load_json_if_necessary,
 )
 from calliope.storage.state_manager import (
     get_sparrow_state,
@@ -29,12 +28,19 @@ from calliope.storage.state_manager import (
     put_sparrow_state,
     put_story,
 )
+from calliope.storage.unit_of_work import UnitOfWork, unit_of_work
 from calliope.strategies import StoryStrategyRegistry
-from calliope.tables import Image, ModelConfig, Story, StoryFrame
+from calliope.tables import Image, Story, StoryFrame
+from calliope.utils.admission import frame_admission, get_strategy_providers
 from calliope.utils.authentication import get_api_key
+from calliope.utils.clients import borrow_http_client
+from calliope.utils.enrichment import enrich_frame_request
 from calliope.utils.fastapi import get_base_url
+from calliope.utils.frame_events import NDJSON_MEDIA_TYPE, stream_frame_events
 from calliope.utils.google import get_media_file, is_google_cloud_run_environment
 from calliope.utils.id import create_cuid
+from calliope.utils.renditions import get_rendition_cache_stats
+from calliope.utils.speculation import SpeculationSlots
 from calliope.utils.story import (
     prepare_existing_frame_images,
     prepare_frame_images,
@@ -74,6 +80,10 @@ class StoryResponseV1(BaseModel):
     debug_data: Optional[Dict[str, Any]] = None
     errors: List[str]
 
+    # Why, if so, the frames are ones already made (the story's latest, or a
+    # sleep frame) rather than new ones.
+    fallback_reason: Optional[str] = None
+
 
 class StoryInfo(BaseModel):
     story_id: str
@@ -97,6 +107,8 @@ class StoriesResponseV1(BaseModel):
     stories: List[StoryInfo]
     request_id: str
     generation_date: str
+    # The cursor with which to request the next page, if there is one.
+    next_cursor: Optional[str] = None
 
 
 @router.put("/story/reset/")
@@ -186,6 +198,28 @@ async def post_frames(
     # return await handle_frames_request_sleep(request_params, base_url)
 
 
+@router.post("/frames/stream/", response_class=StreamingResponse)
+async def post_frames_stream(
+    request: Request,
+    request_params: FramesRequestParamsModel,
+    api_key: APIKey = Depends(get_api_key),  # noqa: ARG001
+) -> StreamingResponse:
+    """
+    Like POST /v1/frames/, but streams newline-delimited JSON events as the
+    frames are made: each frame's text as soon as it's written, then its image,
+    then the frame with its image converted for the client's display, and
+    finally the complete response (or an error). See utils/frame_events.py.
+    """
+    base_url = get_base_url(request)
+
+    return StreamingResponse(
+        stream_frame_events(
+            lambda: handle_frames_request(request, request_params, base_url)
+        ),
+        media_type=NDJSON_MEDIA_TYPE,
+    )
+
+
 @router.get("/frames/", response_model=StoryResponseV1)
 async def get_frames(
     request: Request,
@@ -202,10 +236,10 @@ async def get_frames(
     # return await handle_frames_request_sleep(request_params, base_url)
 
 
-async def handle_frames_request_sleep(
-    request_params: FramesRequestParamsModel,
-    base_url: str,  # noqa: ARG001
-) -> StoryResponseV1:
+def _get_sleep_frame() -> StoryFrame:
+    """
+    Gets an (unsaved) frame saying that Calliope is asleep.
+    """
     image_filename = "media/Calliope-sleeps.png"
 
     if is_google_cloud_run_environment():
@@ -216,11 +250,10 @@ async def handle_frames_request_sleep(
 
     image = Image(format="image/png", width=512, height=512, url=image_filename)
 
-    frames = [
-        StoryFrame(
-            image=image,
-            source_image=image,
-            text="""
+    return StoryFrame(
+        image=image,
+        source_image=image,
+        text="""
 O soft embalmer of the still midnight,
       Shutting, with careful fingers and benign,
 Our gloom-pleas'd eyes, embower'd from the light,
@@ -240,10 +273,16 @@ And seal the hushed Casket of my Soul.
 
 Calliope sleeps. She will awake shortly, improved.
             """,
-            metadata={},
-            min_duration_seconds=60,
-        )
-    ]
+        metadata={},
+        min_duration_seconds=60,
+    )
+
+
+async def handle_frames_request_sleep(
+    request_params: FramesRequestParamsModel,
+    base_url: str,  # noqa: ARG001
+) -> StoryResponseV1:
+    frames = [_get_sleep_frame()]
 
     await prepare_frame_images(request_params, frames, save=False)
 
@@ -267,172 +306,328 @@ Calliope sleeps. She will awake shortly, improved.
     return response
 
 
+@dataclass
+class GeneratedFrames:
+    """
+    The frames made for a request, and where they went in the story.
+    """
+
+    response: StoryResponseV1
+
+    # The story, unless the request was refused before one was created.
+    story: Optional[Story]
+
+    # The number of the first frame added to the story.
+    first_frame_number: int
+
+    # If the frames were generated speculatively, the deferred unit of work
+    # holding all of their writes, to be committed if they're served.
+    unit_of_work: Optional[UnitOfWork] = None
+
+
+async def _commit_speculative_frames(generated: GeneratedFrames) -> bool:
+    """
+    Saves frames generated speculatively, now that they're to be served, unless
+    the story has gained other frames since (so their numbers are taken).
+
+    Returns:
+        whether the frames were saved.
+    """
+    story = generated.story
+    if not story or not generated.unit_of_work:
+        # The speculation wasn't admitted, so made nothing worth serving.
+        return False
+
+    row = (
+        await Story.select(Story.frame_count)
+        .where(Story.id == story.id)  # type: ignore[attr-defined]
+        .first()
+        .run()
+    )
+    if not row or row["frame_count"] != generated.first_frame_number:
+        print(f"Story {story.cuid} has changed. Dropping speculative frames.")
+        return False
+
+    await generated.unit_of_work.commit()
+    return True
+
+
+# Each sparrow's next frames, generated ahead of its request.
+speculative_frames: SpeculationSlots[GeneratedFrames] = SpeculationSlots(
+    commit=_commit_speculative_frames
+)
+
+
+def _get_speculation_fingerprint(
+    request_params: FramesRequestParamsModel,
+) -> Optional[str]:
+    """
+    Identifies the inputs of a request that could be served a speculative frame,
+    or returns None if the request brings a new image or audio, so can't be.
+    """
+    if (
+        request_params.input_image
+        or request_params.input_image_filename
+        or request_params.input_audio
+        or request_params.input_audio_filename
+    ):
+        return None
+    return json.dumps(request_params.model_dump(mode="json"), sort_keys=True)
+
+
+def _get_source_ip_address(request: Request) -> Optional[str]:
+    forwarded_header = request.headers.get("X-Forwarded-For")
+    if forwarded_header:
+        # Handle case where request comes through a load balancer, altering
+        # request.client.host.
+        return request.headers.getlist("X-Forwarded-For")[0]
+    else:
+        # Handle the normal case of a direct request.
+        return request.client.host if request.client else None
+
+
 async def handle_frames_request(
     request: Request,
     request_params: FramesRequestParamsModel,
     base_url: str,
 ) -> StoryResponseV1:
     print("handle_frames_request")
-    client_id = request_params.client_id
-    sparrow_state = await get_sparrow_state(client_id)
-    story_id = request_params.story_id
-    story = await get_story(story_id) if story_id else None
-    if story:
-        request_params.strategy = story.strategy_name
+    source_ip_address = _get_source_ip_address(request)
 
-    (
-        parameters,
-        keys,
-        strategy_config,
-    ) = await get_sparrow_story_parameters_and_keys(request_params)
-    parameters.strategy = parameters.strategy or "continuous-v1"
-    parameters.debug = parameters.debug or False
-    errors: List[str] = []
+    if not settings.SPECULATIVE_FRAMES_ENABLED:
+        generated = await _generate_frames(request_params, base_url, source_ip_address)
+        return generated.response
 
-    strategy_name = (
-        strategy_config.strategy_name if strategy_config else parameters.strategy
-    )
-    strategy_class = StoryStrategyRegistry.get_strategy_class(strategy_name)
+    client_id = request_params.client_id
+    fingerprint = _get_speculation_fingerprint(request_params)
+    # (Copied before generating, which changes the parameters.)
+    next_request_params = request_params.model_copy(deep=True)
+
+    # (A request with an image or audio matches nothing, so drops any
+    # speculation without waiting for it.)
+    speculative = await speculative_frames.take(client_id, fingerprint)
+    if speculative:
+        print(f"Serving a speculative frame to {client_id}.")
+        generated = speculative
+        response = generated.response.model_copy(update={"request_id": create_cuid()})
+        if request_params.debug and response.debug_data is not None:
+            response.debug_data = {
+                **response.debug_data,
+                "served_speculatively": True,
+            }
+    else:
+        generated = await _generate_frames(request_params, base_url, source_ip_address)
+        response = generated.response
+
+    if fingerprint and not response.fallback_reason:
+        # Guess that the next request will be just like this one. (Not for
+        # sparrows that send images or audio, and no point while the providers
+        # are saturated.)
+        resolved_config = await get_resolved_config(
+            client_id, request_params.client_type, request_params.strategy
+        )
+        speculative_frames.start(
+            client_id,
+            resolved_config.flock_id or client_id,
+            fingerprint,
+            lambda: _generate_frames(
+                next_request_params, base_url, source_ip_address, speculative=True
+            ),
+        )
 
-    if not story:
-        story = sparrow_state.current_story
-        if story and story.strategy_name != parameters.strategy:
-            # The story in progress was created by a different strategy. Start a new one.
-            story = None
+    if request_params.debug and response.debug_data is not None:
+        response.debug_data["speculation_stats"] = speculative_frames.stats
+    return response
 
-    if not story:
-        story = Story.create_new(
-            strategy_name=parameters.strategy,
-            created_for_sparrow_id=client_id,
-        )
-        await put_story(story)
-        print(f"Created new story: {story.to_dict()}")
 
-    if sparrow_state.current_story != story.id:
-        # We're starting a new story.
-        sparrow_state.current_story = story.id
-        story.created_for_sparrow_id = client_id
-        await put_sparrow_state(sparrow_state)
-        await put_story(story)
+async def _generate_frames(
+    request_params: FramesRequestParamsModel,
+    base_url: str,
+    source_ip_address: Optional[str],
+    speculative: bool = False,
+) -> GeneratedFrames:
+    """
+    Generates frames for a request. If speculative, nothing is saved: the
+    writes are held in the returned unit of work, to be committed if the frames
+    are served.
+    """
+    async with unit_of_work(deferred=speculative) as unit_of_work_:
+        client_id = request_params.client_id
+        sparrow_state = await get_sparrow_state(client_id)
+        story_id = request_params.story_id
+        story = await get_story(story_id) if story_id else None
+        if story:
+            request_params.strategy = story.strategy_name
+
+        (
+            parameters,
+            keys,
+            strategy_config,
+        ) = await get_sparrow_story_parameters_and_keys(request_params)
+        parameters.strategy = parameters.strategy or "continuous-v1"
+        parameters.debug = parameters.debug or False
+        errors: List[str] = []
 
-    parameters = await prepare_input_files(parameters, story)
-    image_analysis = None
-
-    timeout = httpx.Timeout(180.0)
-    async with httpx.AsyncClient(timeout=timeout) as httpx_client:
-        forwarded_header = request.headers.get("X-Forwarded-For")
-        if forwarded_header:
-            # Handle case where request comes through a load balancer, altering
-            # request.client.host.
-            source_ip_address: Optional[str] = request.headers.getlist(
-                "X-Forwarded-For"
-            )[0]
-        else:
-            # Handle the normal case of a direct request.
-            source_ip_address = request.client.host if request.client else None
-        location_metadata = await get_location_metadata_for_ip(
-            httpx_client,
-            source_ip_address,
+        strategy_name = (
+            strategy_config.strategy_name if strategy_config else parameters.strategy
         )
-        print(f"{location_metadata=}")
-
-        if parameters.input_image_filename:
-            print(f"{parameters.input_image_filename=}")
-            vision_model_slug = "azure-vision-analysis"
-            model_config = (
-                await ModelConfig.objects(ModelConfig.model)
-                .where(ModelConfig.slug == vision_model_slug)
-                .first()
-                .output(load_json=True)
-                .run()
-            )
-            if (
-                model_config
-                and model_config.model
-                and model_config.model.model_parameters
-            ):
-                model_config.model.model_parameters = load_json_if_necessary(
-                    model_config.model.model_parameters
+        strategy_class = StoryStrategyRegistry.get_strategy_class(strategy_name)
+
+        if not story:
+            story = sparrow_state.current_story
+            if story and story.strategy_name != parameters.strategy:
+                # The story in progress was created by a different strategy.
+                # Start a new one.
+                story = None
+
+        with frame_admission.admit(get_strategy_providers(strategy_config)) as refusal:
+            if refusal:
+                return await _get_fallback_frames(parameters, story, client_id, refusal)
+
+            if not story:
+                story = Story.create_new(
+                    strategy_name=parameters.strategy,
+                    created_for_sparrow_id=client_id,
                 )
-            try:
-                image_analysis = await image_analysis_inference(
-                    httpx_client,
-                    parameters.input_image_filename,
-                    parameters.input_image,  # original b64-encoded image.
-                    model_config,
+                await put_story(story)
+                print(f"Created new story: {story.to_dict()}")
+
+            if sparrow_state.current_story != story.id:
+                # We're starting a new story.
+                sparrow_state.current_story = story.id
+                story.created_for_sparrow_id = client_id
+                await put_sparrow_state(sparrow_state)
+                await put_story(story)
+
+            parameters = await prepare_input_files(parameters, story)
+            first_frame_number = await story.get_frame_count()
+
+            async with borrow_http_client() as httpx_client:
+                # Locate the client, analyze any image, and transcribe any audio, all
+                # at once.
+                enrichment = await enrich_frame_request(
+                    httpx_client, parameters, strategy_config, keys, source_ip_address
+                )
+                errors.extend(enrichment.errors)
+                image_analysis = enrichment.image_analysis
+                location_metadata = enrichment.location_metadata
+
+                story_frames_response = await strategy_class().get_frame_sequence(
+                    parameters,
+                    image_analysis,
+                    location_metadata,
+                    strategy_config,
                     keys,
+                    sparrow_state,
+                    story,
+                    httpx_client,
                 )
-                print(f"{image_analysis=}")
-
-            except Exception as e:
-                traceback.print_exc(file=sys.stderr)
-                errors.append(str(e))
-
-        language = "en"
-        if (
-            strategy_config.text_to_text_model_config
-            and strategy_config.text_to_text_model_config
-            and strategy_config.text_to_text_model_config.prompt_template
-            and strategy_config.text_to_text_model_config.prompt_template.target_language
-        ):
-            language = (
-                strategy_config.text_to_text_model_config.prompt_template.target_language
-            )
-
-        if parameters.input_audio_filename:
-            text = await audio_to_text_inference(
-                httpx_client, parameters.input_audio_filename, language, keys
-            )
-            parameters.input_text = text
-
-        story_frames_response = await strategy_class().get_frame_sequence(
-            parameters,
-            image_analysis,
-            location_metadata,
-            strategy_config,
-            keys,
-            sparrow_state,
-            story,
-            httpx_client,
+
+        story_frames_response.debug_data = {
+            **(story_frames_response.debug_data or {}),
+            "story_id": story.cuid,
+            "story_title": story.title,
+            "thoth_link": f"{base_url}thoth/story/{story.cuid}",
+            "enrichment_timings": enrichment.timings,
+            "location_cache_stats": get_location_cache_stats(),
+            "rendition_cache_stats": get_rendition_cache_stats(),
+        }
+        if image_analysis:
+            i_see = image_analysis.get("description")
+            story_frames_response.debug_data["i_see"] = i_see
+            story_frames_response.debug_data["image_analysis"] = image_analysis
+        if parameters.input_audio_filename and parameters.input_text:
+            i_hear = parameters.input_text
+            story_frames_response.debug_data["i_hear"] = i_hear
+
+        # (Deferred frames are saved with their renditions when committed.)
+        await prepare_frame_images(
+            parameters, story_frames_response.frames, save=not speculative
         )
+        await put_story(story)
+        await put_sparrow_state(sparrow_state)
 
-    story_frames_response.debug_data = {
-        **(story_frames_response.debug_data or {}),
-        "story_id": story.cuid,
-        "story_title": story.title,
-        "thoth_link": f"{base_url}thoth/story/{story.cuid}",
-    }
-    if image_analysis:
-        i_see = image_analysis.get("description")
-        story_frames_response.debug_data["i_see"] = i_see
-        story_frames_response.debug_data["image_analysis"] = image_analysis
-    if parameters.input_audio_filename and parameters.input_text:
-        i_hear = parameters.input_text
-        story_frames_response.debug_data["i_hear"] = i_hear
-
-    await prepare_frame_images(parameters, story_frames_response.frames)
-    await put_story(story)
-    await put_sparrow_state(sparrow_state)
+        frame_models = [frame.to_pydantic() for frame in story_frames_response.frames]
+
+        response = StoryResponseV1(
+            frames=frame_models,
+            story_id=story.cuid,
+            slug=story.slug,
+            story_frame_count=await story.get_num_frames(),
+            append_to_prior_frames=story_frames_response.append_to_prior_frames,
+            strategy=story.strategy_name,
+            is_read_only=story.created_for_sparrow_id != client_id,
+            created_for_sparrow_id=story.created_for_sparrow_id,
+            date_created=str(story.date_created.date()),
+            date_updated=str(story.date_updated.date()),
+            request_id=create_cuid(),
+            generation_date=str(datetime.utcnow()),
+            debug_data=story_frames_response.debug_data if parameters.debug else {},
+            errors=story_frames_response.errors + errors,
+        )
+        return GeneratedFrames(
+            response=response,
+            story=story,
+            first_frame_number=first_frame_number,
+            unit_of_work=unit_of_work_ if speculative else None,
+        )
 
-    frame_models = [frame.to_pydantic() for frame in story_frames_response.frames]
+
+async def _get_fallback_frames(
+    parameters: FramesRequestParamsModel,
+    story: Optional[Story],
+    client_id: str,
+    fallback_reason: str,
+) -> GeneratedFrames:
+    """
+    Answers a request that couldn't be admitted with the story's latest frame,
+    or failing that (or if there's no story yet), a sleep frame, rendered for
+    the client's display. Nothing is saved.
+    """
+    frames = (
+        list(await story.get_frames(max_frames=-1, include_media=True))
+        if story
+        else []
+    )
+    if frames:
+        # Render the frame afresh from its original image, since the one last
+        # served may have been for a different display.
+        prepare_existing_frame_images(frames)
+    else:
+        frames = [_get_sleep_frame()]
+    await prepare_frame_images(parameters, frames, save=False)
+    frame_count = await story.get_frame_count() if story else 0
+    today = str(datetime.now(timezone.utc).date())
 
     response = StoryResponseV1(
-        frames=frame_models,
-        story_id=story.cuid,
-        slug=story.slug,
-        story_frame_count=await story.get_num_frames(),
-        append_to_prior_frames=story_frames_response.append_to_prior_frames,
-        strategy=story.strategy_name,
-        is_read_only=story.created_for_sparrow_id != client_id,
-        created_for_sparrow_id=story.created_for_sparrow_id,
-        date_created=str(story.date_created.date()),
-        date_updated=str(story.date_updated.date()),
+        frames=[frame.to_pydantic() for frame in frames],
+        story_id=story.cuid if story else None,
+        slug=story.slug if story else None,
+        story_frame_count=frame_count,
+        append_to_prior_frames=False,
+        strategy=story.strategy_name if story else parameters.strategy,
+        is_read_only=story is not None and story.created_for_sparrow_id != client_id,
+        created_for_sparrow_id=story.created_for_sparrow_id if story else client_id,
+        date_created=str(story.date_created.date()) if story else today,
+        date_updated=str(story.date_updated.date()) if story else today,
         request_id=create_cuid(),
         generation_date=str(datetime.utcnow()),
-        debug_data=story_frames_response.debug_data if parameters.debug else {},
-        errors=story_frames_response.errors + errors,
+        debug_data=(
+            {
+                "story_id": story.cuid if story else None,
+                "admission_stats": frame_admission.stats,
+            }
+            if parameters.debug
+            else {}
+        ),
+        errors=[],
+        fallback_reason=fallback_reason,
+    )
+    return GeneratedFrames(
+        response=response,
+        story=story,
+        first_frame_number=frame_count,
     )
-    return response
 
 
 async def handle_existing_frames_request(
@@ -508,21 +703,27 @@ async def get_stories(
     request_params: StoriesRequestParamsModel = Depends(StoriesRequestParamsModel),
 ) -> StoriesResponseV1:
     """
-    Gets all stories attributed to this client_id.
+    Gets the stories attributed to this client_id, a page at a time. Pass the
+    response's next_cursor to get the following page.
     """
     client_id = request_params.client_id
     sparrow_state = await get_sparrow_state(client_id)
 
     current_story = sparrow_state.current_story
 
-    all_stories = await get_stories_by_client(client_id)
+    try:
+        stories_page = await get_stories_by_client(
+            client_id, limit=request_params.limit, cursor=request_params.cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
     story_infos = [
         StoryInfo(
             story_id=story.cuid,
             title=shorten_title(story.title),
             slug=story.slug,
-            story_frame_count=1,  # await story.get_num_frames(),
+            story_frame_count=story.frame_count,
             is_bookmarked=False,
             is_current=story.cuid == current_story is not None and current_story.cuid,
             is_read_only=client_id != story.created_for_sparrow_id,
@@ -534,13 +735,14 @@ async def get_stories(
             date_created=str(story.date_created.date()),
             date_updated=str(story.date_updated.date()),
         )
-        for story in all_stories
+        for story in stories_page.rows
     ]
 
     response = StoriesResponseV1(
         stories=story_infos,
         request_id=create_cuid(),
         generation_date=str(datetime.utcnow()),
+        next_cursor=stories_page.next_cursor,
     )
 
     return response
@@ -8,7 +8,7 @@ Uses Firebase Realtime Database for real-time updates.
 
 from datetime import datetime
 import logging
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from pydantic import BaseModel
@@ -26,6 +26,7 @@ from calliope.tables import Story
 from calliope.tasks.factory import configure_task_queue
 from calliope.tasks.queue import TaskQueue
 from calliope.utils.id import create_cuid
+from calliope.utils.pagination import estimate_row_count, get_keyset_page
 from calliope.utils.story import prepare_existing_frame_images
 
 logger = logging.getLogger(__name__)
@@ -373,49 +374,49 @@ async def get_story_state(
 async def list_stories(
     client_id: Optional[str] = None,
     limit: int = Query(20, ge=1, le=100),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    include_total: bool = False,
 ):
     """
-    List stories with pagination
+    List stories with pagination, most recently updated first
 
     Args:
         client_id: Optional client ID to filter by
         limit: Maximum number of stories to return
-        offset: Number of stories to skip
+        cursor: The next_cursor of the previous page, if any
+        include_total: Whether to include an approximate total number of stories
     """
     try:
         # Build the query
-        query = Story.select()
+        query = Story.objects()
         if client_id:
             query = query.where(Story.created_for_sparrow_id == client_id)
 
-        # Add pagination and ordering
-        query = query.order_by(Story.date_created, ascending=False)
-        query = query.limit(limit).offset(offset)
+        try:
+            page = await get_keyset_page(query, Story, limit, cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
 
-        # Execute the query
-        stories = await query
-
-        # Get total count for pagination
-        count_query = Story.count()
-        if client_id:
-            count_query = count_query.where(Story.created_for_sparrow_id == client_id)
-        total_count = await count_query
-
-        # Convert to dictionaries
-        story_dicts = [story.to_dict() for story in stories]
+        pagination: Dict[str, Any] = {
+            "limit": limit,
+            "cursor": cursor,
+            "next_cursor": page.next_cursor,
+            "has_more": page.has_more,
+        }
+        if include_total:
+            # An estimate from the query planner, which costs the same however
+            # many stories there are.
+            pagination["total"] = await estimate_row_count(query)
+            pagination["total_is_approximate"] = True
 
         # Return with pagination metadata
         return {
-            "stories": story_dicts,
-            "pagination": {
-                "total": total_count,
-                "limit": limit,
-                "offset": offset,
-                "has_more": (offset + len(stories)) < total_count,
-            },
+            "stories": [story.to_dict() for story in page.rows],
+            "pagination": pagination,
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.exception(f"Error listing stories: {e!s}")
         raise HTTPException(
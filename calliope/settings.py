@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 
 from pydantic_settings import BaseSettings
 
@@ -21,6 +22,25 @@ class Settings(BaseSettings):
     PINECONE_API_KEY: str
     OPENAI_API_KEY: str
 
+    # A CSV IP range database for offline geolocation. (See location/geoip.py.)
+    GEOIP_DATABASE_PATH: Optional[str] = None
+
+    # Where to get positions of the Sun, Moon, and planets: "local" to compute
+    # them (see location/ephemeris.py), or "remote" to ask web services.
+    EPHEMERIS_SOURCE: str = "local"
+
+    # Whether to generate each sparrow's next frame ahead of its request, how
+    # long to hold such a frame, and how many to start per flock per hour.
+    # (See utils/speculation.py.)
+    SPECULATIVE_FRAMES_ENABLED: bool = False
+    SPECULATIVE_FRAME_TTL_SECONDS: int = 600
+    SPECULATIVE_FRAMES_PER_FLOCK_PER_HOUR: int = 60
+
+    # How many frame generations may wait on any one inference provider before
+    # more are refused and answered with frames already made. 0 for no limit.
+    # (See utils/admission.py.)
+    MAX_GENERATIONS_IN_FLIGHT_PER_PROVIDER: int = 32
+
     def update(self, name: str, value: str) -> None:
         """
         Updates settings and the system environment variable 'name' to 'value'.
@@ -1,6 +1,9 @@
+from copy import deepcopy
+from dataclasses import dataclass
 from enum import Enum
 from typing import Any, Dict, List, Optional, Sequence, Tuple, cast
 
+from cachetools import TTLCache
 from rich import print
 
 from calliope.models import (
@@ -8,11 +11,23 @@ from calliope.models import (
     KeysModel,
     StrategyConfigDescriptortModel,
 )
+from calliope.storage.config_registry import (
+    ConfigSnapshot,
+    get_config_snapshot,
+    invalidate_config_snapshot,
+)
 from calliope.tables import ClientTypeConfig, SparrowConfig
 from calliope.tables.model_config import StrategyConfig
 from calliope.utils.piccolo import load_json_if_necessary
 
 
+# How long a resolved sparrow configuration may be served from the in-process cache.
+# Edits made through Piccolo Admin invalidate the cache immediately; the TTL bounds
+# staleness for edits made elsewhere (e.g. by another server instance).
+RESOLVED_CONFIG_TTL_SECONDS = 300
+RESOLVED_CONFIG_CACHE_SIZE = 1024
+
+
 class ConfigType(Enum):
     SPARROW = "sparrow"
     CLIENT_TYPE = "client-type"
@@ -32,6 +47,38 @@ async def get_sparrow_config(sparrow_or_flock_id: str) -> Optional[SparrowConfig
     )
 
 
+async def get_sparrow_config_chain(sparrow_or_flock_id: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieves, in a single query, the configs of the given sparrow or flock, of the
+    "default" config, and of all of the flocks from which either of them inherits
+    (following parent_flock_client_id as deep as it goes).
+
+    Returns:
+        a dictionary of raw config rows (client_id, parent_flock_client_id,
+        parameters, keys) keyed by client_id. The caller is responsible for
+        walking the chain and detecting inheritance loops. (The query itself
+        stops at a loop, since UNION discards rows already found.)
+    """
+    rows = await SparrowConfig.raw(
+        """
+        WITH RECURSIVE chain AS (
+            SELECT client_id, parent_flock_client_id, parameters, keys
+            FROM sparrow_config
+            WHERE client_id IN ({}, 'default')
+          UNION
+            SELECT parent.client_id, parent.parent_flock_client_id,
+                parent.parameters, parent.keys
+            FROM sparrow_config parent
+            JOIN chain ON parent.client_id = chain.parent_flock_client_id
+        )
+        SELECT client_id, parent_flock_client_id, parameters, keys FROM chain
+        """,
+        sparrow_or_flock_id,
+    ).run()
+
+    return {row["client_id"]: row for row in rows}
+
+
 async def get_client_type_config(client_type_id: str) -> Optional[ClientTypeConfig]:
     """
     Retrieves the given client type config.
@@ -54,32 +101,155 @@ async def get_sparrow_story_parameters_and_keys(
     parameters, taking into account the sparrow and flock
     configurations and schedules.
     """
-    sparrow_or_flock_id: Optional[str] = request_params.client_id
+    # 1. Take as the story params the request_params furnished with the API request.
+    request_params_dict = _get_non_default_parameters(request_params.model_dump())
+
+    # 2. Merge in everything inherited from the sparrow/flock chain, the client
+    # type, and the strategy config. This only depends on the client ID and on the
+    # client type and strategy (if any) given with the request, so is cached.
+    resolved_config = await get_resolved_config(
+        request_params.client_id,
+        request_params_dict.get("client_type"),
+        request_params_dict.get("strategy"),
+    )
+
+    # As with other parameter merging, parameters passed with the request take
+    # precedence.
+    params_dict = {**deepcopy(resolved_config.parameters), **request_params_dict}
+
+    print(
+        f"Merged parameters: {str({key: val for key, val in params_dict.items() if key not in ('input_image', 'input_audio')})}"
+    )
+
+    return (
+        FramesRequestParamsModel(**params_dict),
+        KeysModel(**resolved_config.keys),
+        resolved_config.strategy_config,
+    )
+
+
+@dataclass(frozen=True)
+class ResolvedConfig:
+    """
+    The configuration inherited by a sparrow, with everything merged except the
+    parameters furnished with any particular request.
+    """
+
+    # The merged parameters of the sparrow/flock chain, client type, and strategy.
+    parameters: Dict[str, Any]
+
+    # The merged keys of the sparrow/flock chain.
+    keys: Dict[str, Any]
+
+    # The strategy config, with its model configs, models, and prompt templates.
+    strategy_config: StrategyConfig
+
+    # The generation of the config snapshot from which strategy_config was taken.
+    config_generation: int
+
+    # The flock to which the sparrow belongs, if any.
+    flock_id: Optional[str] = None
+
+
+# Resolved configs, keyed by (client_id, client_type, strategy).
+_resolved_config_cache: TTLCache = TTLCache(
+    maxsize=RESOLVED_CONFIG_CACHE_SIZE, ttl=RESOLVED_CONFIG_TTL_SECONDS
+)
+
+# Bumped on every invalidation, so a resolution that was in flight when the cache
+# was invalidated doesn't repopulate the cache with stale data.
+_resolved_config_generation = 0
+
+
+def invalidate_config_cache() -> None:
+    """
+    Discards all cached resolved configs. Call this whenever a SparrowConfig,
+    ClientTypeConfig, StrategyConfig, ModelConfig, InferenceModel, or PromptTemplate
+    changes. (Since a flock's config is inherited by all of its descendants, any
+    change may affect many entries, so we simply drop them all.)
+    """
+    global _resolved_config_generation
+
+    _resolved_config_generation += 1
+    _resolved_config_cache.clear()
+    invalidate_config_snapshot()
+
+
+async def get_resolved_config(
+    client_id: Optional[str],
+    client_type: Optional[str] = None,
+    strategy: Optional[str] = None,
+) -> ResolvedConfig:
+    """
+    Gets the configuration inherited by the given sparrow, served from an in-process
+    cache when possible.
+
+    Args:
+        client_id: the sparrow or flock ID.
+        client_type: the client type given with the request, if any.
+        strategy: the strategy given with the request, if any.
+    """
+    cache_key = (client_id, client_type, strategy)
+    snapshot = await get_config_snapshot()
+    resolved_config: Optional[ResolvedConfig] = _resolved_config_cache.get(cache_key)
+    if resolved_config and resolved_config.config_generation == snapshot.generation:
+        return resolved_config
+
+    generation = _resolved_config_generation
+    resolved_config = await _resolve_config(client_id, client_type, strategy)
+    if generation == _resolved_config_generation:
+        _resolved_config_cache[cache_key] = resolved_config
+
+    return resolved_config
+
+
+async def _resolve_config(
+    client_id: Optional[str],
+    client_type: Optional[str],
+    strategy: Optional[str],
+) -> ResolvedConfig:
+    """
+    Resolves the configuration inherited by the given sparrow from the database.
+    """
+    # Fetch every config the sparrow could inherit from in one round trip.
+    sparrow_and_flock_configs = (
+        await get_sparrow_config_chain(client_id) if client_id else {}
+    )
+
+    sparrow_or_flock_id: Optional[str] = client_id
 
     sparrows_and_flocks_visited: List[str] = []
+    flock_id: Optional[str] = None
 
-    # Assemble the story parameters...
-    # 1. Take as the story params the request_params furnished with the API request.
-    params_dict = _get_non_default_parameters(request_params.model_dump())
+    params_dict: Dict[str, Any] = {}
+    if client_type:
+        params_dict["client_type"] = client_type
+    if strategy:
+        params_dict["strategy"] = strategy
     keys_dict: Dict[str, Any] = {}
 
     while sparrow_or_flock_id:
-        # 2. Check to see whether there is a config for the given sparrow or flock ID.
-        sparrow_or_flock_config = await get_sparrow_config(sparrow_or_flock_id)
+        # 1. Check to see whether there is a config for the given sparrow or flock ID.
+        sparrow_or_flock_config = sparrow_and_flock_configs.get(sparrow_or_flock_id)
         if not sparrow_or_flock_config:
             # Fall back on the default config.
             sparrow_or_flock_id = "default"
-            sparrow_or_flock_config = await get_sparrow_config(sparrow_or_flock_id)
+            sparrow_or_flock_config = sparrow_and_flock_configs.get(sparrow_or_flock_id)
 
         if sparrow_or_flock_config:
-            # 3. If there's a sparrow/flock config, collect its parameters and merge
+            # 2. If there's a sparrow/flock config, collect its parameters and merge
             # them with those already assembled...
             sparrow_or_flock_params_dict = {}
 
-            if sparrow_or_flock_config.parameters:
+            # Raw rows carry JSONB as JSON text, so decode before testing for
+            # emptiness.
+            sparrow_or_flock_parameters = _load_json_column(
+                sparrow_or_flock_config["parameters"]
+            )
+            if sparrow_or_flock_parameters:
                 # Does the sparrow or flock have parameters?
                 sparrow_or_flock_params_dict = _get_non_default_parameters(
-                    load_json_if_necessary(sparrow_or_flock_config.parameters)
+                    sparrow_or_flock_parameters
                 )
 
             """
@@ -97,18 +267,20 @@ async def get_sparrow_story_parameters_and_keys(
                 # precedence to those already assembled.
                 params_dict = {**sparrow_or_flock_params_dict, **params_dict}
 
-            if sparrow_or_flock_config.keys:
-                # 3.5 Merge keys similarly.
-                sparrow_or_flock_keys_dict = load_json_if_necessary(
-                    sparrow_or_flock_config.keys
-                )
+            sparrow_or_flock_keys_dict = _load_json_column(
+                sparrow_or_flock_config["keys"]
+            )
+            if sparrow_or_flock_keys_dict:
+                # 2.5 Merge keys similarly.
                 keys_dict = {**sparrow_or_flock_keys_dict, **keys_dict}
 
-            # 4. Take the flock ID from the parent flock.
-            sparrow_or_flock_id = sparrow_or_flock_config.parent_flock_client_id
+            # 3. Take the flock ID from the parent flock.
+            sparrow_or_flock_id = sparrow_or_flock_config["parent_flock_client_id"]
+            if sparrow_or_flock_config["client_id"] == client_id:
+                flock_id = sparrow_or_flock_id
             if (
                 not sparrow_or_flock_id
-                and sparrow_or_flock_config.client_id != "default"
+                and sparrow_or_flock_config["client_id"] != "default"
             ):
                 sparrow_or_flock_id = "default"
 
@@ -129,14 +301,14 @@ async def get_sparrow_story_parameters_and_keys(
             # If there was no config for that sparrow or flock, we're done.
             sparrow_or_flock_id = None
 
-    # 5. Check for a configuration for the client_type.
+    # 4. Check for a configuration for the client_type.
     # Note that the client type can either be passed with the request or
     # come from a sparrow config.
     client_type = params_dict.get("client_type")
     if client_type:
         client_type_config = await get_client_type_config(client_type)
         if client_type_config:
-            # 5.1. If there is one, merge it with the request parameters.
+            # 4.1. If there is one, merge it with the request parameters.
             client_type_config_dict = _get_non_default_parameters(
                 load_json_if_necessary(client_type_config.parameters)
             )
@@ -147,24 +319,26 @@ async def get_sparrow_story_parameters_and_keys(
     if not params_dict.get("strategy"):
         params_dict["strategy"] = "fern"
 
-    strategy_config = await get_strategy_config(params_dict["strategy"])
-    if strategy_config:
-        strategy_params = _get_non_default_parameters(
-            load_json_if_necessary(strategy_config.parameters)
-        )
-        params_dict = {**strategy_params, **params_dict}
-
-    print(
-        f"Merged parameters: {str({key: val for key, val in params_dict.items() if key not in ('input_image', 'input_audio')})}"
+    snapshot = await get_config_snapshot()
+    strategy_config = _get_strategy_config_from_snapshot(
+        snapshot, params_dict["strategy"]
     )
-
-    return (
-        FramesRequestParamsModel(**params_dict),
-        KeysModel(**keys_dict),
-        strategy_config,
+    strategy_params = _get_non_default_parameters(strategy_config.parameters)
+    params_dict = {**strategy_params, **params_dict}
+
+    return ResolvedConfig(
+        parameters=params_dict,
+        keys=keys_dict,
+        strategy_config=strategy_config,
+        config_generation=snapshot.generation,
+        flock_id=flock_id,
     )
 
 
+def _load_json_column(value: Any) -> Any:
+    return load_json_if_necessary(value) if value else None
+
+
 def _get_non_default_parameters(params_dict: Dict[str, Any]) -> Dict[str, Any]:
     non_default_request_params = {}
     # Get the request parameters with non-default values.
@@ -178,75 +352,25 @@ def _get_non_default_parameters(params_dict: Dict[str, Any]) -> Dict[str, Any]:
 
 async def get_strategy_config(strategy_config_slug: str) -> StrategyConfig:
     """
-    Retrieves the given StrategyConfig, if any.
-    Also loads referenced model configs, models, and prompt templates.
+    Retrieves the given StrategyConfig, or failing that, the default StrategyConfig
+    for the strategy of that name. Its model configs, models, and prompt templates
+    are linked.
+
+    The StrategyConfig comes from the shared config snapshot, so must not be
+    modified.
     """
-    print(f"get_strategy_config({strategy_config_slug})")
-    strategy_config: Optional[StrategyConfig] = cast(
-        Optional[StrategyConfig],
-        await StrategyConfig.objects(
-            StrategyConfig.text_to_image_model_config.all_related(),
-            StrategyConfig.text_to_text_model_config.all_related(),
-            StrategyConfig.text_to_video_model_config.all_related(),
-        )
-        .where(StrategyConfig.slug == strategy_config_slug)
-        .first()
-        .output(load_json=True)
-        .run(),
+    return _get_strategy_config_from_snapshot(
+        await get_config_snapshot(), strategy_config_slug
     )
 
-    if not strategy_config:
-        print(
-            f"There isn't a strategy_config called {strategy_config_slug}. "
-            "Looking for a default strategy_config for strategy {strategy_config_slug}."
-        )
-        # If StrategyConfig of the given slug is not found, then look for one that
-        # references a strategy of that name and for which is_default is True.
-        strategy_config = cast(
-            StrategyConfig,
-            await StrategyConfig.objects(
-                StrategyConfig.text_to_image_model_config.all_related(),
-                StrategyConfig.text_to_text_model_config.all_related(),
-            )
-            .where(
-                (StrategyConfig.strategy_name == strategy_config_slug)
-                & (StrategyConfig.is_default == True)  # noqa: E712
-            )
-            .first()
-            .output(load_json=True)
-            .run(),
-        )
-        print(f"Found {strategy_config.slug if strategy_config else None}.")
 
+def _get_strategy_config_from_snapshot(
+    snapshot: ConfigSnapshot, strategy_config_slug: str
+) -> StrategyConfig:
+    strategy_config = snapshot.get_strategy_config(strategy_config_slug)
     if not strategy_config:
         raise ValueError(f"No strategy config found for {strategy_config_slug}.")
 
-    if strategy_config.text_to_text_model_config:
-        strategy_config.text_to_text_model_config.model_parameters = (
-            load_json_if_necessary(
-                strategy_config.text_to_text_model_config.model_parameters
-            )
-        )
-        if strategy_config.text_to_text_model_config.model:
-            strategy_config.text_to_text_model_config.model.model_parameters = (
-                load_json_if_necessary(
-                    strategy_config.text_to_text_model_config.model.model_parameters
-                )
-            )
-
-    if strategy_config.text_to_image_model_config:
-        strategy_config.text_to_image_model_config.model_parameters = (
-            load_json_if_necessary(
-                strategy_config.text_to_image_model_config.model_parameters
-            )
-        )
-        if strategy_config.text_to_image_model_config.model:
-            strategy_config.text_to_image_model_config.model.model_parameters = (
-                load_json_if_necessary(
-                    strategy_config.text_to_image_model_config.model.model_parameters
-                )
-            )
-
     return strategy_config
 
 
@@ -262,10 +386,7 @@ async def get_strategy_config_descriptors(
     else:
         default_strategy_config = None
 
-    strategy_configs: Sequence[StrategyConfig] = await StrategyConfig.objects(
-        StrategyConfig.text_to_image_model_config.all_related(),
-        StrategyConfig.text_to_text_model_config.all_related(),
-    ).run()
+    strategy_configs = (await get_config_snapshot()).strategy_configs
 
     descriptors = [
         StrategyConfigDescriptortModel(
@@ -0,0 +1,317 @@
+"""
+An in-memory registry of strategy configs, model configs, inference models, and
+prompt templates.
+
+These rows change rarely (typically through Piccolo Admin) but are needed on every
+frame request, so rather than querying them each time, the registry loads them all
+at once into a fully linked snapshot. When a change is detected, a new snapshot is
+built and swapped in whole, so readers always see a consistent set of configs.
+
+Snapshot objects are shared by all requests and must be treated as read-only.
+"""
+
+import asyncio
+from datetime import datetime
+import time
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Sequence, cast
+
+from calliope.tables.model_config import (
+    InferenceModel,
+    ModelConfig,
+    PromptTemplate,
+    StrategyConfig,
+)
+from calliope.utils.piccolo import load_json_if_necessary
+
+
+# How often (at most) to ask the database whether any config has changed.
+CONFIG_VERSION_CHECK_INTERVAL_SECONDS = 10
+
+# Model configs that aren't stored in the database, but built on the fly for
+# helper passes (text cleanup, censoring, etc.), keyed by slug. Each names the
+# slug of the inference model it wraps.
+HELPER_MODEL_CONFIG_MODEL_SLUGS = {
+    "gpt-4o-cleaner": "openai-gpt-4o",
+    "chaos-and-creativity": "huggingface-gpt-neo-2.7B",
+}
+
+
+class ConfigSnapshot:
+    """
+    An immutable, fully linked view of all strategy configs, model configs,
+    inference models, and prompt templates at a point in time.
+    """
+
+    def __init__(
+        self,
+        generation: int,
+        version: str,
+        strategy_configs: Sequence[StrategyConfig],
+        model_configs: Sequence[ModelConfig],
+        inference_models: Sequence[InferenceModel],
+        prompt_templates: Sequence[PromptTemplate],
+    ) -> None:
+        """
+        Args:
+            generation: a number that increases with every snapshot loaded.
+            version: the database version string from which the snapshot was built.
+            strategy_configs: all strategy configs, with foreign keys linked.
+            model_configs: all model configs, with foreign keys linked.
+            inference_models: all inference models.
+            prompt_templates: all prompt templates.
+        """
+        self.generation = generation
+        self.version = version
+        self.loaded_at = datetime.now()
+        self.strategy_configs: Sequence[StrategyConfig] = tuple(strategy_configs)
+        self.strategy_configs_by_slug: Mapping[str, StrategyConfig] = MappingProxyType(
+            {strategy_config.slug: strategy_config for strategy_config in strategy_configs}
+        )
+        self.model_configs_by_slug: Mapping[str, ModelConfig] = MappingProxyType(
+            {model_config.slug: model_config for model_config in model_configs}
+        )
+        self.inference_models_by_slug: Mapping[str, InferenceModel] = MappingProxyType(
+            {model.slug: model for model in inference_models}
+        )
+        self.prompt_templates_by_slug: Mapping[str, PromptTemplate] = MappingProxyType(
+            {template.slug: template for template in prompt_templates}
+        )
+        self.helper_model_configs_by_slug: Mapping[str, ModelConfig] = MappingProxyType(
+            {
+                slug: ModelConfig(
+                    slug=slug,
+                    description="",
+                    model_parameters={},
+                    model=self.inference_models_by_slug[model_slug],
+                )
+                for slug, model_slug in HELPER_MODEL_CONFIG_MODEL_SLUGS.items()
+                if model_slug in self.inference_models_by_slug
+            }
+        )
+
+    def get_strategy_config(self, strategy_config_slug: str) -> Optional[StrategyConfig]:
+        """
+        Gets the StrategyConfig of the given slug. Failing that, gets the default
+        StrategyConfig for the strategy of that name, if any.
+        """
+        strategy_config = self.strategy_configs_by_slug.get(strategy_config_slug)
+        if not strategy_config:
+            strategy_config = next(
+                (
+                    candidate
+                    for candidate in self.strategy_configs
+                    if candidate.strategy_name == strategy_config_slug
+                    and candidate.is_default
+                ),
+                None,
+            )
+        return strategy_config
+
+
+async def get_model_config(model_config_slug: str) -> Optional[ModelConfig]:
+    """
+    Gets the ModelConfig of the given slug, with its model and prompt template
+    linked, if there is one. It must not be modified.
+    """
+    return (await get_config_snapshot()).model_configs_by_slug.get(model_config_slug)
+
+
+async def get_helper_model_config(model_config_slug: str) -> ModelConfig:
+    """
+    Gets one of the helper model configs of HELPER_MODEL_CONFIG_MODEL_SLUGS. It
+    must not be modified.
+
+    Raises:
+        ValueError: if the model it wraps isn't in the database.
+    """
+    model_config = (await get_config_snapshot()).helper_model_configs_by_slug.get(
+        model_config_slug
+    )
+    if not model_config:
+        model_slug = HELPER_MODEL_CONFIG_MODEL_SLUGS.get(model_config_slug)
+        raise ValueError(f"No {model_slug} model found.")
+
+    return model_config
+
+
+_snapshot: Optional[ConfigSnapshot] = None
+_snapshot_is_stale = False
+_last_version_check = 0.0
+_load_lock: Optional[asyncio.Lock] = None
+_version_check_task: Optional["asyncio.Task[None]"] = None
+
+
+async def get_config_snapshot() -> ConfigSnapshot:
+    """
+    Gets the current config snapshot, loading it if this is the first use or the
+    snapshot has been invalidated. Otherwise, never waits on the database: at most
+    every CONFIG_VERSION_CHECK_INTERVAL_SECONDS, a background check compares the
+    snapshot's version against the database and reloads if they differ.
+    """
+    global _last_version_check, _version_check_task
+
+    if not _snapshot or _snapshot_is_stale:
+        return await load_config_snapshot()
+
+    now = time.monotonic()
+    if now - _last_version_check > CONFIG_VERSION_CHECK_INTERVAL_SECONDS and not (
+        _version_check_task and not _version_check_task.done()
+    ):
+        _last_version_check = now
+        _version_check_task = asyncio.create_task(_check_config_version())
+
+    return _snapshot
+
+
+def invalidate_config_snapshot() -> None:
+    """
+    Marks the snapshot stale, so it will be reloaded on next use.
+    """
+    global _snapshot_is_stale
+
+    _snapshot_is_stale = True
+
+
+async def load_config_snapshot() -> ConfigSnapshot:
+    """
+    (Re)loads the snapshot from the database and swaps it in. Concurrent callers
+    share a single load.
+    """
+    global _load_lock, _snapshot, _snapshot_is_stale, _last_version_check
+
+    if not _load_lock:
+        _load_lock = asyncio.Lock()
+
+    generation = _snapshot.generation if _snapshot else 0
+    async with _load_lock:
+        if _snapshot and _snapshot.generation != generation and not _snapshot_is_stale:
+            # Someone else loaded a fresh snapshot while we waited.
+            return _snapshot
+
+        # Clear the flag before reading, so an invalidation that arrives while
+        # we're loading triggers another load.
+        _snapshot_is_stale = False
+        _last_version_check = time.monotonic()
+        _snapshot = await _build_snapshot(generation + 1)
+        print(
+            f"Loaded config snapshot {_snapshot.generation} "
+            f"({len(_snapshot.strategy_configs)} strategy configs)."
+        )
+        return _snapshot
+
+
+async def _check_config_version() -> None:
+    try:
+        version = await _get_config_version()
+        if _snapshot and version != _snapshot.version:
+            print("Configs have changed. Reloading config snapshot.")
+            invalidate_config_snapshot()
+            await load_config_snapshot()
+    except Exception as e:
+        print(f"Error checking config version: {e}")
+
+
+async def _get_config_version() -> str:
+    """
+    Gets a string that changes whenever any row of the snapshotted tables is
+    inserted, updated, or deleted.
+    """
+    rows = await StrategyConfig.raw(
+        """
+        SELECT concat_ws(
+            '|',
+            (SELECT count(*) || '@' || coalesce(max(date_updated)::text, '')
+                FROM strategy_config),
+            (SELECT count(*) || '@' || coalesce(max(date_updated)::text, '')
+                FROM model_config),
+            (SELECT count(*) || '@' || coalesce(max(date_updated)::text, '')
+                FROM inference_model),
+            (SELECT count(*) || '@' || coalesce(max(date_updated)::text, '')
+                FROM prompt_template)
+        ) AS version
+        """
+    ).run()
+    return cast(str, rows[0]["version"])
+
+
+async def _build_snapshot(generation: int) -> ConfigSnapshot:
+    # Read the version first, so a change made while we load is caught by the
+    # next version check rather than missed.
+    version = await _get_config_version()
+
+    prompt_templates = (
+        await PromptTemplate.objects()
+        .order_by(PromptTemplate.id)  # type: ignore[attr-defined]
+        .run()
+    )
+    inference_models = (
+        await InferenceModel.objects()
+        .order_by(InferenceModel.id)  # type: ignore[attr-defined]
+        .output(load_json=True)
+        .run()
+    )
+    model_configs = (
+        await ModelConfig.objects()
+        .order_by(ModelConfig.id)  # type: ignore[attr-defined]
+        .output(load_json=True)
+        .run()
+    )
+    strategy_configs = (
+        await StrategyConfig.objects()
+        .order_by(StrategyConfig.id)  # type: ignore[attr-defined]
+        .output(load_json=True)
+        .run()
+    )
+
+    prompt_templates_by_id = {
+        template.id: template  # type: ignore[attr-defined]
+        for template in prompt_templates
+    }
+    inference_models_by_id = {
+        model.id: model for model in inference_models  # type: ignore[attr-defined]
+    }
+    model_configs_by_id = {
+        model_config.id: model_config  # type: ignore[attr-defined]
+        for model_config in model_configs
+    }
+
+    for model in inference_models:
+        model.model_parameters = _load_json_column(model.model_parameters)
+
+    for model_config in model_configs:
+        model_config.model_parameters = _load_json_column(model_config.model_parameters)
+        model_config.model = inference_models_by_id.get(model_config.model)
+        model_config.prompt_template = prompt_templates_by_id.get(
+            model_config.prompt_template
+        )
+
+    for strategy_config in strategy_configs:
+        strategy_config.parameters = _load_json_column(strategy_config.parameters)
+        strategy_config.text_to_text_model_config = model_configs_by_id.get(
+            strategy_config.text_to_text_model_config
+        )
+        strategy_config.text_to_image_model_config = model_configs_by_id.get(
+            strategy_config.text_to_image_model_config
+        )
+        strategy_config.text_to_video_model_config = model_configs_by_id.get(
+            strategy_config.text_to_video_model_config
+        )
+        strategy_config.seed_prompt_template = prompt_templates_by_id.get(
+            strategy_config.seed_prompt_template
+        )
+
+    return ConfigSnapshot(
+        generation=generation,
+        version=version,
+        strategy_configs=strategy_configs,
+        model_configs=model_configs,
+        inference_models=inference_models,
+        prompt_templates=prompt_templates,
+    )
+
+
+def _load_json_column(value: Any) -> Dict[str, Any]:
+    # JSONB columns may arrive as JSON text, and may hold an empty string.
+    decoded = load_json_if_necessary(value) if value else None
+    return decoded or {}
@@ -8,6 +8,7 @@ from calliope.models import (
     SparrowStateModel,
     StoryModel,
 )
+from calliope.storage.unit_of_work import get_unit_of_work
 from calliope.tables import (
     SparrowState,
     Story,
@@ -23,6 +24,11 @@ from calliope.utils.google import (
     is_google_cloud_run_environment,
     list_google_files_with_prefix,
 )
+from calliope.utils.pagination import KeysetPage, get_keyset_page
+
+
+# The page size of get_stories_by_client when not given a limit.
+DEFAULT_STORIES_PAGE_SIZE = 20
 
 
 class StateType(Enum):
@@ -54,15 +60,32 @@ async def get_sparrow_state(sparrow_id: str) -> SparrowState:
     if sparrow_state.current_story and not sparrow_state.current_story.id:
         sparrow_state.current_story = None
 
+    unit_of_work = get_unit_of_work()
+    if unit_of_work:
+        unit_of_work.track(sparrow_state)
+        if sparrow_state.current_story:
+            unit_of_work.track(sparrow_state.current_story)
+
     return sparrow_state
 
 
 async def put_sparrow_state(state: SparrowState) -> None:
     """
-    Stores the given sparrow state.
+    Stores the given sparrow state. Within a unit of work, an existing state is
+    written when the unit of work ends.
     """
     state.date_updated = datetime.now(timezone.utc)
+
+    unit_of_work = get_unit_of_work()
+    if unit_of_work and state._exists_in_db:
+        unit_of_work.register(state, SparrowState._meta.non_default_columns)
+        return
+    if unit_of_work and unit_of_work.deferred:
+        raise ValueError("Can't create a sparrow state in a deferred unit of work.")
+
     await state.save().run()
+    if unit_of_work:
+        unit_of_work.track(state)
 
 
 def list_legacy_sparrow_states() -> Sequence[ModelAndMetadata]:
@@ -153,27 +176,56 @@ async def get_story(story_cuid: str) -> Optional[Story]:
     """
     Retrieves the given story.
     """
-    return await Story.objects().where(Story.cuid == story_cuid).first().run()
+    story = await Story.objects().where(Story.cuid == story_cuid).first().run()
+
+    unit_of_work = get_unit_of_work()
+    if story and unit_of_work:
+        unit_of_work.track(story)
+
+    return story
 
 
 async def put_story(story: Story, update_dates: bool = True) -> None:
     """
-    Stores the given story state.
+    Stores the given story state. Within a unit of work, an existing story is
+    written when the unit of work ends.
     """
     # TODO: Stop explicitly setting date_updated once possible.
     story.date_updated = datetime.now(timezone.utc)
-    await story.save().run()
 
+    unit_of_work = get_unit_of_work()
+    if unit_of_work and story._exists_in_db:
+        # The frame count is maintained separately, so mustn't be overwritten here.
+        unit_of_work.register(story, Story.columns_without_frame_count())
+        return
+    if unit_of_work and unit_of_work.deferred:
+        # (Frames and the like would need the new story's ID at once.)
+        raise ValueError("Can't create a story in a deferred unit of work.")
+
+    await story.save(columns=Story.columns_without_frame_count()).run()
+    if unit_of_work:
+        unit_of_work.track(story)
 
-async def get_stories_by_client(client_id: str) -> Sequence[Story]:
+
+async def get_stories_by_client(
+    client_id: str, limit: Optional[int] = None, cursor: Optional[str] = None
+) -> KeysetPage[Story]:
     """
-    Retrieves all stories attributed to the given client.
+    Retrieves a page of the stories attributed to the given client, most recently
+    updated first.
+
+    Args:
+        client_id: the client.
+        limit: the maximum number of stories to retrieve, or None for
+            DEFAULT_STORIES_PAGE_SIZE.
+        cursor: the next_cursor of a previous page, if continuing from one.
     """
-    return await Story.objects(Story.thumbnail_image).where(
+    query = Story.objects(Story.thumbnail_image).where(
         Story.created_for_sparrow_id == client_id
-    ).order_by(
-        Story.date_updated, ascending=False
-    ).run()
+    )
+    return await get_keyset_page(
+        query, Story, limit or DEFAULT_STORIES_PAGE_SIZE, cursor
+    )
 
 
 def _compose_state_filename(type: StateType, id: str) -> str:
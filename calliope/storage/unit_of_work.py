@@ -0,0 +1,270 @@
+"""
+Request-scoped batching of Story and SparrowState updates.
+
+Handling a frame request touches the story and sparrow state several times (new
+story, new title, slug, thumbnail, state props...). Within a unit of work,
+put_story and put_sparrow_state only note that a row has changed. When the unit
+of work ends, each changed row is written once, updating only the columns that
+actually changed (and date_updated), all in a single transaction.
+
+New rows are still inserted immediately, since others need their IDs. Columns
+saved directly in the meantime (a slug, say) should be noted with note_saved, so
+that they aren't written again.
+
+A deferred unit of work holds back every write, inserts included (see
+run_or_defer), until it is committed, or writes nothing if it is simply dropped.
+Frames generated speculatively, which may never be served, are made in one.
+"""
+
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from copy import deepcopy
+from datetime import datetime, timezone
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+import weakref
+
+from piccolo.columns import Column, ForeignKey
+from piccolo.engine import engine_finder
+from piccolo.table import Table
+
+
+_current_unit_of_work: ContextVar[Optional["UnitOfWork"]] = ContextVar(
+    "current_unit_of_work", default=None
+)
+
+
+class UnitOfWork:
+    """
+    Tracks the rows changed while handling a request, and writes them at the end.
+    """
+
+    def __init__(self, deferred: bool = False) -> None:
+        # Whether every write is held back until commit().
+        self.deferred = deferred
+
+        # The writes held back, in order.
+        self._deferred_writes: List[Callable[[], Awaitable[None]]] = []
+
+        # The column values of each row as last loaded or written, keyed by id(row),
+        # each with a weak reference to the row. (Rows compare by primary key, so
+        # can't be weak keys themselves. The reference tells whether an id is
+        # still that of the row snapshotted, or has been reused by a new one.)
+        self._snapshots: Dict[
+            int, Tuple["weakref.ReferenceType[Table]", Dict[str, Any]]
+        ] = {}
+
+        # The rows to be written, keyed by id(row), each with the columns that
+        # may be written.
+        self._pending: Dict[int, Tuple[Table, List[Column]]] = {}
+
+    def track(self, row: Table, columns: Optional[Sequence[Column]] = None) -> None:
+        """
+        Remembers the row's current values as those in the database, so that
+        only columns changed from here on are written.
+
+        Args:
+            row: the row.
+            columns: if given, only these columns' values are remembered (as
+                after they were saved directly), and any other changes to the
+                row are still written.
+        """
+        values = _get_column_values(row)
+        snapshot = self._get_snapshot(row)
+        if columns is not None:
+            if snapshot is not None:
+                for column in columns:
+                    snapshot[column._meta.name] = values[column._meta.name]
+            return
+
+        self._snapshots[id(row)] = (weakref.ref(row), values)
+
+    def register(self, row: Table, columns: List[Column]) -> None:
+        """
+        Notes that the row has been changed, and should be written when the unit
+        of work ends.
+
+        Args:
+            row: the changed row, which must already exist in the database.
+            columns: the columns that may be written. Only those whose values have
+                changed since the row was tracked are actually written.
+        """
+        self._pending[id(row)] = (row, columns)
+
+    def defer(self, write: Callable[[], Awaitable[None]]) -> None:
+        """
+        Holds back a write until the unit of work is committed.
+        """
+        self._deferred_writes.append(write)
+
+    async def commit(self) -> None:
+        """
+        Makes the writes of a deferred unit of work, in order, then writes the
+        changed rows, all in one transaction. Afterwards, the unit of work is no
+        longer deferred.
+        """
+        engine = engine_finder()
+        if not engine:
+            raise ValueError("No database engine is configured.")
+
+        self.deferred = False
+        writes = list(self._deferred_writes)
+        self._deferred_writes.clear()
+
+        token = _current_unit_of_work.set(self)
+        try:
+            async with engine.transaction():
+                for write in writes:
+                    await write()
+                await self.flush()
+        finally:
+            _current_unit_of_work.reset(token)
+
+    async def flush(self) -> None:
+        """
+        Writes all changed rows in one transaction.
+        """
+        if not self._pending:
+            return
+
+        pending = list(self._pending.values())
+        self._pending.clear()
+
+        updates = []
+        for row, columns in pending:
+            snapshot = self._get_snapshot(row)
+            values = _get_column_values(row)
+            # (date_updated is bumped by every put, and always written below.)
+            changed_columns = [
+                column
+                for column in columns
+                if column._meta.name != "date_updated"
+                and (
+                    snapshot is None
+                    or values.get(column._meta.name) != snapshot.get(column._meta.name)
+                )
+            ]
+            updates.append((row, changed_columns))
+
+        async with updates[0][0]._meta.db.transaction():
+            for row, changed_columns in updates:
+                date_updated = row._meta.get_column_by_name("date_updated")
+                if not getattr(row, date_updated._meta.name, None):
+                    setattr(row, date_updated._meta.name, datetime.now(timezone.utc))
+                changed_columns.append(date_updated)
+                await row.save(columns=changed_columns).run()
+
+        for row, _ in updates:
+            self.track(row)
+
+        print(
+            "Flushed "
+            + ", ".join(
+                f"{row._meta.tablename}({','.join(c._meta.name for c in columns)})"
+                for row, columns in updates
+            )
+        )
+
+    def _get_snapshot(self, row: Table) -> Optional[Dict[str, Any]]:
+        entry = self._snapshots.get(id(row))
+        if not entry:
+            return None
+        row_ref, snapshot = entry
+        return snapshot if row_ref() is row else None
+
+
+def get_unit_of_work() -> Optional[UnitOfWork]:
+    """
+    Gets the unit of work in progress, if any.
+    """
+    return _current_unit_of_work.get()
+
+
+def note_saved(row: Table, columns: Sequence[Column]) -> None:
+    """
+    Notes that the given columns of the row have just been saved directly, so
+    that the unit of work in progress, if any, doesn't write them again.
+    """
+    unit_of_work_ = get_unit_of_work()
+    if unit_of_work_:
+        unit_of_work_.track(row, columns)
+
+
+async def run_or_defer(write: Callable[[], Awaitable[None]]) -> bool:
+    """
+    Makes a write now, or within a deferred unit of work, when it is committed.
+
+    Returns:
+        whether the write was made now.
+    """
+    unit_of_work_ = get_unit_of_work()
+    if unit_of_work_ and unit_of_work_.deferred:
+        unit_of_work_.defer(write)
+        return False
+
+    await write()
+    return True
+
+
+async def save_columns(row: Table, columns: Sequence[Column]) -> None:
+    """
+    Saves the given columns of the row directly (now, or if deferred, when the
+    unit of work is committed), noting them as saved.
+    """
+
+    async def save() -> None:
+        await row.save(columns=list(columns)).run()
+        note_saved(row, columns)
+
+    await run_or_defer(save)
+
+
+@asynccontextmanager
+async def unit_of_work(deferred: bool = False) -> AsyncIterator[UnitOfWork]:
+    """
+    Begins a unit of work, which lasts until the end of the `async with` block.
+    Changed rows are written when the block is exited, even if by an exception,
+    as they would have been had each change been written immediately. (Or call
+    flush() to write them sooner.) If the block raised, that exception is the
+    one propagated, even if writing the rows fails too.
+
+    Args:
+        deferred: if true, nothing is written when the block is exited. Instead,
+            call commit() on the unit of work to make its writes, if ever.
+    """
+    unit_of_work_ = UnitOfWork(deferred=deferred)
+    token = _current_unit_of_work.set(unit_of_work_)
+    try:
+        yield unit_of_work_
+    except BaseException:
+        _current_unit_of_work.reset(token)
+        if not unit_of_work_.deferred:
+            try:
+                await unit_of_work_.flush()
+            except Exception as e:
+                print(f"Error writing changed rows after an error: {e}")
+        raise
+
+    _current_unit_of_work.reset(token)
+    if not unit_of_work_.deferred:
+        await unit_of_work_.flush()
+
+
+def _get_column_values(row: Table) -> Dict[str, Any]:
+    values = {}
+    for column in row._meta.columns:
+        value = getattr(row, column._meta.name, None)
+        if isinstance(column, ForeignKey) and isinstance(value, Table):
+            # Compare related rows by primary key.
+            value = getattr(value, value._meta.primary_key._meta.name, None)
+        values[column._meta.name] = deepcopy(value)
+    return values
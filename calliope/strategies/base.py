@@ -12,6 +12,7 @@ from calliope.models import (
 )
 from calliope.models.frame_sequence_response import StoryFrameSequenceResponseModel
 from calliope.storage.state_manager import put_story
+from calliope.storage.unit_of_work import run_or_defer
 from calliope.tables import (
     Image,
     Video,
@@ -22,6 +23,7 @@ from calliope.tables import (
     StoryFrame,
     StrategyConfig,
 )
+from calliope.utils.frame_events import emit_frame_event
 
 
 # By default, we ask each frame to be displayed for at
@@ -78,7 +80,8 @@ class StoryStrategy(object, metaclass=ABCMeta):
         video: Optional[Video] = None,
     ) -> StoryFrame:
         """
-        Adds a new frame to a story and persists everything.
+        Adds a new frame to a story and persists everything. (Within a deferred
+        unit of work, persisting waits until it's committed.)
 
         Args:
             story: the story up to now.
@@ -92,14 +95,6 @@ class StoryStrategy(object, metaclass=ABCMeta):
         Returns:
             the new frame.
         """
-        if image:
-            image.date_updated = datetime.now(timezone.utc)
-            await image.save().run()
-
-        if video:
-            video.date_updated = datetime.now(timezone.utc)
-            await video.save().run()
-
         frame = StoryFrame(
             story=story.id,  # type: ignore[attr-defined]
             number=frame_number,
@@ -113,8 +108,38 @@ class StoryStrategy(object, metaclass=ABCMeta):
                 "errors": errors,
             },
         )
-        frame.date_updated = datetime.now(timezone.utc)
-        await frame.save().run()
+        if not await run_or_defer(lambda: self._save_frame(story, frame)):
+            # The frame will be saved later, if at all (as when generated
+            # speculatively). Count it for now, so any next frame is numbered
+            # after it.
+            story.frame_count = await story.get_frame_count() + 1
+
+        if image:
+            # Streaming clients can show the original image while it's converted
+            # for their display.
+            emit_frame_event(
+                "image", frame_number=frame_number, image=image.to_pydantic()
+            )
+
+        return frame
+
+    async def _save_frame(self, story: Story, frame: StoryFrame) -> None:
+        """
+        Saves a new frame and its media, and updates the story's frame count,
+        title, slug, and thumbnail.
+        """
+        now = datetime.now(timezone.utc)
+        # (If saving was deferred, the frame's image may since have been replaced
+        # by a rendition for the client's display, so save that too.)
+        for media in (frame.source_image, frame.image, frame.video):
+            if media and not media._exists_in_db:
+                media.date_updated = now
+                await media.save().run()
+
+        frame.date_updated = now
+        async with StoryFrame._meta.db.transaction():
+            await frame.save().run()
+            await story.increment_frame_count()
 
         story_updated = False
         if not story.title or story.title == "Untitled":
@@ -122,7 +147,7 @@ class StoryStrategy(object, metaclass=ABCMeta):
             print(f"Computed story title: '{story.title}'")
             story_updated = True
         if not story.slug:
-            story.slug = await story.generate_unique_slug()
+            await story.assign_unique_slug()
             print(f"Computed story slug: '{story.slug}'")
 
         if not story.thumbnail_image:
@@ -140,8 +165,6 @@ class StoryStrategy(object, metaclass=ABCMeta):
         if story_updated:
             await put_story(story)
 
-        return frame
-
     def _get_default_debug_data(
         self,
         parameters: FramesRequestParamsModel,
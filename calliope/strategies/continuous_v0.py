@@ -24,6 +24,7 @@ from calliope.tables import (
     StrategyConfig,
 )
 from calliope.utils.file import create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 
 
@@ -130,6 +131,9 @@ class ContinuousStoryV0Strategy(StoryStrategy):
         last_text = text
 
         if text:
+            # Streaming clients can show the text while the image is generated.
+            emit_frame_event("text", frame_number=frame_number, text=text)
+
             # Generate an image for the frame, composing a prompt from
             # the frame's text...
             image_prompt = output_image_style + " " + text
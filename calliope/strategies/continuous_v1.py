@@ -25,6 +25,7 @@ from calliope.tables import (
     StrategyConfig,
 )
 from calliope.utils.file import create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 from calliope.utils.text import (
     balance_quotes,
@@ -123,6 +124,9 @@ class ContinuousStoryV1Strategy(StoryStrategy):
         if not story_continuation or story_continuation.isspace():
             story_continuation = situation + "\n"
 
+        # Streaming clients can show the text while the image is generated.
+        emit_frame_event("text", frame_number=frame_number, text=story_continuation)
+
         if story_continuation:
             # Generate an image for the frame, composing a prompt from
             # the frame's text...
@@ -20,17 +20,18 @@ from calliope.models import (
     KeysModel,
 )
 from calliope.models.frame_sequence_response import StoryFrameSequenceResponseModel
+from calliope.storage.config_registry import get_helper_model_config
+from calliope.storage.unit_of_work import save_columns
 from calliope.strategies.base import StoryStrategy
 from calliope.strategies.registry import StoryStrategyRegistry
 from calliope.tables import (
     Image,
-    InferenceModel,
-    ModelConfig,
     SparrowState,
     Story,
     StrategyConfig,
 )
 from calliope.utils.file import create_character_filename, create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 from calliope.utils.video import get_video_attributes
 from calliope.utils.text import (
@@ -210,6 +211,9 @@ class FernStrategy(StoryStrategy):
 
         continuation_text = self._adjust_contninuation_text(continuation_text)
 
+        # Streaming clients can show the text while the image is generated.
+        emit_frame_event("text", frame_number=frame_number, text=continuation_text)
+
         if not image_description:
             image_description = continuation_text
             if (
@@ -285,7 +289,7 @@ class FernStrategy(StoryStrategy):
         if story_state:
             print(f"Updating story state to: {story_state}")
             story.state_props = story_state.model_dump()
-            await story.save()
+            await save_columns(story, [Story.state_props])
 
         # Return the new frame.
         return StoryFrameSequenceResponseModel(
@@ -306,22 +310,7 @@ class FernStrategy(StoryStrategy):
         Gets some chaotic text to use as story inspiration.
         """
         try:
-            model = (
-                await InferenceModel.objects()
-                .where(InferenceModel.slug == "huggingface-gpt-neo-2.7B")
-                .first()
-                .output(load_json=True)
-                .run()
-            )
-            if model:
-                model_config = ModelConfig(
-                    slug="chaos-and-creativity",
-                    description="",
-                    model_parameters={},
-                    model=model,
-                )
-            else:
-                raise ValueError("No gpt-neo-2.7B model found.")
+            model_config = await get_helper_model_config("chaos-and-creativity")
 
             text = await text_to_text_inference(httpx_client, seed, model_config, keys)
             print(f"Raw output: '{text}'")
@@ -477,7 +466,7 @@ Assemble your story scenario into the following JSON structure:
         json_response = json.loads(json_str)
         print(json.dumps(json_response, indent=2))
         story.state_props = json_response
-        await story.save()
+        await save_columns(story, [Story.state_props])
         return story
 
     def _compose_messages(
@@ -25,6 +25,7 @@ from calliope.tables import (
     StrategyConfig,
 )
 from calliope.utils.file import create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 from calliope.utils.text import (
     balance_quotes,
@@ -145,6 +146,9 @@ class LavenderStrategy(StoryStrategy):
         if not story_continuation or story_continuation.isspace():
             story_continuation = situation + "\n"
 
+        # Streaming clients can show the text while the image is generated.
+        emit_frame_event("text", frame_number=frame_number, text=story_continuation)
+
         if not image_description:
             image_description = story_continuation
             if (
@@ -23,6 +23,7 @@ from calliope.tables import (
 )
 from calliope.tables.model_config import StrategyConfig
 from calliope.utils.file import create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 
 
@@ -80,6 +81,9 @@ class SimpleOneFrameStoryStrategy(StoryStrategy):
         if not text or text.isspace():
             text = description
 
+        # Streaming clients can show the text while the image is generated.
+        emit_frame_event("text", frame_number=frame_number, text=text)
+
         if text:
             print(text)
             image_prompt = output_image_style + " " + text
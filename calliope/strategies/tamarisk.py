@@ -15,10 +15,10 @@ from calliope.models import (
     KeysModel,
 )
 from calliope.models.frame_sequence_response import StoryFrameSequenceResponseModel
+from calliope.storage.config_registry import get_helper_model_config
 from calliope.strategies.base import StoryStrategy
 from calliope.strategies.registry import StoryStrategyRegistry
 from calliope.tables import (
-    InferenceModel,
     ModelConfig,
     PromptTemplate,
     SparrowState,
@@ -26,6 +26,7 @@ from calliope.tables import (
     StrategyConfig,
 )
 from calliope.utils.file import create_sequential_filename
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.image import get_image_attributes
 from calliope.utils.text import split_into_sentences, translate_text
 
@@ -160,6 +161,9 @@ class TamariskStrategy(StoryStrategy):
             httpx_client=httpx_client,
         )
 
+        # Streaming clients can show the text while the image is generated.
+        emit_frame_event("text", frame_number=frame_number, text=text)
+
         if text:
             # Generate an image for the frame, composing a prompt from
             # the frame's text...
@@ -309,22 +313,7 @@ Here is the text to correct:
 
 {text}
 """
-        model = (
-            await InferenceModel.objects()
-            .where(InferenceModel.slug == "openai-gpt-4o")
-            .first()
-            .output(load_json=True)
-            .run()
-        )
-        if model:
-            model_config = ModelConfig(
-                slug="gpt-4o-cleaner",
-                description="",
-                model_parameters={},
-                model=model,
-            )
-        else:
-            raise ValueError("No gpt-4o model found.")
+        model_config = await get_helper_model_config("gpt-4o-cleaner")
 
         # Use gpt-4o and the prompt above to clean up the text.
         try:
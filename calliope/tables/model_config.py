@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import jinja2
 from piccolo.table import Table
@@ -16,6 +16,45 @@ from piccolo.columns.readable import Readable
 from calliope.models import InferenceModelProvider, InferenceModelProviderVariant
 
 
+class _PromptTemplateLoader(jinja2.BaseLoader):
+    """
+    Serves the text of prompt templates to the shared Jinja2 environment.
+
+    Templates are named "<slug>@<date_updated>", so that an edited template gets a
+    new name and is compiled afresh. Only the latest text of each slug is kept.
+    """
+
+    def __init__(self) -> None:
+        # (template name, template text), keyed by slug.
+        self._sources: Dict[str, Tuple[str, str]] = {}
+
+    def register(self, slug: str, name: str, text: str) -> None:
+        self._sources[slug] = (name, text)
+
+    def get_source(
+        self, environment: jinja2.Environment, template: str
+    ) -> Tuple[str, Optional[str], Callable[[], bool]]:
+        slug = template.rsplit("@", 1)[0]
+        name, text = self._sources.get(slug, (None, None))
+        if name != template or text is None:
+            raise jinja2.TemplateNotFound(template)
+
+        # If the text changes without date_updated changing (e.g. an unsaved edit),
+        # the cached compiled template is discarded.
+        return text, None, lambda: self._sources.get(slug) == (name, text)
+
+
+_prompt_template_loader = _PromptTemplateLoader()
+
+# A single environment shared by all prompt templates, which caches compiled
+# templates in memory and their bytecode on disk.
+_prompt_template_environment = jinja2.Environment(
+    loader=_prompt_template_loader,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(),
+    auto_reload=True,
+)
+
+
 class PromptTemplate(Table, tablename="prompt_template"):
     """
     A template for a text prompt to be sent to an inference model, with support for template
@@ -47,8 +86,13 @@ class PromptTemplate(Table, tablename="prompt_template"):
         Returns:
             the rendered template.
         """
-        environment = jinja2.Environment()
-        template = environment.from_string(self.text)
+        if not self.slug or not self.date_updated:
+            # Not saved, so there's nothing stable to cache the template under.
+            return _prompt_template_environment.from_string(self.text).render(context)
+
+        name = f"{self.slug}@{self.date_updated.isoformat()}"
+        _prompt_template_loader.register(self.slug, name, self.text)
+        template = _prompt_template_environment.get_template(name)
         return template.render(context)
 
     @classmethod
@@ -1,11 +1,13 @@
 from datetime import datetime, timezone
 import json
 import re
-from typing import cast, Optional, Sequence
+from typing import cast, List, Optional, Sequence
 
+from asyncpg.exceptions import UniqueViolationError
 from piccolo.table import Table
 from piccolo.columns import (
     Boolean,
+    Column,
     ForeignKey,
     Integer,
     JSONB,
@@ -16,6 +18,7 @@ from piccolo.columns import (
 
 from calliope.models import StoryModel
 from calliope.models import StoryFrameModel
+from calliope.storage.unit_of_work import note_saved
 from calliope.tables.image import Image
 from calliope.tables.video import Video
 from calliope.utils.file import FileMetadata
@@ -23,6 +26,10 @@ from calliope.utils.id import create_cuid
 from calliope.utils.piccolo import load_json_if_necessary
 
 
+# How many times to try to claim a numbered slug before falling back on the CUID.
+MAX_SLUG_ATTEMPTS = 5
+
+
 class StoryFrame(Table):
     """
     A frame of a story. (As in a graphic novel.)
@@ -146,7 +153,7 @@ class Story(Table):
     title = Text()
 
     # A URL-friendly slug for the story (unique).
-    slug = Varchar(length=100, index=True, null=True)
+    slug = Varchar(length=100, unique=True, index=True, null=True)
 
     # The name of the strategy from which the story issues.
     strategy_name = Varchar(length=50, null=True)
@@ -161,17 +168,64 @@ class Story(Table):
     # telling the story. Cast, setting, time of day, season, plot...
     state_props = JSONB(null=True)
 
+    # The number of frames in the story. Maintained as frames are added (see
+    # increment_frame_count), so that it needn't be counted. Never save this from
+    # a possibly stale instance; save other columns with
+    # columns=Story.columns_without_frame_count().
+    frame_count = Integer(default=0)
+
     # The dates the story was created and updated.
     date_created = Timestamptz()
     date_updated = Timestamptz(auto_update=datetime.now)
 
+    @classmethod
+    def columns_without_frame_count(cls) -> List[Column]:
+        """
+        Gets the columns that may be safely saved from a Story instance.
+        """
+        return [
+            column
+            for column in cls._meta.non_default_columns
+            if column._meta.name != cls.frame_count._meta.name
+        ]
+
     async def get_frame_count(self) -> int:
-        return cast(
-            int,
-            await StoryFrame.count().where(
-                StoryFrame.story.id == self.id  # type: ignore[attr-defined]
-            ),
+        return self.frame_count or 0
+
+    async def increment_frame_count(self) -> int:
+        """
+        Atomically adds one to the story's frame count in the database, and
+        updates this instance with the new count. Call this in the same transaction
+        that saves a new frame.
+
+        Returns:
+            the new frame count.
+        """
+        rows = (
+            await Story.update({Story.frame_count: Story.frame_count + 1})
+            .where(Story.id == self.id)  # type: ignore[attr-defined]
+            .returning(Story.frame_count)
+            .run()
         )
+        if rows:
+            self.frame_count = rows[0]["frame_count"]
+            note_saved(self, [Story.frame_count])
+        return self.frame_count
+
+    async def refresh_frame_count(self) -> int:
+        """
+        Recounts the story's frames and stores the count. For use when frames
+        have been added or removed other than by increment_frame_count.
+
+        Returns:
+            the frame count.
+        """
+        self.frame_count = await StoryFrame.count().where(
+            StoryFrame.story.id == self.id  # type: ignore[attr-defined]
+        )
+        await self.save(columns=[Story.frame_count]).run()
+        note_saved(self, [Story.frame_count])
+        return cast(int, self.frame_count)
 
     async def get_frames(
         self,
@@ -264,11 +318,7 @@ class Story(Table):
         return "".join(fragments) if fragments else ""
 
     async def get_num_frames(self) -> int:
-        return int(
-            await StoryFrame.count().where(
-                StoryFrame.story.id == self.id  # type: ignore[attr-defined]
-            )
-        )
+        return int(self.frame_count or 0)
 
     async def compute_title(self) -> str:
         return await self.get_text(max_frames=1)
@@ -374,25 +424,65 @@ class Story(Table):
         # Generate base slug.
         base_slug = Story.generate_slug_base(self.title)
 
-        # Check if the slug already exists.
-        query = Story.objects().where(Story.slug == base_slug, Story.id != self.id)
-        existing = await query.first().run()
+        # Fetch the base slug and all of its numbered variants in one query.
+        # (Base slugs contain only lowercase letters, digits, and hyphens, so
+        # need no escaping for LIKE.)
+        rows = await Story.select(Story.slug).where(
+            Story.slug.like(f"{base_slug}%"),
+            Story.id != self.id,  # type: ignore[attr-defined]
+        )
+        existing_slugs = {row["slug"] for row in rows}
 
-        if not existing:
+        if base_slug not in existing_slugs:
             return base_slug
 
-        # Slug exists, so append a number.
+        # Slug exists, so append the lowest number not yet taken.
+        suffix_pattern = re.compile(rf"{re.escape(base_slug)}-(\d+)")
+        taken_counters = set()
+        for existing_slug in existing_slugs:
+            match = suffix_pattern.fullmatch(existing_slug)
+            if match:
+                taken_counters.add(int(match.group(1)))
+
         counter = 1
-        while True:
-            new_slug = f"{base_slug}-{counter}"
+        while counter in taken_counters:
+            counter += 1
 
-            query = Story.objects().where(Story.slug == new_slug, Story.id != self.id)
-            existing = await query.first().run()
+        return f"{base_slug}-{counter}"
 
-            if not existing:
-                return new_slug
+    async def assign_unique_slug(self) -> Optional[str]:
+        """
+        Generates a unique slug for a saved story and saves it. Since slugs are
+        unique in the database, if another story claims the same slug first, tries
+        again with a fresh one.
 
-            counter += 1
+        Returns:
+            the slug, or None if the story has no title yet.
+        """
+        for _ in range(MAX_SLUG_ATTEMPTS - 1):
+            slug = await self.generate_unique_slug()
+            if not slug:
+                return None
+
+            self.slug = slug
+            # Within a transaction, the failed update would abort the lot, so
+            # make the attempt in a savepoint that can be rolled back to.
+            transaction = self._meta.db.current_transaction.get()
+            savepoint = await transaction.savepoint() if transaction else None
+            try:
+                await self.save(columns=[Story.slug]).run()
+                note_saved(self, [Story.slug])
+                return slug
+            except UniqueViolationError:
+                if savepoint:
+                    await savepoint.rollback_to()
+                print(f"Slug '{slug}' was just taken. Trying again.")
+
+        # Give up on sequential numbering rather than retrying forever.
+        self.slug = f"{Story.generate_slug_base(self.title)}-{self.cuid}"[:100]
+        await self.save(columns=[Story.slug]).run()
+        note_saved(self, [Story.slug])
+        return self.slug
 
     @classmethod
     def create_new(
@@ -6,20 +6,11 @@ that are executed asynchronously by the task queue.
 """
 
 import logging
-import sys
-import traceback
 from typing import Any, Dict
 
-import httpx
-
-from calliope.inference import image_analysis_inference
-from calliope.inference.audio_to_text import audio_to_text_inference
-from calliope.location.location import get_location_metadata_for_ip
+from calliope.location.cache import get_location_cache_stats
 from calliope.models import FramesRequestParamsModel
-from calliope.storage.config_manager import (
-    get_sparrow_story_parameters_and_keys,
-    load_json_if_necessary,
-)
+from calliope.storage.config_manager import get_sparrow_story_parameters_and_keys
 from calliope.storage.firebase import get_firebase_manager
 from calliope.storage.state_manager import (
     get_sparrow_state,
@@ -27,10 +18,13 @@ from calliope.storage.state_manager import (
     put_sparrow_state,
     put_story,
 )
+from calliope.storage.unit_of_work import unit_of_work
 from calliope.strategies import StoryStrategyRegistry
-from calliope.tables import ModelConfig
 from calliope.tasks.local_queue import LocalTaskQueue
+from calliope.utils.clients import borrow_http_client
+from calliope.utils.enrichment import enrich_frame_request
 from calliope.utils.google import CLOUD_ENV_GCP_PROD, get_cloud_environment
+from calliope.utils.renditions import get_rendition_cache_stats
 from calliope.utils.story import prepare_frame_images, prepare_input_files
 
 logger = logging.getLogger(__name__)
@@ -100,114 +94,72 @@ async def add_frame_task(payload: Dict[str, Any]) -> Dict[str, Any]:
         await firebase.update_task(task_id, {"status": "running"})
 
     try:
-        sparrow_state = await get_sparrow_state(client_id)
-        story = await get_story(story_id) if story_id else None
-        strategy_name = (story and story.strategy_name) or "tamarisk"
-
-        request_params = prepare_frame_request_params(
-            payload=payload, strategy_name=strategy_name
-        )
-        (
-            parameters,
-            keys,
-            strategy_config,
-        ) = await get_sparrow_story_parameters_and_keys(request_params)
-        parameters.strategy = parameters.strategy or "tamarisk"
-        parameters.debug = parameters.debug or False
-
-        strategy_name = (
-            strategy_config.strategy_name if strategy_config else parameters.strategy
-        )
-        strategy_class = StoryStrategyRegistry.get_strategy_class(strategy_name)
-
-        parameters = await prepare_input_files(parameters, story)
-        image_analysis = None
-        errors = []
-
-        timeout = httpx.Timeout(180.0)
-        async with httpx.AsyncClient(timeout=timeout) as httpx_client:
-            location_metadata = await get_location_metadata_for_ip(
-                httpx_client,
-                source_ip_address,
+        # Story and sparrow state changes are written when this block ends, before
+        # clients are notified below.
+        async with unit_of_work():
+            sparrow_state = await get_sparrow_state(client_id)
+            story = await get_story(story_id) if story_id else None
+            strategy_name = (story and story.strategy_name) or "tamarisk"
+
+            request_params = prepare_frame_request_params(
+                payload=payload, strategy_name=strategy_name
             )
-            print(f"{location_metadata=}")
-
-            if parameters.input_image_filename:
-                print(f"{parameters.input_image_filename=}")
-                vision_model_slug = "azure-vision-analysis"
-                model_config = (
-                    await ModelConfig.objects(ModelConfig.model)
-                    .where(ModelConfig.slug == vision_model_slug)
-                    .first()
-                    .output(load_json=True)
-                    .run()
-                )
-                if (
-                    model_config
-                    and model_config.model
-                    and model_config.model.model_parameters
-                ):
-                    model_config.model.model_parameters = load_json_if_necessary(
-                        model_config.model.model_parameters
-                    )
-                try:
-                    image_analysis = await image_analysis_inference(
-                        httpx_client,
-                        parameters.input_image_filename,
-                        parameters.input_image,  # original b64-encoded image.
-                        model_config,
-                        keys,
-                    )
-                    print(f"{image_analysis=}")
-
-                except Exception as e:
-                    traceback.print_exc(file=sys.stderr)
-                    errors.append(str(e))
-
-            language = "en"
-            if (
-                strategy_config.text_to_text_model_config
-                and strategy_config.text_to_text_model_config
-                and strategy_config.text_to_text_model_config.prompt_template
-                and strategy_config.text_to_text_model_config.prompt_template.target_language
-            ):
-                language = strategy_config.text_to_text_model_config.prompt_template.target_language
-
-            if parameters.input_audio_filename:
-                text = await audio_to_text_inference(
-                    httpx_client, parameters.input_audio_filename, language, keys
-                )
-                parameters.input_text = text
-
-            story_frames_response = await strategy_class().get_frame_sequence(
+            (
                 parameters,
-                image_analysis,
-                location_metadata,
-                strategy_config,
                 keys,
-                sparrow_state,
-                story,
-                httpx_client,
+                strategy_config,
+            ) = await get_sparrow_story_parameters_and_keys(request_params)
+            parameters.strategy = parameters.strategy or "tamarisk"
+            parameters.debug = parameters.debug or False
+
+            strategy_name = (
+                strategy_config.strategy_name if strategy_config else parameters.strategy
             )
-            if story.title == "Untitled":
-                story.title = story_frames_response.frames[0].title
+            strategy_class = StoryStrategyRegistry.get_strategy_class(strategy_name)
 
-        story_frames_response.debug_data = {
-            **(story_frames_response.debug_data or {}),
-            "story_id": story.cuid,
-            "story_title": story.title,
-        }
-        if image_analysis:
-            i_see = image_analysis.get("description")
-            story_frames_response.debug_data["i_see"] = i_see
-            story_frames_response.debug_data["image_analysis"] = image_analysis
-        if parameters.input_audio_filename and parameters.input_text:
-            i_hear = parameters.input_text
-            story_frames_response.debug_data["i_hear"] = i_hear
-
-        await prepare_frame_images(parameters, story_frames_response.frames)
-        await put_story(story)
-        await put_sparrow_state(sparrow_state)
+            parameters = await prepare_input_files(parameters, story)
+
+            async with borrow_http_client() as httpx_client:
+                # Locate the client, analyze any image, and transcribe any audio,
+                # all at once.
+                enrichment = await enrich_frame_request(
+                    httpx_client, parameters, strategy_config, keys, source_ip_address
+                )
+                image_analysis = enrichment.image_analysis
+                location_metadata = enrichment.location_metadata
+
+                story_frames_response = await strategy_class().get_frame_sequence(
+                    parameters,
+                    image_analysis,
+                    location_metadata,
+                    strategy_config,
+                    keys,
+                    sparrow_state,
+                    story,
+                    httpx_client,
+                )
+                if story.title == "Untitled":
+                    story.title = story_frames_response.frames[0].title
+
+            story_frames_response.debug_data = {
+                **(story_frames_response.debug_data or {}),
+                "story_id": story.cuid,
+                "story_title": story.title,
+                "enrichment_timings": enrichment.timings,
+                "location_cache_stats": get_location_cache_stats(),
+                "rendition_cache_stats": get_rendition_cache_stats(),
+            }
+            if image_analysis:
+                i_see = image_analysis.get("description")
+                story_frames_response.debug_data["i_see"] = i_see
+                story_frames_response.debug_data["image_analysis"] = image_analysis
+            if parameters.input_audio_filename and parameters.input_text:
+                i_hear = parameters.input_text
+                story_frames_response.debug_data["i_hear"] = i_hear
+
+            await prepare_frame_images(parameters, story_frames_response.frames)
+            await put_story(story)
+            await put_sparrow_state(sparrow_state)
 
         num_frames = await story.get_num_frames()
 
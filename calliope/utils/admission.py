@@ -0,0 +1,90 @@
+"""
+Admission control for frame generation.
+
+When an inference provider slows down, frame requests pile up behind it, each
+waiting longer than the last. So the generations in flight are counted per
+provider, and once a provider has settings.MAX_GENERATIONS_IN_FLIGHT_PER_PROVIDER
+of them, further requests that need it are turned away at once (to be
+answered with something already made) rather than queued.
+"""
+
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from calliope.settings import settings
+from calliope.tables import StrategyConfig
+
+
+class AdmissionController:
+    """
+    Counts the generations in flight per provider, and refuses new ones for a
+    provider that has too many.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[str, int] = {}
+
+        self.admitted = 0
+        self.rejected = 0
+
+    @contextmanager
+    def admit(self, providers: Sequence[str]) -> Iterator[Optional[str]]:
+        """
+        Admits a generation that will use the given providers, for the duration
+        of the `with` block, unless any of them is saturated.
+
+        Yields:
+            None if admitted, otherwise the reason the generation was refused.
+        """
+        limit = settings.MAX_GENERATIONS_IN_FLIGHT_PER_PROVIDER
+        for provider in providers:
+            if limit and self._in_flight.get(provider, 0) >= limit:
+                self.rejected += 1
+                print(f"Provider {provider} is saturated. Refusing a generation.")
+                yield f"{provider} has {limit} generations in flight"
+                return
+
+        self.admitted += 1
+        for provider in providers:
+            self._in_flight[provider] = self._in_flight.get(provider, 0) + 1
+        try:
+            yield None
+        finally:
+            for provider in providers:
+                self._in_flight[provider] -= 1
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "in_flight": {
+                provider: count for provider, count in self._in_flight.items() if count
+            },
+        }
+
+
+def get_strategy_providers(strategy_config: Optional[StrategyConfig]) -> List[str]:
+    """
+    Gets the providers whose models the given strategy config uses.
+    """
+    if not strategy_config:
+        return []
+
+    providers: List[str] = []
+    for model_config in (
+        strategy_config.text_to_text_model_config,
+        strategy_config.text_to_image_model_config,
+        strategy_config.text_to_video_model_config,
+    ):
+        model = getattr(model_config, "model", None)
+        provider = getattr(model, "provider", None)
+        # (The provider may be an InferenceModelProvider or its value.)
+        provider = getattr(provider, "value", provider)
+        if provider and provider not in providers:
+            providers.append(provider)
+    return providers
+
+
+# Admits frame generations.
+frame_admission = AdmissionController()
@@ -0,0 +1,150 @@
+"""
+Long-lived, pooled clients for the services Calliope calls.
+
+Opening a new HTTP client per request (or an SDK client per call) means a new
+TCP and TLS handshake every time, and no reuse of keep-alive connections. The
+ClientManager instead owns one pooled client per provider, for the life of the
+process. The app starts it on startup and closes it on shutdown; everything
+else borrows from it.
+
+The general-purpose HTTP client and the OpenAI client each have their own
+connection pool, so a burst of slow calls to one provider can't starve calls
+to the others.
+"""
+
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Optional
+
+from google.cloud import storage
+import httpx
+from openai import AsyncOpenAI
+
+
+HTTP_TIMEOUT_SECONDS = 180.0
+
+# Limits on each provider's connection pool.
+HTTP_MAX_CONNECTIONS = 100
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20
+OPENAI_MAX_CONNECTIONS = 50
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = 20
+# How long an idle connection is kept open for reuse, in seconds.
+KEEPALIVE_EXPIRY_SECONDS = 60.0
+
+
+class ClientManager:
+    """
+    Owns the process-wide clients. Each is created when first needed.
+    """
+
+    def __init__(self) -> None:
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._openai_http_client: Optional[httpx.AsyncClient] = None
+        self._openai_clients: Dict[str, AsyncOpenAI] = {}
+        self._storage_client: Optional[storage.Client] = None
+
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """
+        The general-purpose HTTP client, for location, weather, and other
+        services called directly over HTTP.
+        """
+        if not self._http_client or self._http_client.is_closed:
+            self._http_client = _create_http_client(
+                HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS
+            )
+        return self._http_client
+
+    def get_openai_client(self, api_key: str) -> AsyncOpenAI:
+        """
+        Gets the OpenAI client for the given API key. Clients for all keys share
+        one connection pool.
+        """
+        if not self._openai_http_client or self._openai_http_client.is_closed:
+            self._openai_http_client = _create_http_client(
+                OPENAI_MAX_CONNECTIONS, OPENAI_MAX_KEEPALIVE_CONNECTIONS
+            )
+            self._openai_clients = {}
+
+        client = self._openai_clients.get(api_key)
+        if not client:
+            # The SDK's annotations only name httpx2's client, but it accepts
+            # httpx's as well.
+            http_client: Any = self._openai_http_client
+            client = AsyncOpenAI(api_key=api_key, http_client=http_client)
+            self._openai_clients[api_key] = client
+        return client
+
+    @property
+    def storage_client(self) -> storage.Client:
+        """
+        The Google Cloud Storage client.
+        """
+        if not self._storage_client:
+            self._storage_client = storage.Client()
+        return self._storage_client
+
+    async def start(self) -> None:
+        """
+        Opens the HTTP connection pools, so the first request doesn't have to.
+        Any pools that are already open are closed first.
+        """
+        await self._close_http_clients()
+        self._http_client = _create_http_client(
+            HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS
+        )
+        self._openai_http_client = _create_http_client(
+            OPENAI_MAX_CONNECTIONS, OPENAI_MAX_KEEPALIVE_CONNECTIONS
+        )
+
+    async def close(self) -> None:
+        """
+        Closes all clients and their connections.
+        """
+        await self._close_http_clients()
+        if self._storage_client:
+            self._storage_client.close()
+            self._storage_client = None
+
+    async def _close_http_clients(self) -> None:
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+        if self._openai_http_client:
+            await self._openai_http_client.aclose()
+            self._openai_http_client = None
+        self._openai_clients = {}
+
+
+@lru_cache(maxsize=1)
+def get_client_manager() -> ClientManager:
+    return ClientManager()
+
+
+@asynccontextmanager
+async def borrow_http_client() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Borrows the shared HTTP client for the duration of an `async with` block.
+    Unlike `async with httpx.AsyncClient()`, the client stays open afterwards.
+    """
+    yield get_client_manager().http_client
+
+
+def get_openai_client(api_key: Optional[str]) -> AsyncOpenAI:
+    """
+    Gets the shared OpenAI client for the given API key.
+    """
+    return get_client_manager().get_openai_client(api_key or "")
+
+
+def _create_http_client(
+    max_connections: int, max_keepalive_connections: int
+) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS,
+        ),
+    )
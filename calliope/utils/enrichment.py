@@ -0,0 +1,199 @@
+"""
+The enrichment stage of the frame pipeline: everything learned about a frame
+request before the story strategy runs.
+
+Locating the client, analyzing an input image, and transcribing input audio
+don't depend on one another, so they run concurrently, each with its own
+deadline. A branch that fails or runs late is dropped (and reported as a
+non-fatal error) rather than failing the request.
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+import sys
+import time
+import traceback
+from typing import Any, Awaitable, Dict, List, Optional, TypeVar
+
+import httpx
+
+from calliope.inference import image_analysis_inference
+from calliope.inference.audio_to_text import audio_to_text_inference
+from calliope.location.location import get_location_metadata_for_ip
+from calliope.models import (
+    BasicLocationMetadataModel,
+    FramesRequestParamsModel,
+    FullLocationMetadata,
+    KeysModel,
+)
+from calliope.storage.config_registry import get_model_config
+from calliope.tables import StrategyConfig
+
+
+# Deadlines for each branch, in seconds.
+LOCATION_TIMEOUT_SECONDS = 15
+# A little longer than image_analysis_inference waits on the LLM, so that the
+# Azure analysis can still be used if the LLM is slow.
+IMAGE_ANALYSIS_TIMEOUT_SECONDS = 110
+AUDIO_TO_TEXT_TIMEOUT_SECONDS = 60
+
+VISION_MODEL_CONFIG_SLUG = "azure-vision-analysis"
+
+ResultT = TypeVar("ResultT")
+
+
+@dataclass
+class FrameRequestEnrichment:
+    """
+    The results of the enrichment stage.
+    """
+
+    # Where the client is, and what's going on there.
+    location_metadata: FullLocationMetadata
+
+    # An analysis of the input image, if there was one.
+    image_analysis: Optional[Dict[str, Any]] = None
+
+    # How long each branch, and the stage as a whole, took, in seconds.
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    # Non-fatal errors from branches that failed or timed out.
+    errors: List[str] = field(default_factory=list)
+
+
+async def enrich_frame_request(
+    httpx_client: httpx.AsyncClient,
+    parameters: FramesRequestParamsModel,
+    strategy_config: StrategyConfig,
+    keys: KeysModel,
+    source_ip_address: Optional[str],
+) -> FrameRequestEnrichment:
+    """
+    Gathers location metadata, image analysis, and the audio transcription
+    concurrently. Sets parameters.input_text to the transcription, if any.
+
+    Args:
+        httpx_client: the async HTTP session.
+        parameters: the request parameters, with input files prepared.
+        strategy_config: the strategy config, which determines the expected
+            language of any audio.
+        keys: API keys, etc.
+        source_ip_address: the client's IP address, if known.
+
+    Returns:
+        the enrichment.
+    """
+    enrichment = FrameRequestEnrichment(
+        location_metadata=FullLocationMetadata(
+            location=BasicLocationMetadataModel(ip_address=None)
+        )
+    )
+    stage_start = time.perf_counter()
+
+    location_task = _run_branch(
+        enrichment,
+        "location",
+        get_location_metadata_for_ip(httpx_client, source_ip_address),
+        LOCATION_TIMEOUT_SECONDS,
+    )
+    image_analysis_task = (
+        _run_branch(
+            enrichment,
+            "image_analysis",
+            _analyze_image(httpx_client, parameters, keys),
+            IMAGE_ANALYSIS_TIMEOUT_SECONDS,
+        )
+        if parameters.input_image_filename
+        else _nothing()
+    )
+    audio_task = (
+        _run_branch(
+            enrichment,
+            "audio_to_text",
+            audio_to_text_inference(
+                httpx_client,
+                parameters.input_audio_filename,
+                _get_language(strategy_config),
+                keys,
+            ),
+            AUDIO_TO_TEXT_TIMEOUT_SECONDS,
+        )
+        if parameters.input_audio_filename
+        else _nothing()
+    )
+
+    location_metadata, image_analysis, text = await asyncio.gather(
+        location_task, image_analysis_task, audio_task
+    )
+
+    if location_metadata:
+        enrichment.location_metadata = location_metadata
+    print(f"{enrichment.location_metadata=}")
+
+    enrichment.image_analysis = image_analysis
+    if image_analysis:
+        print(f"{image_analysis=}")
+
+    if text is not None:
+        parameters.input_text = text
+
+    enrichment.timings["total"] = round(time.perf_counter() - stage_start, 3)
+    print(f"Enrichment timings: {enrichment.timings}")
+
+    return enrichment
+
+
+async def _run_branch(
+    enrichment: FrameRequestEnrichment,
+    name: str,
+    awaitable: Awaitable[ResultT],
+    timeout_seconds: float,
+) -> Optional[ResultT]:
+    """
+    Awaits one branch of the stage, recording its timing. Returns None if it
+    fails or times out.
+    """
+    start = time.perf_counter()
+    try:
+        return await asyncio.wait_for(awaitable, timeout_seconds)
+    except asyncio.TimeoutError:
+        enrichment.errors.append(f"{name} timed out after {timeout_seconds}s.")
+        print(f"Enrichment: {name} timed out after {timeout_seconds}s.")
+    except Exception as e:
+        traceback.print_exc(file=sys.stderr)
+        enrichment.errors.append(str(e))
+    finally:
+        enrichment.timings[name] = round(time.perf_counter() - start, 3)
+
+    return None
+
+
+async def _nothing() -> None:
+    return None
+
+
+async def _analyze_image(
+    httpx_client: httpx.AsyncClient,
+    parameters: FramesRequestParamsModel,
+    keys: KeysModel,
+) -> Dict[str, Any]:
+    print(f"{parameters.input_image_filename=}")
+    model_config = await get_model_config(VISION_MODEL_CONFIG_SLUG)
+    return await image_analysis_inference(
+        httpx_client,
+        parameters.input_image_filename,
+        parameters.input_image,  # original b64-encoded image.
+        model_config,
+        keys,
+    )
+
+
+def _get_language(strategy_config: StrategyConfig) -> str:
+    prompt_template = (
+        strategy_config.text_to_text_model_config.prompt_template
+        if strategy_config.text_to_text_model_config
+        else None
+    )
+    if prompt_template and prompt_template.target_language:
+        return str(prompt_template.target_language)
+    return "en"
@@ -0,0 +1,115 @@
+"""
+Progress events for streamed frame responses.
+
+While a frame request is handled for a streaming client, the strategy and the
+image pipeline report what they've finished (the text, then the image, then
+the converted image) as events, which the endpoint streams to the client as
+newline-delimited JSON, one event per line:
+
+    {"event": "text", "frame_number": 3, "text": "Once upon a time..."}
+    {"event": "image", "frame_number": 3, "image": {...}}
+    {"event": "frame", "frame_number": 3, "frame": {...}}
+    {"event": "response", "response": {...}}
+
+The final "response" event carries the usual complete response, or an
+"error" event is sent instead if the request failed. Outside of a streamed
+request, emitting an event does nothing.
+"""
+
+import asyncio
+from contextvars import ContextVar
+import json
+import sys
+import traceback
+from typing import Any, AsyncIterator, Callable, Coroutine, Dict, Optional, Set
+
+from pydantic import BaseModel
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_current_frame_events: ContextVar[Optional["asyncio.Queue[Dict[str, Any]]"]] = (
+    ContextVar("current_frame_events", default=None)
+)
+
+# Requests still running after their client went away. (Kept so they aren't
+# collected before they finish saving the story.)
+_orphaned_requests: Set[asyncio.Task] = set()
+
+
+def emit_frame_event(event: str, **data: Any) -> None:
+    """
+    Reports progress to the streaming client, if there is one.
+
+    Args:
+        event: the kind of event: "text", "image", "frame", etc.
+        data: the event's data. Pydantic models are serialized as JSON.
+    """
+    queue = _current_frame_events.get()
+    if queue is None:
+        return
+
+    queue.put_nowait(
+        {
+            "event": event,
+            **{
+                key: value.model_dump(mode="json")
+                if isinstance(value, BaseModel)
+                else value
+                for key, value in data.items()
+            },
+        }
+    )
+
+
+async def stream_frame_events(
+    handle_request: Callable[[], Coroutine[Any, Any, BaseModel]],
+) -> AsyncIterator[str]:
+    """
+    Handles a request, yielding NDJSON lines for its events as they happen and
+    then for its response.
+
+    If the client goes away, the request is still completed, so that the story
+    is left consistent.
+    """
+    queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue()
+    token = _current_frame_events.set(queue)
+    try:
+        # (The task runs in a copy of the current context, so sees the queue.)
+        request_task: "asyncio.Task[BaseModel]" = asyncio.create_task(
+            handle_request()
+        )
+    finally:
+        _current_frame_events.reset(token)
+
+    try:
+        while not request_task.done():
+            next_event = asyncio.ensure_future(queue.get())
+            await asyncio.wait(
+                {next_event, request_task}, return_when=asyncio.FIRST_COMPLETED
+            )
+            if next_event.done():
+                yield _to_line(next_event.result())
+            else:
+                next_event.cancel()
+
+        while not queue.empty():
+            yield _to_line(queue.get_nowait())
+
+        try:
+            response = request_task.result()
+            yield _to_line(
+                {"event": "response", "response": response.model_dump(mode="json")}
+            )
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            yield _to_line({"event": "error", "error": str(e)})
+    finally:
+        if not request_task.done():
+            print("Streaming client went away. Finishing the request anyway.")
+            _orphaned_requests.add(request_task)
+            request_task.add_done_callback(_orphaned_requests.discard)
+
+
+def _to_line(event: Dict[str, Any]) -> str:
+    return json.dumps(event, default=str) + "\n"
@@ -1,12 +1,11 @@
 import os
 from typing import Optional, Sequence
 
-from google.cloud import storage
-
 # from google.cloud import secretmanager  # Must be imported separately.
 import requests
 
 from calliope.settings import settings
+from calliope.utils.clients import get_client_manager
 from calliope.utils.file import FileMetadata
 
 CLOUD_ENV_GCP_PROD = "gcp-prod"
@@ -37,7 +36,7 @@ def get_media_file(base_filename: str, destination_path: str) -> FileMetadata:
 
 
 def put_google_file(google_folder: str, filename: str) -> None:
-    storage_client = storage.Client()
+    storage_client = get_client_manager().storage_client
     bucket = storage_client.bucket(settings.CALLIOPE_BUCKET_NAME)
 
     blob_name = f"{google_folder}/{os.path.basename(filename)}"
@@ -47,7 +46,7 @@ def put_google_file(google_folder: str, filename: str) -> None:
 
 
 def get_google_file(filename: str, destination_path: str) -> FileMetadata:
-    storage_client = storage.Client()
+    storage_client = get_client_manager().storage_client
 
     bucket = storage_client.bucket(settings.CALLIOPE_BUCKET_NAME)
     blob = bucket.blob(filename)
@@ -57,7 +56,7 @@ def get_google_file(filename: str, destination_path: str) -> FileMetadata:
 
 
 def get_google_file_metadata(filename: str) -> FileMetadata:
-    storage_client = storage.Client()
+    storage_client = get_client_manager().storage_client
 
     bucket = storage_client.bucket(settings.CALLIOPE_BUCKET_NAME)
     blob = bucket.blob(filename)
@@ -66,7 +65,7 @@ def get_google_file_metadata(filename: str) -> FileMetadata:
 
 
 def delete_google_file(google_folder: str, base_filename: str) -> None:
-    storage_client = storage.Client()
+    storage_client = get_client_manager().storage_client
 
     bucket = storage_client.bucket(settings.CALLIOPE_BUCKET_NAME)
     blob_name = f"{google_folder}/{os.path.basename(base_filename)}"
@@ -105,7 +104,7 @@ def list_google_files_with_prefix(
 
         a/b/
     """
-    storage_client = storage.Client()
+    storage_client = get_client_manager().storage_client
 
     # Note: Client.list_blobs requires at least package version 1.17.0.
     blobs = storage_client.list_blobs(
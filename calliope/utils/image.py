@@ -1,9 +1,7 @@
 import argparse
-from collections import defaultdict
 from enum import Enum
 import os
-from typing import cast, Dict, Optional, Sequence, Tuple
-from typing_extensions import Buffer
+from typing import cast, Optional, Sequence, Tuple
 
 import numpy as np
 from PIL import Image as PIL_Image
@@ -38,6 +36,10 @@ def image_format_to_media_type(image_format: ImageFormat) -> str:
 
 # The below conversion code was inspired by https://github.com/CommanderRedYT
 
+# RGB565 pixels are 16-bit little-endian words: 5 bits of red, 6 of green, and 5
+# of blue, from the most significant bit down.
+RGB565_DTYPE = np.dtype("<u2")
+
 
 def convert_png_to_rgb565(input_filename: str, output_filename: str) -> Image:
     """
@@ -45,17 +47,15 @@ def convert_png_to_rgb565(input_filename: str, output_filename: str) -> Image:
     """
     png = PIL_Image.open(input_filename)
 
-    input_image_content = png.getdata()
-    output_image_content = np.empty(len(input_image_content), np.uint16)
-    for i, pixel in enumerate(input_image_content):
-        r = (pixel[0] >> 3) & 0x1F
-        g = (pixel[1] >> 2) & 0x3F
-        b = (pixel[2] >> 3) & 0x1F
-        rgb = r << 11 | g << 5 | b
-        output_image_content[i] = rgb
+    # (Any alpha channel is dropped.)
+    pixels = np.asarray(png.convert("RGB"), dtype=RGB565_DTYPE)
+    r = pixels[..., 0] >> 3
+    g = pixels[..., 1] >> 2
+    b = pixels[..., 2] >> 3
+    output_image_content = (r << 11) | (g << 5) | b
 
     with open(output_filename, "wb") as output_file:
-        output_file.write(cast(Buffer, output_image_content))
+        output_file.write(output_image_content.tobytes())
 
     return Image(
         width=png.width,
@@ -71,58 +71,45 @@ def convert_rgb565_to_png(
     """
     Converts the given RGB565/raw file to PNG format.
     """
-    with open(input_filename, "r") as input_file:
-        dataArray = np.fromfile(input_file, np.uint16)
-
-        png = PIL_Image.new("RGB", (width, height))
+    words = np.fromfile(input_filename, dtype=RGB565_DTYPE)
+    # Fill in any missing pixels with black, and ignore any extra data.
+    words = np.pad(words[: width * height], (0, max(0, width * height - words.size)))
+    words = words.reshape((height, width))
 
-        for i, word in enumerate(np.nditer(dataArray)):
-            r = (word >> 11) & 0x1F  # type: ignore[operator]
-            g = (word >> 5) & 0x3F  # type: ignore[operator]
-            b = word & 0x1F  # type: ignore[operator]
-            png.putpixel((i % width, i // width), (r << 3, g << 2, b << 3))
+    pixels = np.empty((height, width, 3), dtype=np.uint8)
+    pixels[..., 0] = ((words >> 11) & 0x1F) << 3
+    pixels[..., 1] = ((words >> 5) & 0x3F) << 2
+    pixels[..., 2] = (words & 0x1F) << 3
 
-        png.save(output_filename)
+    PIL_Image.fromarray(pixels).save(output_filename)
 
-        return Image(
-            width=width,
-            height=height,
-            format=ImageFormat.PNG.value,
-            url=output_filename,
-        )
+    return Image(
+        width=width,
+        height=height,
+        format=ImageFormat.PNG.value,
+        url=output_filename,
+    )
 
 
 def convert_png_to_grayscale16(input_filename: str, output_filename: str) -> Image:
     """
     Converts the given PNG file to 'grayscale-16' format.
     There are 2 pixels per byte, 4 bits (black, white, 14 shades of gray) each.
+    Pixels are packed in order, row by row, the first of each pair in the low
+    nibble. If there's an odd number of pixels, the last byte's high nibble is 0.
     """
 
     png = PIL_Image.open(input_filename)
     # Convert to grayscale.
     png = png.convert(mode="L")
 
-    input_image_content = png.getdata()
-    output_image_content = np.empty(int(len(input_image_content) / 2), np.uint8)
-    i = 0
-    for y in range(0, png.size[1]):
-        byte = 0
-        done = True
-        for x in range(0, png.size[0]):
-            l = png.getpixel((x, y))
-            if x % 2 == 0:
-                byte = l >> 4
-                done = False
-            else:
-                byte |= l & 0xF0
-                output_image_content[i] = byte
-                done = True
-                i += 1
-        if not done:
-            output_image_content[i] = byte
+    pixels = np.asarray(png, dtype=np.uint8).ravel() >> 4
+    if pixels.size % 2:
+        pixels = np.append(pixels, np.uint8(0))
+    output_image_content = pixels[0::2] | (pixels[1::2] << 4)
 
     with open(output_filename, "wb") as output_file:
-        output_file.write(cast(Buffer, output_image_content))
+        output_file.write(output_image_content.tobytes())
 
     return Image(
         width=png.width,
@@ -139,39 +126,24 @@ def convert_grayscale16_to_png(
     Converts 'grayscale-16' file to PNG.
     There are 2 pixels per byte, 4 bits (black, white, 14 shades of gray) each.
     """
+    packed = np.fromfile(input_filename, dtype=np.uint8)
 
-    with open(input_filename, "r") as input_file:
-        dataArray = np.fromfile(input_file, np.uint8)
-
-        png = PIL_Image.new("L", (width, height))
+    pixels = np.empty(packed.size * 2, dtype=np.uint8)
+    pixels[0::2] = (packed & 0x0F) << 4
+    pixels[1::2] = packed & 0xF0
 
-        for i, pixel_pair in enumerate(np.nditer(dataArray)):
-            p0 = int(pixel_pair & 0xF) << 4  # type: ignore[operator]
-            i *= 2
-            x = i % width
-            y = i // width
-            if y >= height:
-                # Due to an earlier bug, some stored images have too much data.
-                break
-            png.putpixel((x, y), p0)
+    # Due to an earlier bug, some stored images have too much data. Ignore it,
+    # and fill in any missing pixels with black.
+    pixels = np.pad(pixels[: width * height], (0, max(0, width * height - pixels.size)))
 
-            p1 = int(pixel_pair)  # type: ignore[call-overload]
-            i += 1
-            x = i % width
-            y = i // width
-            if y >= height:
-                # Due to an earlier bug, some stored images have too much data.
-                break
-            png.putpixel((x, y), p1)
+    PIL_Image.fromarray(pixels.reshape((height, width))).save(output_filename)
 
-        png.save(output_filename)
-
-        return Image(
-            width=width,
-            height=height,
-            format=ImageFormat.PNG.value,
-            url=output_filename,
-        )
+    return Image(
+        width=width,
+        height=height,
+        format=ImageFormat.PNG.value,
+        url=output_filename,
+    )
 
 
 def convert_pil_image_to_png(image_filename: str) -> str:
@@ -275,19 +247,22 @@ def get_image_colors(image_filename: str) -> Sequence[Tuple[int, int]]:
     """
     Returns a sequence of (count, color) tuples with colors given in the mode of the image (e.g. RGB).
     """
-    image = PIL_Image.open(image_filename)
-    by_color: Dict[int, int] = defaultdict(int)
-    for pixel in image.getdata():
-        by_color[pixel] += 1
-    return cast(Sequence[Tuple[int, int]], list(by_color.items()))
+    with PIL_Image.open(image_filename) as image:
+        # (Every pixel could be a different color.)
+        colors = image.getcolors(maxcolors=image.width * image.height)
+    return cast(Sequence[Tuple[int, int]], colors or [])
 
 
 def image_is_monochrome(image_filename: str) -> bool:
     """
-    Returns True iff the given image is of a single solid d
+    Returns True iff the given image is of a single solid color (as are the
+    blank images some providers return instead of ones they censor).
+
+    Counting stops at the second color, which in most images is one of the
+    first few pixels, so the cost is mostly that of decoding the image.
     """
-    colors = get_image_colors(image_filename)
-    return colors is not None and len(colors) == 0
+    with PIL_Image.open(image_filename) as image:
+        return image.getcolors(maxcolors=1) is not None
 
 
 class Mode(Enum):
@@ -0,0 +1,174 @@
+"""
+A process pool for CPU-bound image work.
+
+Resizing and converting frame images with PIL and NumPy takes tens to hundreds
+of milliseconds per image, all of it holding the GIL. Done inline in an async
+handler, it stalls every other request on the worker. So image jobs are run in
+a pool of worker processes, one per CPU, and awaited.
+
+Jobs name their images by filename (the media folder is shared with the
+workers) and return plain fields, from which the Image rows are rebuilt here,
+so nothing unpicklable crosses between processes.
+
+At most MAX_PENDING_JOBS_PER_WORKER jobs per worker may be queued or running
+at once. Beyond that, callers wait their turn before submitting, rather than
+piling ever more work onto the pool.
+"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+import multiprocessing
+import os
+from typing import Any, Callable, cast, Dict, Optional, TypeVar
+
+from calliope.models import ImageFormat
+from calliope.tables import Image
+from calliope.utils.image import (
+    convert_png_to_grayscale16,
+    convert_png_to_rgb565,
+    image_is_monochrome,
+    resize_image_if_needed,
+)
+
+
+MAX_PENDING_JOBS_PER_WORKER = 4
+
+ResultT = TypeVar("ResultT")
+
+ImageFields = Dict[str, Any]
+
+
+class ImageExecutor:
+    """
+    Runs image jobs in a bounded process pool.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None) -> None:
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    async def resize(
+        self,
+        image: Image,
+        width: Optional[int],
+        height: Optional[int],
+        output_filename: str,
+    ) -> Optional[Image]:
+        """
+        Resizes (and if need be letterboxes) the image to the given size. See
+        resize_image_if_needed.
+        """
+        fields = await self._run(
+            _resize_job, _get_image_fields(image), width, height, output_filename
+        )
+        return Image(**fields) if fields else None
+
+    async def convert(
+        self, image: Image, image_format: ImageFormat, output_filename: str
+    ) -> Image:
+        """
+        Converts the image to one of the device formats, RGB565 or grayscale16.
+        """
+        fields = await self._run(
+            _convert_job, image.url, image_format.value, output_filename
+        )
+        return Image(**cast(ImageFields, fields))
+
+    async def is_monochrome(self, image_filename: str) -> bool:
+        """
+        Checks whether the image is of a single solid color. See
+        image_is_monochrome.
+        """
+        return await self._run(image_is_monochrome, image_filename)
+
+    def start(self) -> None:
+        """
+        Starts the worker processes, which take a few seconds to import
+        everything, so that the first frames don't wait on them.
+        """
+        pool = self._get_pool()
+        for _ in range(self.max_workers):
+            pool.submit(_warm_up_job)
+
+    def shutdown(self) -> None:
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _run(self, job: Callable[..., ResultT], *args: Any) -> ResultT:
+        if not self._slots:
+            self._slots = asyncio.Semaphore(
+                self.max_workers * MAX_PENDING_JOBS_PER_WORKER
+            )
+
+        async with self._slots:
+            loop = asyncio.get_running_loop()
+            pool = self._get_pool()
+            try:
+                return await loop.run_in_executor(pool, job, *args)
+            except BrokenProcessPool:
+                # A worker died (e.g. was killed for using too much memory).
+                # Start a new pool, unless another job already has, and try
+                # once more.
+                if self._pool is pool:
+                    print("Image process pool broke. Restarting it.")
+                    self.shutdown()
+                return await loop.run_in_executor(self._get_pool(), job, *args)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if not self._pool:
+            # (Spawned rather than forked, since the server has threads.)
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+
+@lru_cache(maxsize=1)
+def get_image_executor() -> ImageExecutor:
+    return ImageExecutor()
+
+
+def _get_image_fields(image: Optional[Image]) -> Optional[ImageFields]:
+    if not image:
+        return None
+    return {
+        "width": image.width,
+        "height": image.height,
+        "format": image.format,
+        "url": image.url,
+    }
+
+
+# The jobs. These run in the worker processes.
+
+
+def _warm_up_job() -> None:
+    pass
+
+
+def _resize_job(
+    image_fields: ImageFields,
+    width: Optional[int],
+    height: Optional[int],
+    output_filename: str,
+) -> Optional[ImageFields]:
+    return _get_image_fields(
+        resize_image_if_needed(Image(**image_fields), width, height, output_filename)
+    )
+
+
+def _convert_job(
+    input_filename: str, image_format: str, output_filename: str
+) -> Optional[ImageFields]:
+    if image_format == ImageFormat.RGB565.value:
+        image = convert_png_to_rgb565(input_filename, output_filename)
+    elif image_format == ImageFormat.GRAYSCALE16.value:
+        image = convert_png_to_grayscale16(input_filename, output_filename)
+    else:
+        raise ValueError(f"Can't convert images to {image_format}.")
+    return _get_image_fields(image)
@@ -1,4 +1,15 @@
-from typing import Generator
+import base64
+import binascii
+from datetime import datetime
+import json
+from typing import Generator, Generic, List, Optional, Tuple, Type, TypeVar, Union
+
+from piccolo.query.methods.objects import Objects
+from piccolo.query.methods.select import Select
+from piccolo.table import Table
+
+
+RowT = TypeVar("RowT")
 
 
 class Pagination:
@@ -67,3 +78,124 @@ class Pagination:
         range_end_page = min(self.num_pages + 1, range_start_page + self.max_shown_pages)
         for show_page in range(range_start_page, range_end_page):
             yield show_page
+
+
+class KeysetPage(Generic[RowT]):
+    """
+    One page of rows, ordered newest first by (date_updated, id), as fetched by
+    get_keyset_page. Unlike OFFSET pagination, every page costs the same to fetch,
+    however deep it is.
+    """
+    rows: List[RowT]
+    next_cursor: Optional[str]
+    cursor: Optional[str]
+
+    def __init__(
+        self, rows: List[RowT], next_cursor: Optional[str], cursor: Optional[str]
+    ) -> None:
+        """
+        Args:
+            rows: the rows on the page.
+            next_cursor: an opaque cursor for the next page, or None if this is the
+            last page.
+            cursor: the cursor with which this page was requested, if any.
+        """
+        self.rows = rows
+        self.next_cursor = next_cursor
+        self.cursor = cursor
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+
+def encode_cursor(date_updated: datetime, row_id: int) -> str:
+    """
+    Encodes a (date_updated, id) position as an opaque, URL-safe cursor.
+    """
+    payload = json.dumps([date_updated.isoformat(), row_id]).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodes a cursor made by encode_cursor.
+
+    Raises:
+        ValueError: if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_updated, row_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(date_updated), int(row_id)
+    except (TypeError, ValueError, binascii.Error) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+async def get_keyset_page(
+    query: Union[Select, Objects],
+    table: Type[Table],
+    page_size: int,
+    cursor: Optional[str] = None,
+) -> KeysetPage:
+    """
+    Fetches a page of the given query's rows, newest first by (date_updated, id),
+    starting after the given cursor.
+
+    Args:
+        query: a select or objects query on a table with a date_updated column,
+        already filtered but not yet ordered or limited.
+        table: the table being queried.
+        page_size: the maximum number of rows on the page.
+        cursor: the next_cursor of the previous page, or None for the first page.
+
+    Raises:
+        ValueError: if the cursor is malformed.
+    """
+    date_column = table._meta.get_column_by_name("date_updated")
+    id_column = table._meta.primary_key
+
+    if cursor:
+        cursor_date_updated, cursor_id = decode_cursor(cursor)
+        query = query.where(
+            (date_column < cursor_date_updated)
+            | ((date_column == cursor_date_updated) & (id_column < cursor_id))
+        )
+
+    # Fetch one extra row to learn whether there's another page.
+    rows = list(
+        await query.order_by(date_column, id_column, ascending=False).limit(
+            page_size + 1
+        )
+    )
+
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last_row = rows[-1]
+        if isinstance(last_row, dict):
+            next_cursor = encode_cursor(
+                last_row[date_column._meta.name], last_row[id_column._meta.name]
+            )
+        else:
+            next_cursor = encode_cursor(
+                getattr(last_row, date_column._meta.name),
+                getattr(last_row, id_column._meta.name),
+            )
+
+    return KeysetPage(rows, next_cursor, cursor)
+
+
+async def estimate_row_count(query: Union[Select, Objects]) -> int:
+    """
+    Estimates the number of rows a query would return, from the query planner's
+    statistics rather than by counting. This costs the same however many rows
+    there are, but is only approximate. (Pass the query itself, not a count
+    query, whose plan always yields one row.)
+    """
+    table = query.table
+    rows = await table.raw("EXPLAIN (FORMAT JSON) {}", query.querystrings[0]).run()
+    plan = rows[0]["QUERY PLAN"]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,220 @@
+"""
+A content-addressed cache of image renditions.
+
+A rendition is a frame image as resized and converted for a client's display:
+say, 960x540 RGB565 for one kind of sparrow. The same image is often rendered
+the same way more than once (the sleep frame, fallback frames, frames shown
+to several sparrows of one type), so renditions are kept in the media store,
+named for what they were made from:
+
+    media/rendition-<sha256 of the source file>-<width>x<height>.<extension>
+
+and looked up before any image processing is done. Locally, the media folder
+is the store. On Google Cloud, renditions are also uploaded to the media
+bucket, and a rendition not on local disk is looked for there.
+
+Since the mere presence of a rendition's file is taken as a hit, renditions are
+written to a temporary file first and then moved into place, so that a partly
+written one is never served.
+"""
+
+import asyncio
+from dataclasses import dataclass
+import hashlib
+import os
+import shutil
+from typing import Any, Callable, Dict, Optional, Tuple
+import uuid
+
+from cachetools import LRUCache
+
+from calliope.models import ImageFormat
+from calliope.tables import Image
+from calliope.utils.google import (
+    get_media_file,
+    is_google_cloud_run_environment,
+    put_media_file,
+)
+
+
+# How many source images' hashes to remember.
+SOURCE_HASH_CACHE_SIZE = 1024
+
+RENDITION_EXTENSIONS = {
+    ImageFormat.JPEG: "jpg",
+    ImageFormat.PNG: "png",
+    ImageFormat.RGB565: "raw",
+    ImageFormat.GRAYSCALE16: "grayscale16",
+}
+
+
+@dataclass(frozen=True)
+class RenditionKey:
+    """
+    Identifies a rendition: what it was made from, and how.
+    """
+
+    source_hash: str
+    width: int
+    height: int
+    image_format: ImageFormat
+
+    @property
+    def filename(self) -> str:
+        return (
+            f"media/rendition-{self.source_hash}-{self.width}x{self.height}."
+            f"{RENDITION_EXTENSIONS[self.image_format]}"
+        )
+
+
+class RenditionCache:
+    """
+    Finds and stores renditions in the media store, counting hits and misses.
+    """
+
+    def __init__(self) -> None:
+        # Source file hashes, keyed by (filename, size, modification time).
+        self._source_hashes: LRUCache = LRUCache(maxsize=SOURCE_HASH_CACHE_SIZE)
+
+        self.hits = 0
+        self.remote_hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    async def get_key(
+        self,
+        source: Image,
+        width: Optional[int],
+        height: Optional[int],
+        image_format: Optional[ImageFormat],
+    ) -> Optional[RenditionKey]:
+        """
+        Gets the key of the rendition of the source image at the given size and
+        format, or None if the image needs no rendering: that is, if it's
+        already that size, and is to be served as is.
+        """
+        if not (width and height):
+            width, height = source.width, source.height
+            if not (width and height):
+                return None
+        if image_format not in (ImageFormat.RGB565, ImageFormat.GRAYSCALE16):
+            if (width, height) == (source.width, source.height):
+                return None
+            # (Resized images are saved as PNGs.)
+            image_format = ImageFormat.PNG
+
+        source_hash = await self._get_source_hash(source.url)
+        if not source_hash:
+            return None
+        return RenditionKey(
+            source_hash=source_hash,
+            width=width,
+            height=height,
+            image_format=image_format,
+        )
+
+    async def get(self, key: RenditionKey) -> Optional[Image]:
+        """
+        Finds the rendition with the given key, if it has been made.
+        """
+        filename = key.filename
+        if os.path.isfile(filename):
+            self.hits += 1
+            return self._to_image(key)
+
+        if is_google_cloud_run_environment():
+            try:
+                await asyncio.to_thread(
+                    _write_file,
+                    filename,
+                    lambda temp_filename: get_media_file(
+                        os.path.basename(filename), temp_filename
+                    ),
+                )
+                self.hits += 1
+                self.remote_hits += 1
+                return self._to_image(key)
+            except Exception:
+                # Not there either.
+                pass
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: RenditionKey, rendition: Image) -> None:
+        """
+        Stores a newly made rendition.
+        """
+        filename = key.filename
+        try:
+            await asyncio.to_thread(
+                _write_file,
+                filename,
+                lambda temp_filename: shutil.copyfile(rendition.url, temp_filename),
+            )
+            if is_google_cloud_run_environment():
+                await asyncio.to_thread(put_media_file, filename)
+            self.stores += 1
+        except Exception as e:
+            print(f"Error storing rendition {filename}: {e}")
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "remote_hits": self.remote_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "hit_ratio": self.hits / lookups if lookups else None,
+        }
+
+    async def _get_source_hash(self, filename: Optional[str]) -> Optional[str]:
+        if not filename:
+            return None
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+
+        hash_key: Tuple[str, int, int] = (filename, stat.st_size, stat.st_mtime_ns)
+        source_hash = self._source_hashes.get(hash_key)
+        if not source_hash:
+            source_hash = await asyncio.to_thread(_hash_file, filename)
+            self._source_hashes[hash_key] = source_hash
+        return source_hash
+
+    def _to_image(self, key: RenditionKey) -> Image:
+        return Image(
+            width=key.width,
+            height=key.height,
+            format=key.image_format.value,
+            url=key.filename,
+        )
+
+
+def _write_file(filename: str, write: Callable[[str], Any]) -> None:
+    """
+    Writes a file by way of a temporary file in the same folder, which is then
+    moved into place, so that the file is either whole or absent.
+    """
+    temp_filename = f"{filename}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(temp_filename)
+        os.replace(temp_filename, filename)
+    finally:
+        if os.path.isfile(temp_filename):
+            os.remove(temp_filename)
+
+
+def _hash_file(filename: str) -> str:
+    with open(filename, "rb") as file:
+        return hashlib.file_digest(file, "sha256").hexdigest()
+
+
+# The frame image renditions.
+rendition_cache = RenditionCache()
+
+
+def get_rendition_cache_stats() -> Dict[str, Any]:
+    return rendition_cache.stats
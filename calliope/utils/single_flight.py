@@ -0,0 +1,58 @@
+"""
+Single-flight coalescing of concurrent, identical async calls.
+
+When several requests ask for the same thing at once (say, a flock of
+sparrows behind one NAT all locating the same IP address), only the first
+actually makes the call. The rest wait on its result.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Generic, Hashable, TypeVar
+
+
+ResultT = TypeVar("ResultT")
+
+
+class SingleFlight(Generic[ResultT]):
+    """
+    Runs at most one call per key at a time, sharing its result (or exception)
+    with every caller that asks for that key while it's in flight.
+    """
+
+    def __init__(self) -> None:
+        self._in_flight: Dict[Hashable, "asyncio.Task[ResultT]"] = {}
+
+        # The number of calls that joined one already in flight.
+        self.coalesced = 0
+
+    async def do(
+        self, key: Hashable, call: Callable[[], Awaitable[ResultT]]
+    ) -> ResultT:
+        """
+        Makes the given call, unless one is already in flight for the key, in
+        which case waits for that instead.
+
+        The call runs in its own task, so a caller that's cancelled (e.g. by a
+        timeout) doesn't cancel it for the others.
+        """
+        task = self._in_flight.get(key)
+        if task:
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(call())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: "asyncio.Task[ResultT]") -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        # Retrieve any exception, so it isn't logged as never retrieved when
+        # every caller has gone.
+        if not task.cancelled():
+            task.exception()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
@@ -0,0 +1,254 @@
+"""
+Speculative generation of a sparrow's next frame.
+
+Sparrows poll for frames, usually with the same parameters each time and
+often with nothing new to show or say. So once a frame has been served, the
+next one can be generated in the background from the same inputs, and held
+in a slot for the sparrow. If its next request matches (same parameters), the
+frame is served at once rather than after a generation's worth of waiting.
+Sparrows that send images or audio aren't speculated for, since their next
+inputs can't be foreseen.
+
+A speculative frame is generated without being saved, and is handed to the
+commit callback only when it's about to be served. One that won't be served is
+simply dropped, and if it's still being generated, cancelled.
+
+Speculation is opt-in (settings.SPECULATIVE_FRAMES_ENABLED), since a
+speculative frame that isn't served is paid for anyway:
+
+- A held frame goes stale after settings.SPECULATIVE_FRAME_TTL_SECONDS, and
+  is then discarded rather than served.
+- Each flock may start at most settings.SPECULATIVE_FRAMES_PER_FLOCK_PER_HOUR
+  speculations in any hour.
+"""
+
+import asyncio
+from collections import deque
+import contextvars
+from dataclasses import dataclass, field
+import sys
+import time
+import traceback
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Generic,
+    Optional,
+    Set,
+    TypeVar,
+)
+
+from calliope.settings import settings
+
+
+ResultT = TypeVar("ResultT")
+
+SECONDS_PER_HOUR = 60 * 60
+
+
+@dataclass
+class Speculation(Generic[ResultT]):
+    """
+    A frame being (or having been) generated ahead of a sparrow's request.
+    """
+
+    task: "asyncio.Task[ResultT]"
+
+    # Identifies the inputs the frame was generated from.
+    fingerprint: str
+
+    # When the speculation started, by time.monotonic().
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def age_seconds(self) -> float:
+        return time.monotonic() - self.started_at
+
+
+class SpeculationSlots(Generic[ResultT]):
+    """
+    Holds at most one speculation per sparrow.
+    """
+
+    def __init__(
+        self,
+        commit: Callable[[ResultT], Awaitable[bool]],
+    ) -> None:
+        """
+        Args:
+            commit: saves a speculative result that is to be served, returning
+                whether it could be (if not, it isn't served).
+        """
+        self._commit = commit
+        self._slots: Dict[str, Speculation[ResultT]] = {}
+
+        # The start times of recent speculations, per flock.
+        self._starts_by_flock: Dict[str, Deque[float]] = {}
+
+        # Speculations still running. (Kept so they aren't collected before they
+        # finish.)
+        self._tasks: Set[asyncio.Task] = set()
+
+        self.started = 0
+        self.served = 0
+        self.discarded_stale = 0
+        self.discarded_changed = 0
+        self.not_committed = 0
+        self.over_budget = 0
+        self.failed = 0
+
+    async def take(
+        self, client_id: str, fingerprint: Optional[str]
+    ) -> Optional[ResultT]:
+        """
+        Gets the sparrow's speculative result, if its inputs match the given
+        fingerprint and it isn't stale, waiting for it to finish if need be,
+        and commits it. Otherwise drops it and returns None. A fingerprint of
+        None matches nothing.
+        """
+        speculation = self._slots.pop(client_id, None)
+        if not speculation:
+            return None
+
+        if speculation.fingerprint != fingerprint:
+            self.discarded_changed += 1
+            print(f"Inputs changed for {client_id}. Dropping speculative frame.")
+            speculation.task.cancel()
+            return None
+
+        if speculation.age_seconds > settings.SPECULATIVE_FRAME_TTL_SECONDS:
+            self.discarded_stale += 1
+            print(
+                f"Speculative frame for {client_id} is stale "
+                f"({speculation.age_seconds:.0f}s). Dropping it."
+            )
+            speculation.task.cancel()
+            return None
+
+        try:
+            result = await asyncio.shield(speculation.task)
+        except Exception as e:
+            self.failed += 1
+            print(f"Speculative frame for {client_id} failed: {e}")
+            return None
+
+        try:
+            committed = await self._commit(result)
+        except Exception as e:
+            traceback.print_exc(file=sys.stderr)
+            print(f"Error committing speculative frame for {client_id}: {e}")
+            committed = False
+        if not committed:
+            self.not_committed += 1
+            return None
+
+        self.served += 1
+        return result
+
+    def start(
+        self,
+        client_id: str,
+        flock_id: str,
+        fingerprint: str,
+        generate: Callable[[], Awaitable[ResultT]],
+    ) -> bool:
+        """
+        Starts generating the sparrow's next result in the background, unless
+        the flock has spent its budget of speculations for the hour.
+
+        Returns:
+            whether a speculation was started.
+        """
+        self._drop_stale()
+
+        if not self._spend(flock_id):
+            self.over_budget += 1
+            print(f"Flock {flock_id} is over its speculative frame budget.")
+            return False
+
+        # Run in a fresh context, so the speculation doesn't join the unit of
+        # work or event stream of the request that started it.
+        task = asyncio.get_running_loop().create_task(
+            _log_failure(client_id, generate), context=contextvars.Context()
+        )
+        self._keep(task)
+
+        previous = self._slots.get(client_id)
+        self._slots[client_id] = Speculation(task=task, fingerprint=fingerprint)
+        if previous:
+            # Shouldn't happen, since a request takes the slot first, but if it
+            # does, the older frame won't be served.
+            previous.task.cancel()
+
+        self.started += 1
+        return True
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        taken = (
+            self.served
+            + self.discarded_stale
+            + self.discarded_changed
+            + self.not_committed
+        )
+        return {
+            "started": self.started,
+            "served": self.served,
+            "discarded_stale": self.discarded_stale,
+            "discarded_changed": self.discarded_changed,
+            "not_committed": self.not_committed,
+            "over_budget": self.over_budget,
+            "failed": self.failed,
+            "held": len(self._slots),
+            "hit_ratio": self.served / taken if taken else None,
+        }
+
+    def _spend(self, flock_id: str) -> bool:
+        """
+        Counts a speculation against the flock's hourly budget, if there's any
+        left.
+        """
+        now = time.monotonic()
+        starts = self._starts_by_flock.setdefault(flock_id, deque())
+        while starts and now - starts[0] > SECONDS_PER_HOUR:
+            starts.popleft()
+        if len(starts) >= settings.SPECULATIVE_FRAMES_PER_FLOCK_PER_HOUR:
+            return False
+        starts.append(now)
+        return True
+
+    def _drop_stale(self) -> None:
+        """
+        Drops stale speculations, such as those of sparrows that have gone
+        quiet, rather than holding them until their next requests.
+        """
+        for client_id, speculation in list(self._slots.items()):
+            if speculation.age_seconds > settings.SPECULATIVE_FRAME_TTL_SECONDS:
+                del self._slots[client_id]
+                self.discarded_stale += 1
+                speculation.task.cancel()
+
+    def _keep(self, task: asyncio.Task) -> None:
+        self._tasks.add(task)
+        task.add_done_callback(self._forget)
+
+    def _forget(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        # Retrieve any exception (already logged), so it isn't logged again as
+        # never retrieved if the speculation is never taken.
+        if not task.cancelled():
+            task.exception()
+
+
+async def _log_failure(
+    client_id: str, generate: Callable[[], Awaitable[ResultT]]
+) -> ResultT:
+    try:
+        return await generate()
+    except Exception:
+        print(f"Error generating speculative frame for {client_id}:")
+        traceback.print_exc(file=sys.stderr)
+        raise
@@ -10,17 +10,14 @@ from calliope.utils.file import (
     decode_b64_to_file,
     get_base_filename,
 )
+from calliope.utils.frame_events import emit_frame_event
 from calliope.utils.google import (
     is_google_cloud_run_environment,
     put_media_file,
 )
-from calliope.utils.image import (
-    convert_png_to_grayscale16,
-    convert_png_to_rgb565,
-    image_is_monochrome,
-    ImageFormat,
-    resize_image_if_needed,
-)
+from calliope.utils.image import ImageFormat
+from calliope.utils.image_executor import get_image_executor
+from calliope.utils.renditions import rendition_cache
 
 
 async def prepare_input_files(
@@ -69,6 +66,8 @@ async def prepare_frame_images(
 ) -> None:
     is_google_cloud = is_google_cloud_run_environment()
     output_image_format = ImageFormat.fromMediaFormat(parameters.output_image_format)
+    # (PIL work runs in worker processes, so as not to block the event loop.)
+    image_executor = get_image_executor()
 
     for frame in frames:
         image = frame.image
@@ -81,20 +80,42 @@ async def prepare_frame_images(
                 # Save the original PNG image in case we want to see it later.
                 put_media_file(image.url)
 
-            if image_is_monochrome(image.url):
+            output_image_width = parameters.output_image_width
+            output_image_height = parameters.output_image_height
+
+            # Reuse the rendition of this image for this size and format, if it
+            # has already been made.
+            rendition_key = await rendition_cache.get_key(
+                image, output_image_width, output_image_height, output_image_format
+            )
+            rendition = (
+                await rendition_cache.get(rendition_key) if rendition_key else None
+            )
+            if rendition:
+                frame.image = rendition
+                if save:
+                    await rendition.save().run()
+                    await frame.save().run()
+                await _prepare_frame_video(frame, save, is_google_cloud)
+                emit_frame_event(
+                    "frame", frame_number=frame.number, frame=frame.to_pydantic()
+                )
+                continue
+
+            if await image_executor.is_monochrome(image.url):
                 print(f"Image {image.url} is monochrome. Skipping.")
                 # Skip the image if it has only a single color (usually black).
-                # (This doesn't appear to work.)
                 frame.image = None
                 if save:
                     await frame.save().run()
+                emit_frame_event(
+                    "frame", frame_number=frame.number, frame=frame.to_pydantic()
+                )
                 continue
 
-            output_image_width = parameters.output_image_width
-            output_image_height = parameters.output_image_height
             base_filename = get_base_filename(image.url)
             resized_image_filename = f"media/{base_filename}.rsz.png"
-            resized_image = resize_image_if_needed(
+            resized_image = await image_executor.resize(
                 image,
                 output_image_width,
                 output_image_height,
@@ -107,7 +128,9 @@ async def prepare_frame_images(
             if output_image_format == ImageFormat.RGB565:
                 base_filename = get_base_filename(image.url)
                 output_image_filename_raw = f"media/{base_filename}.raw"
-                image = convert_png_to_rgb565(image.url, output_image_filename_raw)
+                image = await image_executor.convert(
+                    image, ImageFormat.RGB565, output_image_filename_raw
+                )
                 image_updated = True
             elif output_image_format == ImageFormat.GRAYSCALE16:
                 if is_google_cloud:
@@ -115,7 +138,9 @@ async def prepare_frame_images(
                     put_media_file(image.url)
                 base_filename = get_base_filename(image.url)
                 output_image_filename_raw = f"media/{base_filename}.grayscale16"
-                image = convert_png_to_grayscale16(image.url, output_image_filename_raw)
+                image = await image_executor.convert(
+                    image, ImageFormat.GRAYSCALE16, output_image_filename_raw
+                )
                 image_updated = True
 
             if image_updated:
@@ -125,12 +150,22 @@ async def prepare_frame_images(
                     await frame.save().run()
                 if is_google_cloud:
                     put_media_file(image.url)
-        video = frame.video
-        if video:
-            if save:
-                await video.save().run()
-            if is_google_cloud:
-                put_media_file(video.url)
+                if rendition_key:
+                    await rendition_cache.put(rendition_key, image)
+        await _prepare_frame_video(frame, save, is_google_cloud)
+
+        emit_frame_event("frame", frame_number=frame.number, frame=frame.to_pydantic())
+
+
+async def _prepare_frame_video(
+    frame: StoryFrame, save: bool, is_google_cloud: bool
+) -> None:
+    video = frame.video
+    if video:
+        if save:
+            await video.save().run()
+        if is_google_cloud:
+            put_media_file(video.url)
 
 
 def prepare_existing_frame_images(